@@ -0,0 +1,62 @@
+"""Measure the queries on the shape of Args made for each function call.
+
+The positional arguments, the keyed arguments and the kind of the arguments of
+Args are queried as functions calls do, with the positional values and the
+keyed items split once and cached, and as they used to be queried, by scanning
+the keys of the Args for each query.
+
+Usage:
+    python benchmarks/args.py [--n N] [--repeat N] [--size N]
+"""
+
+import argparse
+import time
+
+from mylang.stdlib.core import Args, Array, Int, String
+
+
+def scan(args: Args):
+    """Query the Args as it used to, scanning its keys each time."""
+    positional = Array.from_iterable(v for k, v in args._m_dict_.items() if isinstance(k, Int))
+    keyed = {k: v for k, v in args._m_dict_.items() if not isinstance(k, Int)}
+    positional_only = all(isinstance(k, Int) for k in args._m_dict_)
+    return positional[0], positional, keyed, positional_only, len(args) == len(keyed)
+
+
+def cached(args: Args):
+    """Query the Args with its cached shape."""
+    return args[0], args[:], args.keyed_dict(), args.is_positional_only(), args.is_keyed_only()
+
+
+def measure(query, size: int, n: int, repeat: int) -> float:
+    """Return the best time of ``repeat`` runs of ``n`` queries on new Args, in s."""
+    items = {Int(i): Int(i) for i in range(size)} | {String(f"key{i}"): Int(i) for i in range(size // 2)}
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n):
+            # New Args for each call, as the engines create them
+            args = Args.__new__(Args)
+            args._m_dict_ = items.copy()
+            query(args)
+            query(args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--n", type=int, default=20_000, help="Number of Args (default: 20000)")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Number of runs per way (default: 5)")
+    arg_parser.add_argument("--size", type=int, default=4, help="Number of positional arguments (default: 4)")
+    args = arg_parser.parse_args()
+
+    old = measure(scan, args.size, args.n, args.repeat)
+    new = measure(cached, args.size, args.n, args.repeat)
+    print(f"{args.size} positional and {args.size // 2} keyed arguments (n={args.n})")
+    print(f"      scan: {old / args.n * 1e6:8.2f} us")
+    print(f"    cached: {new / args.n * 1e6:8.2f} us ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Measure the evaluation of arithmetic operations.
+
+Binary operations on numbers are evaluated with the operator function bound
+when the operation is created, whose fast path computes the result from the
+values of the operands, and as they used to be evaluated, by calling `op` with
+the operator and the operands.
+
+Usage:
+    python benchmarks/arithmetic.py [--n N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from mylang.stdlib import builtins_
+from mylang.stdlib.core import Args, BinaryOperation, Float, Int, String, op
+from mylang.stdlib.core._context import nested_stack_frame
+from mylang.stdlib.core._utils import currently_called_func, set_contextvar
+
+OPERATIONS = {
+    "Int + Int": BinaryOperation("+", [Int(2), Int(3)]),
+    "Float * Float": BinaryOperation("*", [Float(1.5), Float(2.0)]),
+    "Int < Int": BinaryOperation("<", [Int(2), Int(3)]),
+    "Int == Float": BinaryOperation("==", [Int(2), Float(2.0)]),
+}
+
+
+def call_op(operation: BinaryOperation):
+    """Evaluate the operation through `op`, as operations used to be evaluated."""
+    with set_contextvar(currently_called_func, op._m_classcall_):
+        return op._m_classcall_(Args(String(operation.operator), *operation.operands))
+
+
+def measure(evaluate, operation: BinaryOperation, n: int, repeat: int) -> float:
+    """Return the best time of ``repeat`` runs of ``n`` evaluations, in s."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(n):
+            evaluate(operation)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--n", type=int, default=20_000, help="Number of evaluations (default: 20000)")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Number of runs per path (default: 5)")
+    args = arg_parser.parse_args()
+
+    with nested_stack_frame(builtins_.create_locals_dict()):
+        for name, operation in OPERATIONS.items():
+            assert call_op(operation) == operation.evaluate()
+            old = measure(call_op, operation, args.n, args.repeat)
+            new = measure(BinaryOperation.evaluate, operation, args.n, args.repeat)
+            print(f"{name} (n={args.n})")
+            print(f"       op: {old / args.n * 1e6:8.2f} us")
+            print(f"    bound: {new / args.n * 1e6:8.2f} us ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
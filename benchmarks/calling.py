@@ -0,0 +1,108 @@
+"""Compare passing the stack frame to called functions with looking it up in context variables.
+
+Functions that receive the stack frame they run in (see
+``mylang.stdlib.core._utils.receives_stack_frame``) are called by ``call``
+with the stack frame as an argument. Otherwise, as for any function called by
+Python code, ``call`` sets ``currently_called_func`` and the function looks up
+``current_stack_frame``. A recursive function called in a loop is executed
+both ways with each engine, first to time it, then under :mod:`cProfile` to
+count the function calls, and in particular those that handle the context
+variables.
+
+Usage:
+    python benchmarks/calling.py [--n N] [--repeat N]
+"""
+
+import argparse
+import cProfile
+import pstats
+import time
+from typing import Iterator
+
+from mylang.stdlib import builtins_
+from mylang.cache import compile_source
+from mylang.stdlib.core._compiler import ENGINES, current_engine
+from mylang.stdlib.core._context import nested_stack_frame
+from mylang.stdlib.core._utils import all_functions_defined_as_classes, set_contextvar
+from mylang.stdlib.core.class_ import BoundMethod
+from mylang.stdlib.core.func import StatementList, fun
+
+PROGRAM = """
+fun sum n (
+    if $n == 0 (
+        return 0
+    )
+    return $n + {sum $n - 1}
+)
+i = 0
+loop (
+    while $i < {N}
+    sum 20
+    i = $i + 1
+)
+"""
+
+CONTEXT_FUNCTIONS = ("set_contextvar", "wrapper", "_caller_stack_frame")
+"""Functions that handle the context variables: setting them, checking them
+(in ``only_callable_by_call_decorator``), and looking up the caller's stack frame."""
+
+
+def functions_receiving_stack_frame() -> Iterator:
+    """Get the implementations of `_m_call_` and `_m_classcall_` that receive the stack frame."""
+    for cls in (fun, BoundMethod, StatementList, *all_functions_defined_as_classes):
+        for name in ("_m_call_", "_m_classcall_"):
+            func = getattr(cls, name, None)
+            func = getattr(func, "__func__", func)
+            if getattr(func, "_receives_stack_frame", False):
+                yield func
+
+
+def run(engine: str, n: int, profile: cProfile.Profile | None = None) -> float:
+    """Execute the program once with the engine, and return the time it took, in s."""
+    with set_contextvar(current_engine, engine), nested_stack_frame(builtins_.create_locals_dict()):
+        # Compiled anew, as call sites cache how to call their functions
+        statement_list = compile_source(PROGRAM.replace("{N}", str(n)))
+        start = time.perf_counter()
+        if profile is None:
+            statement_list()
+        else:
+            profile.runcall(statement_list)
+        return time.perf_counter() - start
+
+
+def count_calls(engine: str, n: int) -> tuple[int, dict[str, int]]:
+    """Count all the function calls of an execution, and those of :data:`CONTEXT_FUNCTIONS`."""
+    profile = cProfile.Profile()
+    run(engine, n, profile)
+    stats = pstats.Stats(profile)
+    counts = dict.fromkeys(CONTEXT_FUNCTIONS, 0)
+    for (_, _, function_name), (_, ncalls, *_) in stats.stats.items():  # type: ignore[attr-defined]
+        if function_name in counts:
+            counts[function_name] += ncalls
+    return stats.total_calls, counts  # type: ignore[attr-defined]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--n", type=int, default=200, help="Number of iterations (default: 200)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Number of executions per engine (default: 3)")
+    args = arg_parser.parse_args()
+
+    receiving = list(functions_receiving_stack_frame())
+    for engine in ENGINES:
+        print(engine)
+        results = {}
+        for passed in (False, True):
+            for func in receiving:
+                func._receives_stack_frame = passed
+            best = min(run(engine, args.n) for _ in range(args.repeat))
+            results[passed] = best, *count_calls(engine, args.n)
+        for passed, (elapsed, total_calls, counts) in results.items():
+            label = "passed" if passed else "looked up"
+            speedup = f" ({results[False][0] / elapsed:.2f}x)" if passed else ""
+            context_calls = ", ".join(f"{name} {count}" for name, count in counts.items())
+            print(f"    {label:>9}: {elapsed * 1e3:8.1f} ms{speedup}, {total_calls} calls ({context_calls})")
+
+
+if __name__ == "__main__":
+    main()
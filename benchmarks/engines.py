@@ -0,0 +1,85 @@
+"""Compare the execution engines on code that runs the same statements many times.
+
+A recursive function called in a loop, a function called in a loop and a
+counting loop are executed with the tree-walking engine, which interprets every
+statement each time it runs, with the closure engine, which compiles each
+statement list once, and with the bytecode virtual machine of :mod:`mylang.vm`.
+
+Usage:
+    python benchmarks/engines.py [--n N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from mylang.cache import compile_source
+from mylang.stdlib import builtins_
+from mylang.stdlib.core._compiler import ENGINES, current_engine
+from mylang.stdlib.core._context import nested_stack_frame
+from mylang.stdlib.core._utils import set_contextvar
+
+PROGRAMS = {
+    "recursion": """
+fun sum n (
+    if $n == 0 (
+        return 0
+    )
+    return $n + {sum $n - 1}
+)
+i = 0
+loop (
+    while $i < {N}
+    sum 20
+    i = $i + 1
+)
+""",
+    "calls": """
+fun identity x (
+    return $x
+)
+i = 0
+loop (
+    while $i < {N}
+    identity $i
+    i = $i + 1
+)
+""",
+    "loop": """
+x = 0
+loop (
+    while $x < {N}
+    x = $x + 1
+)
+""",
+}
+
+
+def measure(code: str, engine: str, repeat: int) -> float:
+    """Return the best time of ``repeat`` executions with the engine, in s."""
+    best = float("inf")
+    for _ in range(repeat):
+        # Compile anew, so that the closure engine compiles the code each time
+        statement_list = compile_source(code)
+        with set_contextvar(current_engine, engine), nested_stack_frame(builtins_.create_locals_dict()):
+            start = time.perf_counter()
+            statement_list()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--n", type=int, default=100, help="Number of iterations of each program (default: 100)")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Number of runs per engine (default: 5)")
+    args = arg_parser.parse_args()
+
+    for name, program in PROGRAMS.items():
+        code = program.replace("{N}", str(args.n))
+        times = {engine: measure(code, engine, args.repeat) for engine in ENGINES}
+        print(f"{name} (n={args.n})")
+        for engine, best in times.items():
+            print(f"  {engine:>8}: {best * 1000:8.1f} ms ({times['tree'] / best:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Measure the stack frames allocated by recursive calls, with and without recycling them.
+
+A recursive function is called in a loop, as in ``tests/flows/recursion.my``,
+with each engine. Stack frames (and their lexical scopes) that nothing
+captured are released to a free list of the thread and recycled by later
+calls. Setting :data:`max_free_stack_frames` to 0 disables the free list, so
+every call allocates new ones, as before.
+
+Usage:
+    python benchmarks/frames.py [--n N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from mylang.cache import compile_source
+from mylang.stdlib import builtins_
+from mylang.stdlib.core import _context
+from mylang.stdlib.core._compiler import ENGINES, current_engine
+from mylang.stdlib.core._context import StackFrame, nested_stack_frame
+from mylang.stdlib.core._utils import set_contextvar
+
+PROGRAM = """
+fun sum n (
+    if $n == 0 (
+        return 0
+    )
+    return $n + {sum $n - 1}
+)
+i = 0
+loop (
+    while $i < {N}
+    sum 20
+    i = $i + 1
+)
+"""
+CALLS_PER_ITERATION = 21
+
+
+class _CountingStackFrame(StackFrame):
+    """Counts the stack frames allocated, rather than recycled."""
+
+    __slots__ = ()
+
+    allocated = 0
+
+    def __init__(self, *args, **kwargs):
+        _CountingStackFrame.allocated += 1
+        super().__init__(*args, **kwargs)
+
+
+def measure(engine: str, n: int, repeat: int) -> tuple[float, int]:
+    """Return the best time of ``repeat`` executions, in s, and the number of stack frames allocated by one."""
+    best = float("inf")
+    code = PROGRAM.replace("{N}", str(n))
+    for _ in range(repeat):
+        with set_contextvar(current_engine, engine), nested_stack_frame(builtins_.create_locals_dict()):
+            statement_list = compile_source(code)
+            allocated = _CountingStackFrame.allocated
+            start = time.perf_counter()
+            statement_list()
+            best = min(best, time.perf_counter() - start)
+            allocated = _CountingStackFrame.allocated - allocated
+    return best, allocated
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--n", type=int, default=200, help="Number of iterations (default: 200)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Number of executions per engine (default: 3)")
+    args = arg_parser.parse_args()
+
+    # Count the stack frames that StackFrame.acquire allocates
+    acquire = StackFrame.acquire.__func__  # type: ignore[attr-defined]
+    StackFrame.acquire = classmethod(lambda cls, *a, **k: acquire(_CountingStackFrame, *a, **k))  # type: ignore
+
+    calls = args.n * CALLS_PER_ITERATION
+    for engine in ENGINES:
+        print(f"{engine} ({calls} calls)")
+        results = {}
+        for pooled in (False, True):
+            _context.max_free_stack_frames = 64 if pooled else 0
+            _context._stack_frame_pool.free.clear()
+            results[pooled] = measure(engine, args.n, args.repeat)
+        for pooled, (elapsed, allocated) in results.items():
+            label = "recycled" if pooled else "allocated"
+            speedup = f" ({results[False][0] / elapsed:.2f}x)" if pooled else ""
+            print(f"    {label:>9}: {elapsed * 1e3:8.1f} ms, {allocated / calls:5.2f} new frames per call{speedup}")
+
+
+if __name__ == "__main__":
+    main()
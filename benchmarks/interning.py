@@ -0,0 +1,64 @@
+"""Report how often strings and numbers are found interned, by size of the recently used instances.
+
+A program that computes a few numbers from every number it counts is run once
+per size. The hit rate is how often a string or a number was already alive
+when it was created again; the live instances are those left once the program
+is done.
+
+Usage:
+    python benchmarks/interning.py [--n N] [--sizes N [N ...]]
+"""
+
+import argparse
+import gc
+import time
+
+from mylang.cache import compile_source
+from mylang.stdlib import builtins_
+from mylang.stdlib.core._context import nested_stack_frame
+from mylang.stdlib.core._interning import InternTable, primitives, strings
+
+PROGRAM = """
+i = 0
+loop (
+    while $i < {N}
+    square = $i * $i
+    if $square == 42 (
+        echo $square
+    )
+    i = $i + 1
+)
+"""
+
+
+def reset(table: InternTable, max_recent: int):
+    table.max_recent = max_recent
+    table.clear_recent()
+    table.hits = table.misses = 0
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--n", type=int, default=20_000, help="Number of iterations (default: 20000)")
+    arg_parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[0, 64, 1024, 16384], help="Sizes to compare (default: 0 64 1024 16384)"
+    )
+    args = arg_parser.parse_args()
+
+    for size in args.sizes:
+        for table in (strings, primitives):
+            reset(table, size)
+        gc.collect()
+        with nested_stack_frame(builtins_.create_locals_dict()):
+            start = time.perf_counter()
+            compile_source(PROGRAM.replace("{N}", str(args.n)))()
+            elapsed = time.perf_counter() - start
+        gc.collect()
+        print(f"max_recent={size} ({elapsed * 1e3:.1f} ms)")
+        for name, table in (("strings", strings), ("primitives", primitives)):
+            info = table.info()
+            print(f"    {name:>10}: {info.hits / max(info.hits + info.misses, 1):6.1%} hits, {info.live} live")
+
+
+if __name__ == "__main__":
+    main()
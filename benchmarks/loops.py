@@ -0,0 +1,70 @@
+"""Measure a counting loop, exited by a `while` condition or by `break`, or over a range.
+
+The loop counts to N (a million by default), as in ``tests/flows/loop.my``.
+A ``while`` at the top level of the body of a loop is evaluated by the loop
+itself, while a ``break`` nested in an ``if`` is a statement that signals the
+loop to exit. A ``for`` over the range ``0..N`` counts without evaluating any
+operation. Each form is executed with each engine, or with the given one.
+
+Usage:
+    python benchmarks/loops.py [--n N] [--engine ENGINE]
+"""
+
+import argparse
+import time
+
+from mylang.cache import compile_source
+from mylang.stdlib import builtins_
+from mylang.stdlib.core._compiler import ENGINES, current_engine
+from mylang.stdlib.core._context import nested_stack_frame
+from mylang.stdlib.core._utils import set_contextvar
+
+PROGRAMS = {
+    "while": """
+i = 0
+loop (
+    while $i < {N}
+    i = $i + 1
+)
+""",
+    "break": """
+i = 0
+loop (
+    if $i == {N} (
+        break
+    )
+    i = $i + 1
+)
+""",
+    "range": """
+for i in 0..{N} (
+    j = $i
+)
+""",
+}
+
+
+def run(engine: str, code: str) -> float:
+    """Execute the code once with the engine, and return the time it took, in s."""
+    with set_contextvar(current_engine, engine), nested_stack_frame(builtins_.create_locals_dict()):
+        statement_list = compile_source(code)
+        start = time.perf_counter()
+        statement_list()
+        return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--n", type=int, default=1_000_000, help="Number of iterations (default: 1000000)")
+    arg_parser.add_argument("--engine", choices=ENGINES, help="Engine to execute the loops with (default: all)")
+    args = arg_parser.parse_args()
+
+    for engine in ENGINES if args.engine is None else (args.engine,):
+        print(engine)
+        for name, program in PROGRAMS.items():
+            elapsed = run(engine, program.replace("{N}", str(args.n)))
+            print(f"    {name:>5}: {elapsed:8.2f} s, {elapsed * 1e9 / args.n:8.0f} ns per iteration")
+
+
+if __name__ == "__main__":
+    main()
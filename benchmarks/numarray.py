@@ -0,0 +1,64 @@
+"""Measure the sum of the squares of N numbers, computed value by value or on a numeric array.
+
+The numbers are the range ``0..N`` (a hundred thousand by default). A
+pipeline calls a function, and dispatches its operator, for each value, boxing
+each result, while the operators of a numeric array compute on all the values
+in a single call, with NumPy if it is installed. Each form is executed with each engine,
+or with the given one.
+
+Usage:
+    python benchmarks/numarray.py [--n N] [--engine ENGINE]
+"""
+
+import argparse
+import time
+
+from mylang.cache import compile_source
+from mylang.stdlib import builtins_
+from mylang.stdlib.core._compiler import ENGINES, current_engine
+from mylang.stdlib.core._context import nested_stack_frame
+from mylang.stdlib.core._utils import set_contextvar
+from mylang.stdlib.core.numarray import _numpy
+
+PROGRAMS = {
+    "pipeline": """
+fun square x (
+    return $x * $x
+)
+fun add a b (
+    return $a + $b
+)
+total = {reduce $add {map $square 0..{N}}}
+""",
+    "numarray": """
+xs = {numarray 0..{N}}
+total = {sum $xs * $xs}
+""",
+}
+
+
+def run(engine: str, code: str) -> float:
+    """Execute the code once with the engine, and return the time it took, in s."""
+    with set_contextvar(current_engine, engine), nested_stack_frame(builtins_.create_locals_dict()):
+        statement_list = compile_source(code)
+        start = time.perf_counter()
+        statement_list()
+        return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--n", type=int, default=100_000, help="Number of values (default: 100000)")
+    arg_parser.add_argument("--engine", choices=ENGINES, help="Engine to execute the programs with (default: all)")
+    args = arg_parser.parse_args()
+
+    print("backend:", "numpy" if _numpy() else "array")
+    for engine in ENGINES if args.engine is None else (args.engine,):
+        print(engine)
+        for name, program in PROGRAMS.items():
+            elapsed = run(engine, program.replace("{N}", str(args.n)))
+            print(f"    {name:>8}: {elapsed:8.2f} s, {elapsed * 1e9 / args.n:8.0f} ns per value")
+
+
+if __name__ == "__main__":
+    main()
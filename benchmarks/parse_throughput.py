@@ -0,0 +1,52 @@
+"""Measure parsing throughput of the available parsing engines, in MB/s.
+
+The corpus is made of the MyLang sources of the standard library and the flow
+tests, repeated until it reaches the requested size.
+
+Usage:
+    python benchmarks/parse_throughput.py [--size KB] [--repeat N] [--engine ENGINE ...]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from mylang.parser import ENGINES, create_parser
+
+ROOT = Path(__file__).parent.parent
+
+
+def build_corpus(size: int) -> str:
+    """Concatenate MyLang sources until the text is at least ``size`` bytes long."""
+    paths = sorted(ROOT.glob("mylang/**/*.my")) + sorted(ROOT.glob("tests/flows/*.my"))
+    sources = [path.read_text(encoding="utf-8") for path in paths]
+    chunk = "\n".join(source.strip() for source in sources if source.strip()) + "\n"
+    return chunk * max(1, -(-size // len(chunk.encode())))
+
+
+def measure(engine: str, corpus: str, repeat: int) -> float:
+    """Return the best throughput of ``repeat`` runs, in MB/s."""
+    parser = create_parser(engine)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(corpus, start="module")
+        best = min(best, time.perf_counter() - start)
+    return len(corpus.encode()) / best / 1e6
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--size", type=int, default=8, help="Corpus size in KB (default: 8)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Number of runs per engine (default: 3)")
+    arg_parser.add_argument("--engine", action="append", choices=ENGINES, help="Engine to measure (default: all)")
+    args = arg_parser.parse_args()
+
+    corpus = build_corpus(args.size * 1024)
+    print(f"Corpus: {len(corpus.encode()) / 1024:.1f} KB")
+    for engine in args.engine or ENGINES:
+        print(f"{engine:>8}: {measure(engine, corpus, args.repeat):8.3f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
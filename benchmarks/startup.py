@@ -0,0 +1,109 @@
+"""Measure cold start time of the interpreter, and fail if it regressed.
+
+Each sample is taken in a fresh interpreter process, using ``python -X
+importtime``. Two things are checked:
+
+- Importing the CLI entry point must not import the parser, the REPL or the
+  terminal UI, which are only needed on demand.
+- The median cumulative import time of the CLI entry point must stay within the
+  budget.
+
+The time to run a cached file end to end is reported as well.
+
+Usage:
+    python benchmarks/startup.py [--samples N] [--budget-ms MS]
+
+Exits with a non-zero status if any of the checks fails.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+ENTRY_POINT = "mylang.__main__"
+
+LAZY_MODULES = (
+    "lark",
+    "termios",
+    "mylang.parser",
+    "mylang.incremental",
+    "mylang.transformer",
+    "mylang.stdlib.repl",
+    "mylang.stdlib.ui",
+)
+"""Modules that must not be imported when the CLI entry point is imported."""
+
+
+def _environment() -> dict[str, str]:
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (str(ROOT), env.get("PYTHONPATH"))))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Import the module in a fresh process and get cumulative import times (in us) of all imported modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=_environment(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def run_time(*args: str) -> float:
+    """Run the interpreter in a fresh process and get the wall clock time (in s)."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "mylang", *args], env=_environment(), capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--samples", type=int, default=10, help="Number of samples (default: 10)")
+    arg_parser.add_argument(
+        "--budget-ms", type=float, default=150, help="Maximum median import time of the CLI in ms (default: 150)"
+    )
+    args = arg_parser.parse_args()
+
+    # Warm up the bytecode cache and the compiled-module cache
+    import_times(ENTRY_POINT)
+    script = ROOT / "tests" / "flows" / "echo.my"
+    run_time(str(script))
+
+    samples = [import_times(ENTRY_POINT) for _ in range(args.samples)]
+    import_ms = statistics.median(sample[ENTRY_POINT] for sample in samples) / 1000
+    run_ms = statistics.median(run_time(str(script)) for _ in range(args.samples)) * 1000
+
+    print(f"import {ENTRY_POINT}: {import_ms:8.1f} ms (budget: {args.budget_ms:.1f} ms)")
+    print(f"run {script.name} (cached): {run_ms:8.1f} ms")
+
+    failures = []
+    eager = sorted({name for sample in samples for name in sample if name.startswith(LAZY_MODULES)})
+    if eager:
+        failures.append(f"{ENTRY_POINT} eagerly imports: {', '.join(eager)}")
+    if import_ms > args.budget_ms:
+        failures.append(f"import time {import_ms:.1f} ms exceeds the budget of {args.budget_ms:.1f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Measure the transform phase on a file with many string literals.
+
+A module with the requested number of quoted string literals (some of them
+with escape sequences) is parsed once, and its parse tree is then transformed
+with the current transformer and with one that decodes literals with ``eval``,
+as the transformer used to.
+
+Usage:
+    python benchmarks/string_literals.py [--literals N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from lark import Token, Tree
+
+from mylang.parser import get_parser
+from mylang.stdlib.core import String
+from mylang.transformer import Transformer
+
+
+class EvalTransformer(Transformer):
+    """The transformer as it was, decoding string literals with ``eval``."""
+
+    def DOUBLE_QUOTED_STRING(self, token: Token):
+        return String(eval(token.value))  # pylint: disable=eval-used
+
+    def SINGLE_QUOTED_STRING(self, token: Token):
+        return String(eval(token.value))  # pylint: disable=eval-used
+
+
+def build_module(literals: int) -> str:
+    """Build a module with ``literals`` string literals, ten per statement."""
+    samples = ['"plain text"', "'single quoted'", r'"tab\tand newline\n"', r"'café \x41'", '"id_%d"']
+    words = [samples[i % len(samples)].replace("%d", str(i)) for i in range(literals)]
+    return "".join(f"echo {' '.join(words[i : i + 10])}\n" for i in range(0, literals, 10))
+
+
+def measure(transformer: Transformer, tree: Tree, repeat: int) -> float:
+    """Return the best time of ``repeat`` transformations, in s."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        transformer.transform(tree)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--literals", type=int, default=100_000, help="Number of literals (default: 100000)")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Number of runs per transformer (default: 3)")
+    args = arg_parser.parse_args()
+
+    tree = get_parser("lalr").parse(build_module(args.literals), start="module")
+
+    old = measure(EvalTransformer(), tree, args.repeat)
+    new = measure(Transformer(), tree, args.repeat)
+    print(f"Literals: {args.literals}")
+    print(f"    eval: {old * 1000:8.1f} ms")
+    print(f" decoder: {new * 1000:8.1f} ms ({old / new:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""MyLang - a new kind of programming language."""
+
+__version__ = "0.1.0"
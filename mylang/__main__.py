@@ -1,13 +1,17 @@
 """Main module for MyLang CLI."""
 
+import contextlib
 import sys
-from mylang.stdlib.repl import REPL
-from mylang.parser import parser
+from typing import Iterable
+
+from mylang.cache import compile_source, load_file
+from mylang.streaming import compile_stream, execute_stream, should_stream
 from mylang.stdlib.core.func import StatementList
-from mylang.transformer import Transformer
+from mylang.stdlib.core._compiler import current_engine
 from mylang.stdlib.core._context import StackFrame, current_stack_frame
+from mylang.stdlib.core._release import set_release_mode
 from mylang.stdlib import builtins_
-from mylang.cli import CLI, FileInputSource, TextInputSource
+from mylang.cli import CLI, FileInputSource, StreamInputSource, TextInputSource
 
 
 def main():
@@ -15,32 +19,41 @@ def main():
     cli = CLI()
     cli.parse()
     input_source = cli.get_input_source()
+    if (engine := cli.get_engine()) is not None:
+        current_engine.set(engine)
+    if cli.get_release():
+        set_release_mode(True)
 
-    # Import here to avoid circular imports
     if input_source is None:
+        # Import here, as the REPL and the terminal UI are slow to import
+        from mylang.stdlib.repl import REPL
+
         print("MyLang REPL")
         print("Enter: evaluate | Ctrl+D: exit")
         print()
         REPL().run()
         print("\nGoodbye!")
     else:
-        input_file_data: str
-        # Get the code content
-        if isinstance(input_source, FileInputSource):
-            with open(input_source.file_path, "r", encoding="utf-8") as f:
-                input_file_data = f.read()
-        elif isinstance(input_source, TextInputSource):
-            input_file_data = input_source.text
-        else:
-            raise NotImplementedError
-
-        # Execute the code
-        tree = parser.parse(input_file_data, start="module")
-        # TODO: Remove debug print
-        print("Syntax tree:\n", tree.pretty())
-        with StackFrame(builtins_.create_locals_dict(), parent=current_stack_frame.get()):
-            statement_list: StatementList = Transformer().transform(tree)
-            statement_list()
+        with contextlib.ExitStack() as stack:
+            statement_lists: Iterable[StatementList]
+            # Get the compiled code. Large files and piped input are compiled
+            # statement by statement while they are being executed.
+            if isinstance(input_source, FileInputSource):
+                if input_source.stream or should_stream(input_source.file_path):
+                    file = stack.enter_context(open(input_source.file_path, "r", encoding="utf-8"))
+                    statement_lists = compile_stream(file)
+                else:
+                    statement_lists = [load_file(input_source.file_path)]
+            elif isinstance(input_source, StreamInputSource):
+                statement_lists = compile_stream(input_source.stream)
+            elif isinstance(input_source, TextInputSource):
+                statement_lists = [compile_source(input_source.text)]
+            else:
+                raise NotImplementedError
+
+            # Execute the code
+            with StackFrame(builtins_.create_locals_dict(), parent=current_stack_frame.get()):
+                execute_stream(statement_lists)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,255 @@
+"""Persistent cache of compiled MyLang modules.
+
+Parsing and transforming the source is by far the most expensive part of
+loading a module, so the resulting :class:`StatementList` is stored on disk,
+next to the source file, similar to Python's ``__pycache__``::
+
+    lib/foo.my
+    lib/__mylangcache__/foo.mylang-0.1.0.myc
+
+The name of the compiled file contains the version of the interpreter. The
+file starts with a header that records the size, modification time and hash of
+the source it was compiled from. If the size or modification time of the
+source changes, the source is hashed again, and recompiled only if its hash
+changed too.
+
+The statement list is serialized into nested tuples of Python primitives and
+stored with :mod:`marshal`.
+
+Set the ``MYLANG_NO_CACHE`` environment variable to a non-empty value in order
+to disable the cache.
+"""
+
+import hashlib
+import marshal
+import os
+import pathlib
+import struct
+
+from . import __version__
+from .stdlib.core import (
+    Args,
+    Array,
+    BinaryOperation,
+    Bool,
+    Dict,
+    Dots,
+    Float,
+    Int,
+    Null,
+    Path,
+    PostfixOperation,
+    PrefixOperation,
+    String,
+    Undefined,
+    null,
+    undefined,
+)
+from .stdlib.core import _release
+from .stdlib.core.base import mark_incomplete_positions
+from .stdlib.core.func import ExecutionBlock, StatementList
+
+
+__all__ = ("compile_source", "load_file", "cache_path", "dumps", "loads")
+
+
+CACHE_TAG = f"mylang-{__version__}"
+"""Identifies the interpreter version in names of compiled files."""
+CACHE_DIRNAME = "__mylangcache__"
+SUFFIX = ".myc"
+
+MAGIC = b"MYC\x02"
+"""Identifies the format of compiled files. Change it whenever the format changes."""
+
+_HEADER = struct.Struct(f"<{len(MAGIC)}sqq16s")
+"""Magic, source modification time (ns), source size and source hash."""
+
+
+def is_enabled() -> bool:
+    return not os.environ.get("MYLANG_NO_CACHE")
+
+
+def cache_path(path: str | os.PathLike) -> pathlib.Path:
+    """Get the path of the compiled file for the given source file."""
+    path = pathlib.Path(path)
+    return path.parent / CACHE_DIRNAME / f"{path.stem}.{CACHE_TAG}{SUFFIX}"
+
+
+def compile_source(code: str) -> StatementList:
+    """Parse and transform MyLang source code into an executable statement list."""
+    from .parser import get_parser
+    from .transformer import Transformer
+
+    return Transformer().transform(get_parser().parse(code, start="module"))
+
+
+def load_file(path: str | os.PathLike) -> StatementList:
+    """Get the compiled statement list of a MyLang source file.
+
+    The compiled file is used if it is up to date, otherwise the source is
+    compiled and the compiled file (re)written.
+    """
+    if not is_enabled():
+        with open(path, "r", encoding="utf-8") as f:
+            return compile_source(f.read())
+
+    compiled_path = cache_path(path)
+    stat = os.stat(path)
+    header, payload = _read_compiled(compiled_path)
+
+    if header is not None and (header[1], header[2]) == (stat.st_mtime_ns, stat.st_size):
+        return _load(payload)
+
+    with open(path, "rb") as f:
+        source = f.read()
+    digest = _hash(source)
+
+    if header is not None and header[3] == digest:
+        # Only the modification time changed, so just refresh the header
+        _write_compiled(compiled_path, _HEADER.pack(MAGIC, stat.st_mtime_ns, stat.st_size, digest) + payload)
+        return _load(payload)
+
+    statement_list = compile_source(source.decode("utf-8"))
+    _write_compiled(compiled_path, _HEADER.pack(MAGIC, stat.st_mtime_ns, stat.st_size, digest) + dumps(statement_list))
+    return statement_list
+
+
+def _load(payload: bytes) -> StatementList:
+    """Load a compiled statement list, validating it as the transformer does in release mode."""
+    statement_list = loads(payload)
+    if _release.release_mode:
+        _release.validate_statement_list(statement_list)
+    return statement_list
+
+
+def _hash(source: bytes) -> bytes:
+    return hashlib.blake2b(source, digest_size=16).digest()
+
+
+def _read_compiled(compiled_path: pathlib.Path):
+    """Read a compiled file and return its header and payload, or ``(None, None)``."""
+    try:
+        with open(compiled_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None, None
+
+    if len(data) < _HEADER.size or not data.startswith(MAGIC):
+        return None, None
+
+    return _HEADER.unpack_from(data), data[_HEADER.size :]
+
+
+def _write_compiled(compiled_path: pathlib.Path, data: bytes):
+    """Atomically write a compiled file. Failures are ignored, as the cache is just an optimization."""
+    tmp_path = compiled_path.with_name(f"{compiled_path.name}.{os.getpid()}.tmp")
+    try:
+        compiled_path.parent.mkdir(exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, compiled_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+# Serialization
+#
+# Scalars are represented by the equivalent Python objects, and every other
+# object by a tuple whose first item is one of the tags below.
+
+_UNDEFINED = 0
+_ARGS = 1
+_DICT = 2
+_ARRAY = 3
+_STATEMENT_LIST = 4
+_EXECUTION_BLOCK = 5
+_PATH = 6
+_DOTS = 7
+_PREFIX_OPERATION = 8
+_POSTFIX_OPERATION = 9
+_BINARY_OPERATION = 10
+
+_array_tags = {
+    StatementList: _STATEMENT_LIST,
+    ExecutionBlock: _EXECUTION_BLOCK,
+    Array: _ARRAY,
+}
+
+_array_types = {tag: cls for cls, tag in _array_tags.items()}
+
+
+def dumps(statement_list: StatementList) -> bytes:
+    """Serialize a compiled statement list."""
+    return marshal.dumps(_encode(statement_list))
+
+
+def loads(data: bytes) -> StatementList:
+    """Deserialize a statement list serialized by :func:`dumps`."""
+    return _decode(marshal.loads(data))
+
+
+def _encode(obj):
+    if isinstance(obj, String):
+        return obj.value
+    if isinstance(obj, (Bool, Int, Float)):
+        return obj.value
+    if isinstance(obj, Null):
+        return None
+    if isinstance(obj, Undefined):
+        return (_UNDEFINED,)
+    if isinstance(obj, Dict):
+        tag = _ARGS if isinstance(obj, Args) else _DICT
+        return (tag, *(_encode(item) for pair in obj._m_dict_.items() for item in pair))
+    if type(obj) in _array_tags:
+        return (_array_tags[type(obj)], *(_encode(item) for item in obj))
+    if isinstance(obj, Path):
+        return (_PATH, *(_encode(part) for part in obj.parts))
+    if isinstance(obj, Dots):
+        return (_DOTS, obj.count)
+    if isinstance(obj, PrefixOperation):
+        return (_PREFIX_OPERATION, str(obj.operator), _encode(obj.operand))
+    if isinstance(obj, PostfixOperation):
+        return (_POSTFIX_OPERATION, str(obj.operator), _encode(obj.operand))
+    if isinstance(obj, BinaryOperation):
+        return (_BINARY_OPERATION, str(obj.operator), *(_encode(operand) for operand in obj.operands))
+
+    raise TypeError(f"Cannot serialize object of type {type(obj).__name__}")
+
+
+def _decode(data):
+    if isinstance(data, str):
+        return String(data)
+    if isinstance(data, bool):
+        return Bool(data)
+    if isinstance(data, int):
+        return Int(data)
+    if isinstance(data, float):
+        return Float(data)
+    if data is None:
+        return null
+
+    tag, *fields = data
+    if tag == _UNDEFINED:
+        return undefined
+    if tag in (_ARGS, _DICT):
+        args = Args.from_dict({_decode(key): _decode(value) for key, value in zip(fields[::2], fields[1::2])})
+        return mark_incomplete_positions(args if tag == _ARGS else Dict(args))
+    if tag == _ARRAY:
+        return mark_incomplete_positions(Array.from_iterable(_decode(item) for item in fields))
+    if tag in _array_types:
+        return _array_types[tag].from_iterable(_decode(item) for item in fields)
+    if tag == _PATH:
+        return Path(Args(*(_decode(part) for part in fields)))
+    if tag == _DOTS:
+        return Dots(fields[0])
+    if tag == _PREFIX_OPERATION:
+        return PrefixOperation(fields[0], _decode(fields[1]))
+    if tag == _POSTFIX_OPERATION:
+        return PostfixOperation(fields[0], _decode(fields[1]))
+    if tag == _BINARY_OPERATION:
+        return BinaryOperation(fields[0], [_decode(operand) for operand in fields[1:]])
+
+    raise ValueError(f"Unknown tag in compiled data: {tag!r}")
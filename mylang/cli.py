@@ -3,8 +3,11 @@
 import abc
 import argparse
 import sys
+from typing import Optional, TextIO
 
-__all__ = ("CLI", "FileInputSource", "TextInputSource")
+from mylang.stdlib.core._compiler import ENGINES
+
+__all__ = ("CLI", "FileInputSource", "TextInputSource", "StreamInputSource")
 
 
 class InputSource(abc.ABC):
@@ -12,8 +15,9 @@ class InputSource(abc.ABC):
 
 
 class FileInputSource(InputSource):
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, stream: bool = False):
         self.file_path = file_path
+        self.stream = stream
 
 
 class TextInputSource(InputSource):
@@ -21,6 +25,11 @@ class TextInputSource(InputSource):
         self.text = text
 
 
+class StreamInputSource(InputSource):
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+
 class CLI:
     """Command line interface for MyLang."""
 
@@ -31,6 +40,25 @@ class CLI:
 
         self.parser.add_argument("file", nargs="?", help="File to execute (optional)")
 
+        self.parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Execute the file statement by statement while reading it (default for large files)",
+        )
+
+        self.parser.add_argument(
+            "--engine",
+            choices=ENGINES,
+            help="Engine that executes the code (default: $MYLANG_ENGINE or closure)",
+        )
+
+        self.parser.add_argument(
+            "--release",
+            action="store_true",
+            help="Run without the checks meant for development, validating statements once when compiled"
+            " (default if $MYLANG_RELEASE is set)",
+        )
+
         self._parsed_args: argparse.Namespace
 
     def parse(self):
@@ -50,10 +78,18 @@ class CLI:
             return TextInputSource(args.command)
 
         if args.file:
-            return FileInputSource(args.file)
+            return FileInputSource(args.file, stream=args.stream)
 
         if not sys.stdin.isatty():
-            return TextInputSource(sys.stdin.read())
+            return StreamInputSource(sys.stdin)
 
         # No arguments and stdin is a tty - start REPL
         return None
+
+    def get_engine(self) -> Optional[str]:
+        """Get the execution engine selected on the command line, if any."""
+        return self._parsed_args.engine
+
+    def get_release(self) -> bool:
+        """Whether release mode was selected on the command line."""
+        return self._parsed_args.release
@@ -0,0 +1,279 @@
+"""Incremental parsing of input that arrives piece by piece.
+
+Rather than parsing all of the input again each time more of it arrives, the
+state of an LALR parser is kept between pieces, so only the new text is lexed
+and fed to the parser. This keeps parsing linear in the size of the input,
+whether it is typed into the REPL line by line or streamed from a large file.
+
+Only the public API of Lark's interactive parser is used. The new text is
+lexed by the lexer of a new interactive parser, from the position up to which
+the text has been fed, which is kept track of here rather than in the state of
+Lark's lexer, as that state differs between versions of Lark.
+
+The LALR grammar accepts a few inputs that the Earley grammar, which is the
+reference implementation, rejects for their inline whitespace. So the text of
+each complete statement list can be parsed again by the Earley parser, which
+then builds its tree, while the LALR parser only tells where it ends.
+"""
+
+from lark import Lark, Token, Tree, UnexpectedEOF, UnexpectedInput
+from lark.parsers.lalr_analysis import Shift
+
+
+__all__ = ("IncrementalParser",)
+
+
+_SEPARATOR_TYPES = frozenset(("_SEP", "_NEWLINES"))
+"""Tokens that separate statements."""
+
+_GROWABLE_TOKEN_TYPES = _SEPARATOR_TYPES | {"_COMMA"}
+"""Tokens that may continue on the next line, as they absorb any blank lines and comments that follow them."""
+
+
+class IncrementalParser:
+    """Parser of statement lists for input that arrives piece by piece.
+
+    It can be used in either of two ways:
+
+    - :meth:`parse` is given all of the text entered so far, and parses it once
+      it forms a complete statement list. This is what the REPL does.
+    - :meth:`feed` is given consecutive lines of the input, and returns each
+      top-level statement as soon as it is complete, so that the input can be
+      executed while it is being read. :meth:`close` parses the rest of the
+      input at its end.
+    """
+
+    def __init__(self, parser: Lark, start: str = "statement_list", tree_parser: Lark | None = None):
+        """Initialize the parser.
+
+        Args:
+            parser: An LALR parser.
+            start: The start rule to parse. Must be a statement list.
+            tree_parser: A parser that parses the text of each complete
+                statement list again, to build its tree, e.g. the Earley
+                parser. By default, the tree built by ``parser`` is returned.
+        """
+        self._parser = parser
+        self._start = start
+        self._tree_parser = tree_parser
+        self.reset()
+
+    def reset(self):
+        """Discard the parsed input and start over."""
+        self._interactive = self._parser.parse_interactive("", start=self._start)
+        self._text = ""
+        self._position = 0
+        self._offset = 0
+        """Position of the current text in the whole input, as the text that has been fed is dropped."""
+        self._location = (1, 1)
+        """Line and column in the whole input of the current position."""
+        self._last_token: Token | None = None
+        self._tree_start = 0
+        """Position in the whole input where the statement list being parsed starts."""
+        self._tree_location = (1, 1)
+        """Line and column in the whole input where the statement list being parsed starts."""
+
+    @property
+    def position(self) -> int:
+        """Position in the current text up to which it has been fed to the parser."""
+        return self._position
+
+    def parse(self, text: str) -> Tree:
+        """Parse the text, if it is complete.
+
+        As long as the text extends the text given in the previous call, only
+        the new part of it is parsed. Otherwise (e.g. the input was edited or
+        discarded), parsing starts over.
+
+        Args:
+            text: The text entered so far.
+
+        Returns:
+            The parse tree. The parser is reset, ready for new input.
+
+        Raises:
+            UnexpectedEOF: If the text is incomplete. The parser keeps its state.
+            UnexpectedInput: If the text has a syntax error. The parser is reset.
+        """
+        if not text.startswith(self._text[: self.position]):
+            self.reset()
+        self._text = text
+
+        try:
+            pending = self._feed_tokens()
+            if pending is not None and not self._accepts(pending.type):
+                self._interactive.feed_token(pending)  # Raises the syntax error
+            if not self._accepts(*([pending.type] if pending is not None else []), "$END"):
+                expected = {name for name in self._interactive.choices() if name.isupper()}
+                raise UnexpectedEOF(expected, state=self._interactive.parser_state)
+            tree = self._finish(pending)
+        except UnexpectedEOF:
+            raise
+        except UnexpectedInput:
+            self.reset()
+            raise
+
+        self.reset()
+        return tree
+
+    def feed(self, text: str) -> list[Tree]:
+        """Feed the next part of the input.
+
+        Args:
+            text: One or more lines. Only the last line of the input may lack
+                a newline at its end.
+
+        Returns:
+            Parse trees of the top-level statements that the text completed, in
+            order, each as a statement list of its own.
+
+        Raises:
+            UnexpectedInput: If the input has a syntax error. The parser is reset.
+        """
+        # Drop the text that has already been fed, unless it is parsed again along with the rest of its statement list
+        drop = self._position if self._tree_parser is None else min(self._position, self._tree_start - self._offset)
+        self._offset += drop
+        self._text = self._text[drop:] + text
+        self._position -= drop
+
+        trees: list[Tree] = []
+        try:
+            self._feed_tokens(trees)
+        except UnexpectedInput:
+            self.reset()
+            raise
+        return trees
+
+    def close(self) -> list[Tree]:
+        """Parse the rest of the input at its end.
+
+        Returns:
+            Parse trees of the remaining top-level statements, if any. The
+            parser is reset, ready for new input.
+
+        Raises:
+            UnexpectedInput: If the input has a syntax error or is incomplete.
+        """
+        if not self._text.endswith("\n"):
+            # The last line may lack a newline
+            self._text += "\n"
+
+        trees: list[Tree] = []
+        try:
+            self._feed_tokens(trees, final=True)
+            if len(self._interactive.parser_state.state_stack) > 1:
+                trees.append(self._finish())
+        finally:
+            self.reset()
+        return trees
+
+    def _feed_tokens(self, trees: list[Tree] | None = None, final: bool = False) -> Token | None:
+        """Lex the current text from the current position and feed the tokens to the parser.
+
+        Args:
+            trees: If given, the statement list is finished at each top-level
+                separator, and its tree appended to ``trees``.
+            final: Whether the text is the whole rest of the input.
+
+        Returns:
+            The last token, if it is a separator that might still grow with the
+            next line. It has not been fed, and will be lexed again.
+        """
+        end = self._offset + len(self._text)
+        while True:
+            start, location = self._position, self._location
+            # The contextual lexer needs the state of the parser the tokens are fed to
+            lexer_thread = self._parser.parse_interactive(self._text[start:], start=self._start).lexer_thread
+            for token in lexer_thread.lex(self._interactive.parser_state):
+                self._locate(token, start, location)
+                if not final and token.type in _GROWABLE_TOKEN_TYPES and token.end_pos == end:
+                    self._position = token.start_pos - self._offset
+                    self._location = (token.line, token.column)
+                    return token
+                self._interactive.feed_token(token)
+                self._position = token.end_pos - self._offset
+                self._location = (token.end_line, token.end_column)
+                self._last_token = token
+
+                if trees is not None and token.type in _SEPARATOR_TYPES and self._accepts("$END"):
+                    trees.append(self._finish())
+                    # Go on with a new parser, from where the finished one stopped
+                    self._interactive = self._parser.parse_interactive("", start=self._start)
+                    break
+            else:
+                return None
+
+    def _locate(self, token: Token, start: int, location: tuple[int, int]):
+        """Turn the position of a token lexed from a position in the current text into one in the whole input.
+
+        Args:
+            token: The token, positioned relative to where the lexer started.
+            start: Position in the current text where the lexer started.
+            location: Line and column in the whole input where the lexer started.
+        """
+        line, column = location
+        if token.line == 1:
+            token.column += column - 1
+        if token.end_line == 1:
+            token.end_column += column - 1
+        token.line += line - 1
+        token.end_line += line - 1
+        token.start_pos += self._offset + start
+        token.end_pos += self._offset + start
+
+    def _finish(self, pending: Token | None = None) -> Tree:
+        """Feed the pending token, if any, and the end of input to the parser, and build the tree of what was fed."""
+        if pending is not None:
+            self._interactive.feed_token(pending)
+        last_token = pending or self._last_token
+        tree = self._interactive.feed_eof(last_token)
+        start, location = self._tree_start, self._tree_location
+        if last_token is not None:
+            self._tree_start, self._tree_location = last_token.end_pos, (last_token.end_line, last_token.end_column)
+        if self._tree_parser is not None:
+            try:
+                tree = self._tree_parser.parse(
+                    self._text[start - self._offset : self._tree_start - self._offset], start=self._start
+                )
+            except UnexpectedInput as e:
+                self._locate_error(e, start, location)
+                # The end of the input has been fed, so the parser can't go on
+                self.reset()
+                raise
+        return tree
+
+    @staticmethod
+    def _locate_error(error: UnexpectedInput, start: int, location: tuple[int, int]):
+        """Turn the position of a syntax error in text from a position in the whole input into one in the latter."""
+        line, column = location
+        if isinstance(error.line, int) and isinstance(error.column, int):
+            if error.line == 1:
+                error.column += column - 1
+            error.line += line - 1
+        if isinstance(error.pos_in_stream, int):
+            error.pos_in_stream += start
+
+    def _accepts(self, *token_types: str) -> bool:
+        """Check whether the parser would accept the token types, without changing its state.
+
+        Only the stack of LR states is simulated, which is cheap compared to
+        copying the parser along with the values on its stack.
+        """
+        parse_conf = self._interactive.parser_state.parse_conf
+        states = parse_conf.states
+        stack = list(self._interactive.parser_state.state_stack)
+        for token_type in token_types:
+            while True:
+                try:
+                    action, arg = states[stack[-1]][token_type]
+                except KeyError:
+                    return False
+                if action is Shift:
+                    stack.append(arg)
+                    break
+                if arg.expansion:
+                    del stack[-len(arg.expansion) :]
+                stack.append(states[stack[-1]][arg.origin.name][1])
+                if token_type == "$END" and stack[-1] == parse_conf.end_state:
+                    break
+        return True
@@ -1,10 +1,31 @@
-"""Parser module for MyLang using Lark."""
+"""Parser module for MyLang using Lark.
 
+Two parsing engines are available. The Earley engine works off ``mylang.lark``
+and is the reference implementation of the grammar. The LALR engine works off
+``mylang_lalr.lark``, which produces the same trees, but is parsed in linear
+time using Lark's contextual lexer.
+
+Source code is parsed by the Earley engine, as the LALR grammar still accepts
+a few inputs that the reference grammar rejects for their inline whitespace
+(see ``mylang_lalr.lark``). Input that arrives piece by piece, in the REPL or
+when streamed, is split into statement lists by the LALR engine, which can be
+fed incrementally, and each is then parsed by the Earley engine (see
+:mod:`mylang.incremental`).
+
+Parsers are only built when first requested. The LALR parser is also
+serialized by Lark's cache facility, so that the grammar analysis is done only
+once, rather than each time the interpreter starts.
+"""
+
+import functools
 from pathlib import Path
-from lark import Lark
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from lark import Lark
 
 
-__all__ = ("parser",)
+__all__ = ("create_parser", "get_parser", "ENGINES")
 
 
 _start = [
@@ -20,9 +41,44 @@ _start = [
     "path",
 ]
 
-with open(Path(__file__).parent.absolute() / "mylang.lark", encoding="utf-8") as f:
-    parser = Lark(
-        f,
-        # parser="lalr",
-        start=_start,
-    )
+ENGINES = ("earley", "lalr")
+"""Names of the available parsing engines."""
+
+_grammar_files = {
+    "earley": "mylang.lark",
+    "lalr": "mylang_lalr.lark",
+}
+
+
+def create_parser(engine: Literal["earley", "lalr"] = "earley", cache: bool = False) -> "Lark":
+    """Create a MyLang parser that uses the given parsing engine.
+
+    Args:
+        engine: Either ``"earley"`` or ``"lalr"``.
+        cache: Load the parser from (and save it to) Lark's cache, if possible.
+            Only supported by the LALR engine.
+
+    Returns:
+        A Lark parser that accepts any rule in ``_start`` as its start rule.
+    """
+    from lark import Lark
+
+    if engine not in _grammar_files:
+        raise ValueError(f"Unknown parsing engine: {engine!r}; expected one of {ENGINES}")
+    options = {"parser": "lalr", "lexer": "contextual", "cache": cache} if engine == "lalr" else {}
+    with open(Path(__file__).parent.absolute() / _grammar_files[engine], encoding="utf-8") as f:
+        return Lark(f, start=_start, **options)
+
+
+@functools.cache
+def get_parser(engine: Literal["earley", "lalr"] = "earley") -> "Lark":
+    """Get the shared parser for the given engine, creating it on first use."""
+    return create_parser(engine, cache=engine == "lalr")
+
+
+def __getattr__(name: str):
+    # Kept for code that imports `parser`, which is the default parser, built
+    # when first imported; new code should call `get_parser` instead
+    if name == "parser":
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,7 +9,8 @@ Importing this module makes the built-in objects available in the current contex
 from .core._context import LocalsDict
 from .core import *
 from .core import op, Object, String
-from .io import echo
+# The builtins are collected from the globals of this module
+from .io import echo, lines  # noqa: F401
 from .doc import doc
 
 
@@ -38,6 +38,10 @@ from .flow import if_, return_, loop, while_, break_, continue_, throw, try_, fo
 from .class_ import class_
 from .error import Error, error
 from .special import Symbol, symbol, Ref
+from .range_ import Range
+from .generator import Generator, yield_
+from .iteration import Stream, map_, filter_, take, drop, zip_, enumerate_, reduce, collect
+from .numarray import NumArray, sum_, min_, max_, mean
 from .context import Context, context
 
 __all__ = (
@@ -73,6 +77,23 @@ __all__ = (
     "get",
     "use",
     "Ref",
+    "Range",
+    "Generator",
+    "yield_",
+    "Stream",
+    "map_",
+    "filter_",
+    "take",
+    "drop",
+    "zip_",
+    "enumerate_",
+    "reduce",
+    "collect",
+    "NumArray",
+    "sum_",
+    "min_",
+    "max_",
+    "mean",
     "export",
     "StatementList",
     "ExecutionBlock",
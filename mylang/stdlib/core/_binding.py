@@ -0,0 +1,95 @@
+"""Binding of the arguments of a call to the parameters of a function.
+
+The parameters of a function are :class:`~.base.Args` whose positional values
+are the keys of the positional parameters, and whose keyed items are the keys
+of the keyed parameters with their default values. A :class:`BindingPlan`
+splits them once, when the function is defined, so that binding the
+arguments of each call only walks the parameters. The slots of the
+parameters are found when the function is first called with slotted locals.
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+
+if TYPE_CHECKING:
+    from ._context import LocalsDict, SlotLayout, SlotLocals
+    from ._utils.types import AnyObject
+    from .base import Args
+
+
+__all__ = ("BindingPlan",)
+
+
+class BindingPlan:
+    """How to bind the arguments of a call to the parameters of a function."""
+
+    __slots__ = ("name", "positional", "keyed", "_layout", "_slots")
+
+    def __init__(self, parameters: "Args", name: "Optional[AnyObject]" = None):
+        """
+        Args:
+            parameters: The parameters of the function.
+            name: The name of the function, for error messages.
+        """
+        self.name = name
+        self.positional: tuple["AnyObject", ...] = parameters.positional_values()
+        """The keys of the positional parameters."""
+        self.keyed: dict["AnyObject", "AnyObject"] = parameters.keyed_dict()
+        """The keys of the keyed parameters, with their default values."""
+        self._layout: "Optional[SlotLayout]" = None
+        self._slots: Optional[tuple[tuple[int, ...], tuple[int, ...]]] = None
+        """The slots of the positional and keyed parameters in ``_layout``."""
+
+    def bind(self, locals_: "LocalsDict", args: "Args"):
+        """Assign the arguments to the parameters in the locals of the called function."""
+        positional_args = args.positional_values()
+        if len(positional_args) != len(self.positional):
+            self._raise_arity_error(len(positional_args))
+        for key, value in zip(self.positional, positional_args):
+            locals_[key] = value
+        if self.keyed:
+            keyed_args = args.keyed_dict()
+            for key, default_value in self.keyed.items():
+                locals_[key] = keyed_args.get(key, default_value)
+
+    def bind_slots(self, locals_: "SlotLocals", args: "Args"):
+        """Assign the arguments to the parameters in the slots of new locals, or in their keys if they have none."""
+        if locals_.layout is not self._layout:
+            self._layout = locals_.layout
+            self._slots = self._find_slots(locals_.layout)
+        if self._slots is None:
+            self.bind(locals_, args)
+            return
+
+        positional_slots, keyed_slots = self._slots
+        positional_args = args.positional_values()
+        if len(positional_args) != len(positional_slots):
+            self._raise_arity_error(len(positional_args))
+        slots = locals_.slots
+        for index, value in zip(positional_slots, positional_args):
+            slots[index] = value
+        if keyed_slots:
+            keyed_args = args.keyed_dict()
+            for index, (key, default_value) in zip(keyed_slots, self.keyed.items()):
+                slots[index] = keyed_args.get(key, default_value)
+
+    def _find_slots(self, layout: "SlotLayout") -> Optional[tuple[tuple[int, ...], tuple[int, ...]]]:
+        """Get the slots of the parameters in a layout, or None unless they all have one."""
+        positional_slots = tuple(layout.index(key) for key in self.positional)
+        keyed_slots = tuple(layout.index(key) for key in self.keyed)
+        if None in positional_slots or None in keyed_slots:
+            return None
+        return positional_slots, keyed_slots  # type: ignore[return-value]
+
+    def _raise_arity_error(self, count: int):
+        from .error import Error
+
+        name = "Function" if self.name is None else str(self.name)
+        expected = len(self.positional)
+        raise Error(
+            f"{name} takes {expected} positional argument{'' if expected == 1 else 's'} but {count}"
+            f" {'was' if count == 1 else 'were'} given"
+        )
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.positional!r}, {self.keyed!r})"
@@ -0,0 +1,324 @@
+"""Compilation of statement lists to Python closures.
+
+The tree-walking engine interprets each statement anew every time it is
+executed: it converts the statement to :class:`Args`, searches it for
+incomplete expressions by reflection (see
+:meth:`IncompleteExpression.evaluate_all_in_object`) and checks whether it is
+an assignment, before dispatching it to :class:`set_` or :class:`call`.
+
+The closure engine does this analysis only once per statement list, the first
+time it is executed, and turns each statement into a closure that is
+specialized for it. Parts of the statement that evaluate to themselves are
+kept as they are, and only the parts that actually need to be evaluated are
+visited when the closure is called. The result is the same as with the
+tree-walking engine, including the order in which the expressions are
+evaluated.
+
+The engine is selected with :data:`current_engine`, whose default can be set
+with the ``MYLANG_ENGINE`` environment variable.
+"""
+
+import copy
+import os
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+from .base import Args, Array, BinaryOperation, Dict, IncompleteExpression, Object, UnaryOperation
+from .complex import Dots, Path, String
+from .primitive import Bool, Float, Int, Null, Undefined
+
+
+if TYPE_CHECKING:
+    from ._context import StackFrame
+    from ._inline_cache import CallSiteCache
+    from ._utils.types import AnyObject
+
+
+__all__ = ("ENGINES", "current_engine", "compile_expression", "compile_statement_list", "needs_evaluation")
+
+
+ENGINES = ("closure", "tree", "vm")
+"""Names of the execution engines. The ``vm`` engine is the bytecode interpreter in :mod:`mylang.vm`."""
+
+
+def _default_engine() -> str:
+    engine = os.environ.get("MYLANG_ENGINE", ENGINES[0])
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r} in MYLANG_ENGINE, expected one of: {', '.join(ENGINES)}")
+    return engine
+
+
+current_engine = ContextVar[str]("engine", default=_default_engine())
+"""The engine that executes statement lists, one of :data:`ENGINES`."""
+
+
+CompiledStatement = Callable[["StackFrame"], Object]
+"""A compiled statement.
+
+Executes the statement in the current stack frame, which it is given, and returns its result.
+"""
+
+_Thunk = Callable[[], "AnyObject"]
+"""Evaluates a part of a statement."""
+
+_SELF_EVALUATING_TYPES = frozenset((String, Int, Float, Bool, Null, Undefined, Dots))
+"""Types of objects that don't contain anything to evaluate."""
+
+
+def compile_statement_list(statements: Iterable[Object]) -> tuple[CompiledStatement, ...]:
+    """Compile the statements of a statement list.
+
+    Args:
+        statements: The statements, each an :class:`Args` or an expression.
+
+    Returns:
+        A compiled statement for each of the statements.
+    """
+    return tuple(_compile_statement(statement) for statement in statements)
+
+
+def compile_expression(obj: "AnyObject") -> _Thunk:
+    """Compile the evaluation of an expression, e.g. a condition, as done by the tree-walking engine."""
+    evaluate = _compile(obj)
+    return evaluate if evaluate is not None else lambda: obj
+
+
+def needs_evaluation(obj: "AnyObject") -> bool:
+    """Whether evaluating the object may give anything other than the object itself."""
+    return _compile(obj) is not None
+
+
+def _compile_statement(statement: Object) -> CompiledStatement:
+    from ._inline_cache import CallSiteCache
+    from .func import call, set_
+    from .special import Ref
+
+    classcall = call._m_classcall_
+    set_ref = Ref.to(set_)
+    zero = Int(0)
+
+    # Make sure an expression is converted to Args. If already Args, only
+    # positional arguments are renumbered.
+    items = Args(statement)._m_dict_
+    evaluate_items = _compile_items(items)
+
+    def evaluated_items() -> dict:
+        if evaluate_items is not None and (new_items := evaluate_items()) is not None:
+            return new_items
+        return items.copy()
+
+    # Keys that are evaluated to themselves or to a path tell already whether
+    # the statement is an assignment
+    if all(type(key) in _SELF_EVALUATING_TYPES or type(key) is Path for key in items):
+        if _args(items).is_keyed_only():
+
+            def execute_assignment(frame: "StackFrame"):
+                return classcall(_args({zero: set_ref} | evaluated_items()), frame=frame)
+
+            return execute_assignment
+
+        if type(items.get(zero)) is String:
+            # The function key is always the same
+            cache = CallSiteCache(items[zero])
+
+            def execute_cached_call(frame: "StackFrame"):
+                return classcall(_args(evaluated_items()), cache, frame=frame)
+
+            return _compile_tail_call(items, cache, execute_cached_call) or execute_cached_call
+
+        def execute_call(frame: "StackFrame"):
+            return classcall(_args(evaluated_items()), frame=frame)
+
+        return execute_call
+
+    def execute(frame: "StackFrame"):
+        args = _args(evaluated_items())
+        if args.is_keyed_only():
+            return classcall(_args({zero: set_ref} | args._m_dict_), frame=frame)
+        return classcall(args, frame=frame)
+
+    return execute
+
+
+def _compile_tail_call(
+    items: dict, return_cache: "CallSiteCache", execute_return: CompiledStatement
+) -> Optional[CompiledStatement]:
+    """Compile the statement ``return {f ...}`` to return a tail call, if it's a call of a function by name.
+
+    The tail call (see :class:`.func.TailCall`) is returned only where the
+    function executing in the stack frame accepts it, and if ``f`` is a function
+    defined in MyLang. Otherwise, the statement is executed by
+    ``execute_return``. The arguments are evaluated in the current scope,
+    where the execution block would look them up.
+    """
+    from ._inline_cache import CallSiteCache
+    from .flow import return_
+    from .func import TailCall, fun, tail_call_items
+
+    call_items = tail_call_items(items)
+    if call_items is None:
+        return None
+    function_cache = CallSiteCache(call_items[Int(0)])
+    evaluate_call_items = _compile_items(call_items)
+
+    def execute_tail_call(frame: "StackFrame"):
+        if (
+            frame.accepts_tail_call
+            and frame.catch_spec is None
+            and return_cache.lookup(frame.lexical_scope) is return_
+            and type(function := function_cache.lookup(frame.lexical_scope)) is fun
+        ):
+            new_items = evaluate_call_items() if evaluate_call_items is not None else None
+            frame.return_value = tail_call = TailCall(function, _args(call_items if new_items is None else new_items))
+            return tail_call
+        return execute_return(frame)
+
+    return execute_tail_call
+
+
+def _compile(obj: "AnyObject") -> Optional[_Thunk]:
+    """Compile the evaluation of an object, as done by :meth:`IncompleteExpression.evaluate_all_in_object`.
+
+    Returns:
+        A function that evaluates the object, or None if the object evaluates
+        to itself.
+    """
+    from .func import StatementList
+
+    if isinstance(obj, IncompleteExpression):
+        if isinstance(obj, BinaryOperation):
+            return _compile_binary_operation(obj)
+        if isinstance(obj, UnaryOperation):
+            return _compile_unary_operation(obj)
+        return obj.evaluate
+
+    if isinstance(obj, StatementList):
+        return None
+
+    type_ = type(obj)
+    if type_ in _SELF_EVALUATING_TYPES:
+        return None
+    if type_ is Path:
+        return _compile_path(obj)
+    if type_ is Dict or type_ is Args:
+        return _compile_dict(obj)
+    if type_ is Array:
+        return _compile_array(obj)
+
+    # Anything else, e.g. objects that were put in a statement at runtime, is
+    # inspected each time
+    return lambda: IncompleteExpression.evaluate_all_in_object(obj)
+
+
+def _compile_binary_operation(operation: BinaryOperation) -> _Thunk:
+    call_op = operation._function or operation._call_op
+    operands = tuple((operand, _compile(operand)) for operand in operation.operands)
+
+    if len(operands) == 2:
+        (left, evaluate_left), (right, evaluate_right) = operands
+
+        def evaluate_binary_operation():
+            return call_op(
+                left if evaluate_left is None else evaluate_left(),
+                right if evaluate_right is None else evaluate_right(),
+            )
+
+        return evaluate_binary_operation
+
+    def evaluate_operation():
+        return call_op(*[operand if evaluate is None else evaluate() for operand, evaluate in operands])
+
+    return evaluate_operation
+
+
+def _compile_unary_operation(operation: UnaryOperation) -> _Thunk:
+    call_op = operation._function or operation._call_op
+    operand = operation.operand
+    evaluate_operand = _compile(operand)
+
+    if evaluate_operand is None:
+        return lambda: call_op(operand)
+    return lambda: call_op(evaluate_operand())
+
+
+def _compile_path(path: Path) -> _Thunk:
+    # A path is always evaluated to a new one, even if none of its parts change
+    parts = tuple((part, _compile(part)) for part in path.parts)
+    return lambda: Path(*[part if evaluate is None else evaluate() for part, evaluate in parts])
+
+
+def _compile_items(items: dict) -> Optional[Callable[[], Optional[dict]]]:
+    """Compile the evaluation of the keys and values of a dictionary.
+
+    Returns:
+        A function that returns a copy of the dictionary with the evaluated
+        keys and values (or None if they are all unchanged), or None if there
+        is nothing to evaluate in the dictionary.
+    """
+    compiled_items = tuple((key, _compile(key), value, _compile(value)) for key, value in items.items())
+    dynamic_items = tuple(item for item in compiled_items if item[1] is not None or item[3] is not None)
+    if not dynamic_items:
+        return None
+
+    def evaluate_items() -> Optional[dict]:
+        new_items = None
+        for key, evaluate_key, value, evaluate_value in dynamic_items:
+            new_key = key if evaluate_key is None else evaluate_key()
+            new_value = value if evaluate_value is None else evaluate_value()
+            if new_key is not key or new_value is not value:
+                if new_items is None:
+                    new_items = items.copy()
+                if new_key is not key:
+                    # As with the tree-walking engine, a changed key moves to the end
+                    del new_items[key]
+                new_items[new_key] = new_value
+        return new_items
+
+    return evaluate_items
+
+
+def _compile_dict(dict_: Dict) -> Optional[_Thunk]:
+    evaluate_items = _compile_items(dict_._m_dict_)
+    if evaluate_items is None:
+        return None
+
+    def evaluate_dict():
+        new_items = evaluate_items()
+        if new_items is None:
+            return dict_
+        new_dict = copy.copy(dict_)
+        new_dict._m_dict_ = new_items
+        return new_dict
+
+    return evaluate_dict
+
+
+def _compile_array(array: Array) -> Optional[_Thunk]:
+    items = array._m_array_
+    dynamic_items = tuple(
+        (i, item, evaluate) for i, item in enumerate(items) if (evaluate := _compile(item)) is not None
+    )
+    if not dynamic_items:
+        return None
+
+    def evaluate_array():
+        new_items = None
+        for i, item, evaluate in dynamic_items:
+            new_item = evaluate()
+            if new_item is not item:
+                if new_items is None:
+                    new_items = items.copy()
+                new_items[i] = new_item
+        if new_items is None:
+            return array
+        new_array = copy.copy(array)
+        new_array._m_array_ = new_items
+        return new_array
+
+    return evaluate_array
+
+
+def _args(items: dict) -> Args:
+    args = Args.__new__(Args)
+    args._m_dict_ = items
+    return args
@@ -2,7 +2,11 @@
 
 from contextlib import contextmanager
 import dataclasses
-from typing import TYPE_CHECKING, Any, Optional, TypeVar
+import functools
+import itertools
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, TypeVar
 
 from ._utils.types import IdentityDict
 from .base import Object
@@ -15,6 +19,13 @@ if TYPE_CHECKING:
 
 
 class LocalsDict(IdentityDict[Any, "AnyObject"]):
+    observed = False
+    """Whether a call site cache has looked up a key past these locals (see :mod:`._inline_cache`).
+
+    A key bound anew in observed locals may shadow a cached function, so it
+    increments :attr:`LexicalScope.version`.
+    """
+
     def __contains__(self, key, /) -> bool:
         from ._utils import python_obj_to_mylang
 
@@ -28,7 +39,147 @@ class LocalsDict(IdentityDict[Any, "AnyObject"]):
     def __setitem__(self, key, value, /):
         from ._utils import python_obj_to_mylang
 
-        self._dict[self._KeyWrapper(python_obj_to_mylang(key))] = value
+        wrapped_key = self._KeyWrapper(python_obj_to_mylang(key))
+        if self.observed and wrapped_key not in self._dict:
+            LexicalScope.version += 1
+        self._dict[wrapped_key] = value
+
+    def setter(self, key, /) -> Callable[[Any], None]:
+        """Get a function that assigns a key, without looking up its place each time.
+
+        The key must already be bound, as the function doesn't account for
+        :attr:`observed`. Meant for assigning the same key over and over, e.g.
+        the variable of a loop.
+        """
+        from ._utils import python_obj_to_mylang
+
+        return functools.partial(self._dict.__setitem__, self._KeyWrapper(python_obj_to_mylang(key)))
+
+    def _lookup(self, key: "AnyObject", wrapped_key: IdentityDict._KeyWrapper, /) -> Any:
+        """Get the value of a key that was already converted to MyLang, or :data:`UNBOUND`."""
+        _ = key
+        return self._dict.get(wrapped_key, UNBOUND)
+
+
+class _Unbound:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<unbound>"
+
+
+UNBOUND = _Unbound()
+"""The value of a slot whose key has not been assigned yet."""
+
+
+class SlotLayout:
+    """The keys that :class:`SlotLocals` store in slots, and the index of each key's slot.
+
+    Layouts are computed once per scope of the compiled code (see
+    :mod:`mylang.vm.compiler`), so that the code can access the slots by index.
+    Like :class:`LocalsDict`, keys are compared by identity.
+    """
+
+    __slots__ = ("keys", "_indexes")
+
+    def __init__(self, keys: Iterable["AnyObject"] = ()):
+        self.keys: list["AnyObject"] = []
+        self._indexes: dict[int, int] = {}
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: "AnyObject") -> int:
+        """Get the index of the key's slot, adding a slot for it if needed."""
+        index = self._indexes.get(id(key))
+        if index is None:
+            index = self._indexes[id(key)] = len(self.keys)
+            self.keys.append(key)
+        return index
+
+    def index(self, key: "AnyObject") -> Optional[int]:
+        """Get the index of the key's slot, or None if it has none."""
+        return self._indexes.get(id(key))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.keys!r})"
+
+
+class SlotLocals(LocalsDict):
+    """Locals that store the keys of a layout in a list of slots, and any other key in a dictionary.
+
+    The slots can be accessed directly by index, without hashing the key.
+    Whoever assigns a key that has a slot, assigns the slot.
+    """
+
+    __slots__ = ("layout", "slots")
+
+    def __init__(self, layout: SlotLayout):
+        super().__init__()
+        self.layout = layout
+        self.slots: list[Any] = [UNBOUND] * len(layout)
+        """The values of the keys in the layout, or :data:`UNBOUND`."""
+
+    def __contains__(self, key, /) -> bool:
+        from ._utils import python_obj_to_mylang
+
+        key = python_obj_to_mylang(key)
+        index = self.layout.index(key)
+        if index is None:
+            return self._KeyWrapper(key) in self._dict
+        return self.slots[index] is not UNBOUND
+
+    def __getitem__(self, key, /):
+        from ._utils import python_obj_to_mylang
+
+        key = python_obj_to_mylang(key)
+        index = self.layout.index(key)
+        if index is None:
+            return self._dict[self._KeyWrapper(key)]
+        value = self.slots[index]
+        if value is UNBOUND:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value, /):
+        from ._utils import python_obj_to_mylang
+
+        key = python_obj_to_mylang(key)
+        index = self.layout.index(key)
+        if index is None:
+            super().__setitem__(key, value)
+        else:
+            if self.observed and self.slots[index] is UNBOUND:
+                LexicalScope.version += 1
+            self.slots[index] = value
+
+    def setter(self, key, /) -> Callable[[Any], None]:
+        from ._utils import python_obj_to_mylang
+
+        index = self.layout.index(python_obj_to_mylang(key))
+        if index is None:
+            return super().setter(key)
+        return functools.partial(self.slots.__setitem__, index)
+
+    def _lookup(self, key: "AnyObject", wrapped_key: IdentityDict._KeyWrapper, /) -> Any:
+        index = self.layout.index(key)
+        if index is None:
+            return self._dict.get(wrapped_key, UNBOUND)
+        return self.slots[index]
+
+    def dict(self):
+        return {key: value for key, value in zip(self.layout.keys, self.slots) if value is not UNBOUND} | super().dict()
+
+    def values(self):
+        return self.dict().values()
+
+    def __eq__(self, other: object) -> bool:
+        return LocalsDict(self.dict()) == other
+
+
+_scope_serials = itertools.count()
 
 
 class LexicalScope:
@@ -37,7 +188,14 @@ class LexicalScope:
     It represents all the key-value pairs available in the current lexical scope.
     """
 
-    __slots__ = ("locals", "parent", "custom_data")
+    __slots__ = ("locals", "parent", "custom_data", "serial", "captured")
+
+    version = 0
+    """Incremented whenever a key that may shadow a cached function is bound, or a module is used.
+
+    Call site caches (see :mod:`._inline_cache`) look up their function again
+    when the version changes.
+    """
 
     def __init__(
         self,
@@ -53,17 +211,34 @@ class LexicalScope:
 
         Useful for context flow statements to communicate with each other.
         """
+        self.serial = next(_scope_serials)
+        """Identifies this use of the lexical scope, as a recycled one is used anew (see :meth:`StackFrame.release`)."""
+        self.captured = False
+        """Whether something may use the lexical scope after its stack frame is released, see :meth:`capture`."""
+
+    def capture(self):
+        """Mark the lexical scope and its parents as used past their stack frames, e.g. by a closure.
+
+        :meth:`StackFrame.release` doesn't recycle the stack frames of captured
+        lexical scopes.
+        """
+        scope: Optional[LexicalScope] = self
+        while scope is not None and not scope.captured:
+            scope.captured = True
+            scope = scope.parent
 
     def __getitem__(self, key: Any) -> "AnyObject":
         from ._utils import python_obj_to_mylang
 
         key = python_obj_to_mylang(key)
-        if key in self.locals:
-            return self.locals[key]
-        elif self.parent is not None:
-            return self.parent[key]
-        else:
-            raise KeyError(f"Key {key!r} not found in lexical scope.")
+        wrapped_key = IdentityDict._KeyWrapper(key)
+        scope: Optional[LexicalScope] = self
+        while scope is not None:
+            value = scope.locals._lookup(key, wrapped_key)
+            if value is not UNBOUND:
+                return value
+            scope = scope.parent
+        raise KeyError(f"Key {key!r} not found in lexical scope.")
 
     def add_above(self, locals_: LocalsDict) -> "LexicalScope":
         """Create a new lexical scope with the given locals and insert it above
@@ -95,7 +270,10 @@ class StackFrame:
         "lexical_scope",
         "return_value",
         "depth",
+        "loop_depth",
         "catch_spec",
+        "captured",
+        "accepts_tail_call",
         "_reset_token",
         "__weakref__",
     )
@@ -115,10 +293,65 @@ class StackFrame:
         )
         self.return_value: Optional[Object] = None
         self.depth = self.parent.depth + 1 if self.parent is not None else 0
+        self.loop_depth = 0
+        """The number of loops executing in the stack frame. Loop control statements are only valid inside one."""
         self.catch_spec: Optional[CatchSpec] = None
+        self.captured = False
+        """Whether something may use the stack frame after it is released, see :meth:`capture`."""
+        self.accepts_tail_call = False
+        """Whether ``return {f ...}`` in the stack frame may return a tail call for the function executing in it to
+        make (see :meth:`.func.fun._m_call_`)."""
         self._reset_token = None
         """The reset token for the context variable."""
 
+    @classmethod
+    def acquire(cls, locals_: Optional[LocalsDict] = None, parent: Optional["StackFrame"] = None) -> "StackFrame":
+        """Create a stack frame with its own lexical scope, recycling one the current thread released, if any."""
+        free = _stack_frame_pool.free
+        if not free:
+            return cls(locals_, parent)
+        self = free.pop()
+        self.locals = locals_ = locals_ or LocalsDict()
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.loop_depth = 0
+        self.accepts_tail_call = False
+        lexical_scope = self.lexical_scope
+        lexical_scope.locals = locals_
+        lexical_scope.serial = next(_scope_serials)
+        return self
+
+    def release(self):
+        """Let :meth:`acquire` recycle the stack frame and its lexical scope, unless either is captured.
+
+        Called once the code executing in the stack frame has returned. Whatever
+        uses the stack frame or its lexical scope after that must capture it
+        (see :meth:`capture` and :meth:`LexicalScope.capture`), e.g. a closure
+        or a generator. A stack frame that an error is raised through is not
+        released, so the error may reference it.
+        """
+        lexical_scope = self.lexical_scope
+        if self.captured or lexical_scope.captured:
+            return
+        free = _stack_frame_pool.free
+        if len(free) < max_free_stack_frames:
+            if lexical_scope.custom_data:
+                lexical_scope.custom_data = {}
+            lexical_scope.locals = lexical_scope.parent = None  # type: ignore[assignment]
+            self.locals = self.parent = self.return_value = self.catch_spec = self._reset_token = None  # type: ignore
+            free.append(self)
+
+    def capture(self):
+        """Mark the stack frame, its parents and their lexical scopes as used after they are released.
+
+        :meth:`release` doesn't recycle captured stack frames.
+        """
+        stack_frame: Optional[StackFrame] = self
+        while stack_frame is not None and not stack_frame.captured:
+            stack_frame.captured = True
+            stack_frame.lexical_scope.capture()
+            stack_frame = stack_frame.parent
+
     def set_parent_lexical_scope(self, parent: Optional[LexicalScope]):
         """Set the parent lexical scope of this stack frame's lexical scope."""
         self.lexical_scope.parent = parent
@@ -151,6 +384,47 @@ class StackFrame:
 current_stack_frame = ContextVar[StackFrame]("stack_frame", default=None)  # type: ignore
 """The current stack frame."""
 
+max_free_stack_frames = 64
+"""How many released stack frames each thread keeps for :meth:`StackFrame.acquire` to recycle."""
+
+
+class _StackFramePool(threading.local):
+    """The stack frames released by a thread, which only it recycles."""
+
+    def __init__(self):
+        self.free: list[StackFrame] = []
+
+
+_stack_frame_pool = _StackFramePool()
+
+
+def _default_max_stack_depth() -> int:
+    value = os.environ.get("MYLANG_MAX_STACK_DEPTH", "100000")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"MYLANG_MAX_STACK_DEPTH must be an integer, got {value!r}") from None
+
+
+max_stack_depth = ContextVar[int]("max_stack_depth", default=_default_max_stack_depth())
+"""The maximum depth of nested stack frames for calling a function.
+
+The VM nests calls on a call stack of its own, so only this limits it. The
+closure and tree engines nest them on the Python stack, which may be exhausted
+first. With every engine, a function called by ``return {f ...}`` replaces the
+caller's stack frame rather than nesting in it.
+
+Its default can be set with the ``MYLANG_MAX_STACK_DEPTH`` environment variable.
+"""
+
+
+def check_stack_depth(stack_frame: StackFrame):
+    """Raise an error if the stack frame of a called function is nested deeper than :data:`max_stack_depth`."""
+    if stack_frame.depth > (limit := max_stack_depth.get()):
+        from .error import Error
+
+        raise Error(f"Maximum stack depth of {limit} exceeded")
+
 
 internal_module_bridge = ContextVar[LexicalScope | None](
     "internal_module_bridge",
@@ -185,5 +459,11 @@ TypeContextVarValue = TypeVar("TypeContextVarValue")
 @contextmanager
 def nested_stack_frame(locals_: Optional[LocalsDict] = None, lexical_scope: Optional[LexicalScope] = None):
     this_stack_frame = current_stack_frame.get()
-    with StackFrame(locals_, parent=this_stack_frame, lexical_scope=lexical_scope) as new_stack_frame:
+    if lexical_scope is None:
+        new_stack_frame = StackFrame.acquire(locals_, parent=this_stack_frame)
+    else:
+        new_stack_frame = StackFrame(locals_, parent=this_stack_frame, lexical_scope=lexical_scope)
+    with new_stack_frame:
         yield new_stack_frame
+    if lexical_scope is None:
+        new_stack_frame.release()
@@ -0,0 +1,113 @@
+"""Inline caches for the functions called by statements.
+
+Each time a statement is executed, :class:`~.func.call` looks up the function
+by its key in the lexical scope, unwraps references, and inspects the
+function to find out how to call it. A :class:`CallSiteCache` is attached to
+a call site, i.e. a statement whose function key is known before it is
+executed, and remembers both.
+
+The function found in a lexical scope is used again in the same lexical scope,
+e.g. by the next iteration of a loop, as long as:
+
+- the key is still bound to it in the locals it was found in, and
+- no key was bound anew in the locals searched before them, which could shadow
+  it. Those locals are marked as observed, and binding a new key in observed
+  locals (with ``set``, ``fun``, ``for``...) or using a module increments
+  :attr:`LexicalScope.version`.
+
+How to call a function is remembered for the last few functions called at the
+call site, so it is not recomputed when the same call site calls different
+functions, e.g. in a function body called with different lexical scopes.
+"""
+
+from typing import TYPE_CHECKING, Callable, Optional
+
+from ._context import UNBOUND, LexicalScope, LocalsDict
+from ._utils.types import IdentityDict
+
+
+if TYPE_CHECKING:
+    from ._utils.types import AnyObject
+
+
+__all__ = ("CallSiteCache",)
+
+
+class CallSiteCache:
+    """The cache of a call site, whose function key is a known string."""
+
+    __slots__ = ("key", "_wrapped_key", "_serial", "_version", "_locals", "_value", "_function", "_dispatch")
+
+    MAX_FUNCTIONS = 4
+    """How many functions to remember how to call. A call site that calls more is not cached any further."""
+
+    def __init__(self, key: "AnyObject"):
+        self.key = key
+        self._wrapped_key = IdentityDict._KeyWrapper(key)
+        self._serial = -1
+        """The serial of the lexical scope of the last lookup, which identifies it without keeping it alive."""
+        self._version = -1
+        self._locals: Optional[LocalsDict] = None
+        """The locals the key was found in."""
+        self._value: "AnyObject" = None
+        """The value of the key in those locals."""
+        self._function: "AnyObject" = None
+        """The function to call, i.e. the value, unless it is a reference."""
+        self._dispatch: dict[int, tuple[Callable, bool, bool]] = {}
+        """How to call each function, by function id."""
+
+    def lookup(self, scope: LexicalScope) -> "AnyObject":
+        """Look up the function in a lexical scope, as ``call`` would.
+
+        Returns:
+            The function, or :data:`UNBOUND` if the key is not bound.
+        """
+        if (
+            scope.serial == self._serial
+            and self._version == LexicalScope.version
+            and self._locals._lookup(self.key, self._wrapped_key) is self._value  # type: ignore[union-attr]
+        ):
+            return self._function
+
+        from .special import Ref
+
+        version = LexicalScope.version
+        current: Optional[LexicalScope] = scope
+        while current is not None:
+            locals_ = current.locals
+            value = locals_._lookup(self.key, self._wrapped_key)
+            if value is not UNBOUND:
+                break
+            locals_.observed = True
+            current = current.parent
+        else:
+            self._serial = -1
+            return UNBOUND
+
+        function = value.obj if isinstance(value, Ref) else value
+        if isinstance(function, Ref):
+            function = function.obj
+        self._serial, self._version, self._locals, self._value, self._function = (
+            scope.serial,
+            version,
+            locals_,
+            value,
+            function,
+        )
+        return function
+
+    def dispatch(self, function: "AnyObject") -> tuple[Callable, bool, bool]:
+        """Get how to call the function, as :meth:`~.func.call._resolve_call_impl` does."""
+        dispatch = self._dispatch.get(id(function))
+        if dispatch is None:
+            from .func import call
+
+            dispatch = call._resolve_call_impl(function)
+            # The callable references the function, so its id is not reused
+            # while it is cached
+            if len(self._dispatch) < self.MAX_FUNCTIONS:
+                self._dispatch[id(function)] = dispatch
+        return dispatch
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.key!r})"
@@ -0,0 +1,139 @@
+"""Interning of strings and primitive values.
+
+Creating a :class:`~.complex.String` or a :class:`~.primitive.Primitive` with
+the same class and arguments as a live instance returns that instance, so
+strings and scalars can be compared by identity, e.g. as the keys of locals.
+
+Instances are interned in an :class:`InternTable`, which references them:
+
+- weakly, so that an instance is freed once nothing else references it, e.g.
+  the strings of user data processed by a long-running program;
+- strongly while it is among the most recently used ones, so that values
+  created again and again, e.g. the literals of a loop, are not recreated
+  each time;
+- strongly forever if it is pinned, e.g. small integers.
+
+The tables count their hits and misses (see :meth:`InternTable.info`), to
+size the recently used instances with ``MYLANG_INTERN_RECENT``.
+"""
+
+import os
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional
+
+
+__all__ = ("InternInfo", "InternTable", "primitives", "strings")
+
+
+class InternInfo(NamedTuple):
+    """Statistics of an intern table."""
+
+    hits: int
+    """How many times a live instance was returned."""
+    misses: int
+    """How many times an instance was created."""
+    live: int
+    """How many instances are alive."""
+    recent: int
+    """How many recently used instances are kept alive."""
+    max_recent: int
+    pinned: int
+    """How many instances are kept alive forever."""
+
+
+class InternTable:
+    """Interned instances, by class and arguments."""
+
+    __slots__ = ("max_recent", "_pin", "_live", "_recent", "_pinned", "hits", "misses")
+
+    def __init__(self, max_recent: int, pin: Callable[[tuple], bool] = lambda key: False):
+        """
+        Args:
+            max_recent: How many recently used instances to keep alive.
+            pin: Whether to keep the instance interned under a key alive forever.
+        """
+        self.max_recent = max_recent
+        self._pin = pin
+        self._live: weakref.WeakValueDictionary[tuple, Any] = weakref.WeakValueDictionary()
+        self._recent: OrderedDict[tuple, Any] = OrderedDict()
+        self._pinned: dict[tuple, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[Any]:
+        """Get the live instance interned under a key, or None if there is none."""
+        obj = self._pinned.get(key)
+        if obj is not None:
+            self.hits += 1
+            return obj
+        recent = self._recent
+        obj = recent.get(key)
+        if obj is not None:
+            self.hits += 1
+            recent.move_to_end(key)
+            return obj
+        obj = self._live.get(key)
+        if obj is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._use(key, obj)
+        return obj
+
+    def add(self, key: tuple, obj: Any) -> Any:
+        """Intern a new instance under a key, and return it."""
+        self._live[key] = obj
+        if self._pin(key):
+            self._pinned[key] = obj
+        else:
+            self._use(key, obj)
+        return obj
+
+    def _use(self, key: tuple, obj: Any):
+        """Keep an instance alive as one of the most recently used."""
+        recent = self._recent
+        recent[key] = obj
+        if len(recent) > self.max_recent:
+            recent.popitem(last=False)
+
+    def clear_recent(self):
+        """Stop keeping the recently used instances alive."""
+        self._recent.clear()
+
+    def info(self) -> InternInfo:
+        return InternInfo(
+            self.hits, self.misses, len(self._live), len(self._recent), self.max_recent, len(self._pinned)
+        )
+
+    def __len__(self):
+        return len(self._live)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.info()!r})"
+
+
+def _default_max_recent() -> int:
+    value = os.environ.get("MYLANG_INTERN_RECENT", "1024")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"MYLANG_INTERN_RECENT must be an integer, got {value!r}") from None
+
+
+def _is_small(key: tuple) -> bool:
+    """Whether a key is that of a small integer or of a string of at most one character."""
+    if len(key) != 2:
+        return False
+    value = key[1]
+    if type(value) is int:
+        return -5 <= value <= 256
+    return type(value) is str and len(value) <= 1
+
+
+_max_recent = _default_max_recent()
+
+strings = InternTable(_max_recent, _is_small)
+"""The table of :class:`~.complex.String` instances."""
+primitives = InternTable(_max_recent, _is_small)
+"""The table of :class:`~.primitive.Primitive` instances."""
@@ -1,65 +1,157 @@
+import functools
+import operator
+from typing import Callable, Optional
+
 from ._utils import isinstance_, python_obj_to_mylang
 from .base import Object, Args
-from .primitive import Bool
+from .numarray import NumArray
+from .primitive import Bool, Float, Int
 
 
-__all__ = ("operators",)
+__all__ = ("operators", "operator_functions")
 
 
 # TODO: Object should be function type instead
 # NOTE: The items are populated below
 operators: dict[str, Object] = {}
 
+operator_functions: dict[str, Callable[..., Object]] = {}
+"""The Python functions that implement the operators, for callers that call them directly."""
+
 
 def _op(name: str, *, convert_func_to_mylang=True):
     def decorator(func) -> staticmethod:
         f = python_obj_to_mylang(func) if convert_func_to_mylang else func
         f.__name__ = func.__name__
         operators[name] = f
+        operator_functions[name] = func
         return func
 
     return decorator
 
 
+_NUMBER_TYPES = frozenset((Int, Float))
+_SCALAR_TYPES = frozenset((Int, Float, Bool))
+
+
+def _arithmetic(compute: Callable):
+    """Add a fast path for numbers to an operator function.
+
+    As with the methods of :class:`Number`, the result has the type of the left
+    operand. Other operands are passed to the decorated function.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def operator_function(a, b):
+            type_ = type(a)
+            if type_ in _NUMBER_TYPES and type(b) in _NUMBER_TYPES:
+                return type_(compute(a.value, b.value))
+            return func(a, b)
+
+        return operator_function
+
+    return decorator
+
+
+def _comparison(compute: Callable, types: frozenset = _NUMBER_TYPES):
+    """Add a fast path for operands of the given types to a comparison operator function."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def operator_function(a, b):
+            if type(a) in types and type(b) in types:
+                return Bool(compute(a.value, b.value))
+            return func(a, b)
+
+        return operator_function
+
+    return decorator
+
+
+def _vectorized(compute: Callable, type_: Optional[type] = None):
+    """Add a path for numeric arrays to an operator function, which computes on all their values at once.
+
+    If either operand is a :class:`NumArray`, the operation is computed on each
+    pair of values, see :meth:`NumArray.apply`. Other operands are passed to
+    the decorated function.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def operator_function(a, b):
+            if type(a) is NumArray or type(b) is NumArray:
+                return NumArray.apply(compute, a, b, type_)
+            return func(a, b)
+
+        return operator_function
+
+    return decorator
+
+
 @_op("==")
+@_comparison(operator.eq, _SCALAR_TYPES)
+@_vectorized(operator.eq, Bool)
 def equals(a, b):
     return Bool(a == b)
 
 
 @_op("-")
+@_arithmetic(operator.sub)
+@_vectorized(operator.sub)
 def subtract(a, b):
     return a - b
 
 
 @_op("+")
+@_arithmetic(operator.add)
+@_vectorized(operator.add)
 def add(a, b):
     return a + b
 
 
 @_op("*")
+@_arithmetic(operator.mul)
+@_vectorized(operator.mul)
 def multiply(a, b):
     return a * b
 
 
+@_op("/")
+@_vectorized(operator.truediv, Float)
+def divide(a, b):
+    if type(a) in _NUMBER_TYPES and type(b) in _NUMBER_TYPES:
+        return Float(a.value / b.value)
+    return a / b
+
+
 # TODO: Add missing tests
 
 
 @_op(">")
+@_comparison(operator.gt)
+@_vectorized(operator.gt, Bool)
 def gt(a, b):
     return a > b
 
 
 @_op(">=")
+@_comparison(operator.ge)
+@_vectorized(operator.ge, Bool)
 def ge(a, b):
     return a >= b
 
 
 @_op("<")
+@_comparison(operator.lt)
+@_vectorized(operator.lt, Bool)
 def lt(a, b):
     return a < b
 
 
 @_op("<=")
+@_comparison(operator.le)
+@_vectorized(operator.le, Bool)
 def le(a, b):
     return a <= b
 
@@ -68,7 +160,7 @@ def le(a, b):
 def dollar(a):
     from . import call, Ref, get
 
-    return call._m_classcall_(Args(Ref(get), a))
+    return call._m_classcall_(Args(Ref.to(get), a))
 
 
 # TODO: Add support for operator overloading
@@ -88,9 +180,19 @@ def ampersand(a):
 
 @_op("!")
 def logical_not(a):
+    if type(a) in _SCALAR_TYPES:
+        return Bool(not a.value)
     return Bool(not a)
 
 
 @_op(":?")
 def isinstance(a, b):
     return Bool(isinstance_(a, b))
+
+
+@_op("..")
+def range_(a, b):
+    from .range_ import Range
+
+    assert type(a) is Int and type(b) is Int, "The operands of .. must be integers"
+    return Range(a.value, b.value)
@@ -0,0 +1,140 @@
+"""Release mode, in which MyLang code runs without the checks meant for development.
+
+By default, code runs in guarded mode: every function defined as a class is
+called through an entry point that checks that it is called by
+:class:`~.func.call` (see ``only_callable_by_call_decorator``), and builtins
+validate the structure of their arguments every time they are called, e.g.
+that the body of a loop is a statement list.
+
+In release mode, the functions themselves are installed as entry points
+instead, and builtins don't validate their arguments when called. The
+statements that call a builtin by its name are validated once instead, when
+their module is transformed from the source or loaded from the cache (see
+:func:`validate_statement_list`). Arguments are validated as written in the
+source, so a statement list that is only passed by key, for example, is not
+checked, and only their structure is. A statement that passes the value of an
+expression, e.g. ``$body`` or ``{get_body}``, is not validated at all, as that
+value is only known when called. A name that the module may bind, e.g. with `fun` or `set`, may not
+refer to the builtin when called, so its calls are not validated, nor are
+those of code transformed one statement at a time, e.g. when streamed, as the
+statements that follow may bind any name.
+
+Release mode is enabled with :func:`set_release_mode` when embedding MyLang,
+with the ``--release`` flag of the ``mylang`` command, or by setting the
+``MYLANG_RELEASE`` environment variable to a non-empty value.
+"""
+
+import os
+from typing import TYPE_CHECKING, Iterator
+
+
+if TYPE_CHECKING:
+    from ._utils.types import AnyObject
+    from .complex import String
+    from .func import StatementList
+
+
+__all__ = ("release_mode", "set_release_mode", "validate_statement_list", "nested_statement_lists")
+
+
+release_mode = bool(os.environ.get("MYLANG_RELEASE"))
+"""Whether code runs in release mode. Set it with :func:`set_release_mode`."""
+
+
+def set_release_mode(enabled: bool):
+    """Switch between release mode and guarded mode, installing the entry points of the functions defined as classes."""
+    from ._utils import all_functions_defined_as_classes, install_entry_points
+
+    global release_mode  # pylint: disable=global-statement
+    release_mode = enabled
+    for cls in all_functions_defined_as_classes:
+        install_entry_points(cls)
+
+
+def validate_statement_list(statement_list: "StatementList"):
+    """Validate the statements that call a builtin by its name, in a statement list and in those nested in it.
+
+    The statement list is a module, which is run in a scope of the builtins,
+    so the names it doesn't bind anywhere refer to the builtins.
+    """
+    from .. import builtins_
+    from ._utils import FunctionAsClass
+    from .base import Args, IncompleteExpression
+    from .complex import String
+
+    builtins = builtins_.create_locals_dict()
+    bound_names = set(_names(statement_list))
+    pending = [statement_list]
+    while pending:
+        for statement in pending.pop():
+            positional = statement.positional_values() if type(statement) is Args else ()
+            if positional and type(key := positional[0]) is String and key in builtins and key not in bound_names:
+                function = builtins[key]
+                args = Args.from_positional_keyed(positional[1:], statement.keyed_dict())
+                if (
+                    isinstance(function, type)
+                    and issubclass(function, FunctionAsClass)
+                    and not any(isinstance(obj, IncompleteExpression) for item in args._m_dict_.items() for obj in item)
+                ):
+                    function._validate_args(args)
+            pending.extend(nested_statement_lists(statement))
+
+
+def nested_statement_lists(obj: "AnyObject") -> Iterator["StatementList"]:
+    """Get the statement lists nested in a part of a statement, outside of other statement lists."""
+    from .base import Array, BinaryOperation, Dict, UnaryOperation
+    from .complex import Path
+    from .func import StatementList
+
+    if isinstance(obj, StatementList):
+        yield obj
+    elif isinstance(obj, Dict):
+        for key, value in obj._m_dict_.items():
+            yield from nested_statement_lists(key)
+            yield from nested_statement_lists(value)
+    elif isinstance(obj, Array):
+        for item in obj._m_array_:
+            yield from nested_statement_lists(item)
+    elif isinstance(obj, BinaryOperation):
+        for operand in obj.operands:
+            yield from nested_statement_lists(operand)
+    elif isinstance(obj, UnaryOperation):
+        yield from nested_statement_lists(obj.operand)
+    elif isinstance(obj, Path):
+        for part in obj.parts:
+            yield from nested_statement_lists(part)
+
+
+def _names(obj: "AnyObject") -> Iterator["String"]:
+    """Get the strings in a part of a statement, except the names of the functions called by its statements.
+
+    Any of them may be a name that the code binds, e.g. the name of a function
+    defined with `fun`, a loop variable or a key assigned with `set`.
+    """
+    from .base import Args, Array, BinaryOperation, Dict, UnaryOperation
+    from .complex import Path, String
+    from .func import StatementList
+
+    if type(obj) is String:
+        yield obj
+    elif isinstance(obj, StatementList):
+        for statement in obj:
+            positional = statement.positional_values() if type(statement) is Args else ()
+            if positional and type(positional[0]) is String:
+                statement = Args.from_positional_keyed(positional[1:], statement.keyed_dict())
+            yield from _names(statement)
+    elif isinstance(obj, Dict):
+        for key, value in obj._m_dict_.items():
+            yield from _names(key)
+            yield from _names(value)
+    elif isinstance(obj, Array):
+        for item in obj._m_array_:
+            yield from _names(item)
+    elif isinstance(obj, BinaryOperation):
+        for operand in obj.operands:
+            yield from _names(operand)
+    elif isinstance(obj, UnaryOperation):
+        yield from _names(obj.operand)
+    elif isinstance(obj, Path):
+        for part in obj.parts:
+            yield from _names(part)
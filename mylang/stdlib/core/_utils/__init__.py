@@ -55,6 +55,7 @@ __all__ = (
     "python_dict_from_args_kwargs",
     "mylang_obj_to_python",
     "function_defined_as_class",
+    "receives_stack_frame",
     "getattr_",
     "isinstance_",
     "issubclass_",
@@ -188,6 +189,14 @@ class FunctionAsClass(abc.ABC, Generic[TypeReturn], ObjectContract):
         DO NOT CALL THIS DIRECTLY.
         """
 
+    @classmethod
+    def _validate_args(cls, args: "Args", /):
+        """Validate the structure of the arguments of a call, e.g. that a body is a statement list.
+
+        Called by `_m_classcall_` in guarded mode, and once per statement that
+        calls the function by its name in release mode (see `.._release`).
+        """
+
     @classmethod
     def _caller_stack_frame(cls):
         """Get the stack frame of the caller of this function.
@@ -195,6 +204,9 @@ class FunctionAsClass(abc.ABC, Generic[TypeReturn], ObjectContract):
         If _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME is True, this will be the
         parent of the current stack frame. If False, it will be the current
         stack frame.
+
+        Functions that receive the stack frame they run in (see
+        `receives_stack_frame`) look it up only if they were not given it.
         """
         from .._context import current_stack_frame
 
@@ -265,11 +277,13 @@ def function_defined_as_class(*, monkeypatch_methods=True):
         cls.name = python_obj_to_mylang(cls._m_name_) if hasattr(cls, "_m_name_") else String(cls.__name__)
 
         if monkeypatch_methods:
-            cls._m_classcall_ = classmethod(
-                only_callable_by_call_decorator(cls._m_classcall_.__func__),
-            )
+            entry_points = {"_m_classcall_": cls._m_classcall_.__func__}
             if hasattr(cls, "_m_call_"):
-                cls._m_call_ = only_callable_by_call_decorator(cls._m_call_)
+                entry_points["_m_call_"] = cls._m_call_
+            cls._entry_points = {
+                name: (func, only_callable_by_call_decorator(func)) for name, func in entry_points.items()
+            }
+            install_entry_points(cls)
 
             # Make sure that cls(...) will call the function via `call`
             def __new__(cls, *args, **kwargs):
@@ -289,6 +303,18 @@ def function_defined_as_class(*, monkeypatch_methods=True):
     return decorator
 
 
+def install_entry_points(cls: type[FunctionAsClass]):
+    """Install the guarded or unguarded entry points of a function defined as class, depending on the release mode.
+
+    See :mod:`.._release`.
+    """
+    from .. import _release
+
+    for name, (unguarded, guarded) in getattr(cls, "_entry_points", {}).items():
+        func = unguarded if _release.release_mode else guarded
+        setattr(cls, name, classmethod(func) if name == "_m_classcall_" else func)
+
+
 currently_called_func = ContextVar("currently_called_func", default=None)
 """Used by `only_callable_by_call_decorator` to ensure that a function can only
 be called from `call`."""
@@ -322,6 +348,19 @@ def only_callable_by_call_decorator(func):
     return wrapper
 
 
+def receives_stack_frame(func: TypeFunc) -> TypeFunc:
+    """Decorator for a `_m_classcall_` or `_m_call_` that takes the stack frame it runs in.
+
+    `call` passes the stack frame as the keyword argument `frame`, and calls
+    the function directly, without setting `currently_called_func` or
+    checking it with `only_callable_by_call_decorator`. Without the argument,
+    e.g. when called by Python code, the function must fall back to
+    `current_stack_frame`.
+    """
+    func._receives_stack_frame = True  # type: ignore[attr-defined]
+    return func
+
+
 def _python_func_to_mylang(func: FunctionType | MethodType) -> "AnyObject":
     """Convert a Python function to a MyLang function."""
     from ..base import Args, Object
@@ -353,14 +392,13 @@ def populate_locals_for_callable(
     parameters: "Args",
     args: "Args",
 ):
-    """Populate a locals dictionary for a callable by mapping the arguments `args` to the callable's `parameters`."""
-    for i, posarg in enumerate(parameters[:]):
-        locals_[posarg] = args[i]
-    keyed_parameters = parameters.keyed_dict()
-    keyed_args = args.keyed_dict()
-    for key, default_value in keyed_parameters.items():
-        locals_[key] = keyed_args.get(key, default_value)
+    """Populate a locals dictionary for a callable by mapping the arguments `args` to the callable's `parameters`.
 
+    Functions bind their arguments with the :class:`~.._binding.BindingPlan` of their parameters instead.
+    """
+    from .._binding import BindingPlan
+
+    BindingPlan(parameters).bind(locals_, args)
     return locals_
 
 
@@ -464,9 +502,22 @@ def getname(obj: "AnyObject"):
 
 
 def iter_(obj: "Object"):
-    """Get an iterator for the object in the context of MyLang."""
+    """Get an iterator for the object in the context of MyLang.
+
+    An instance of a class defined in MyLang is iterable if the class defines
+    an `iter` method, which returns what to iterate over instead, e.g. a
+    generator.
+    """
+    from ..base import Args, TypedObject
+    from ..complex import String
+
     if hasattr(obj, "__iter__"):
         return iter(obj)
+    elif isinstance(obj, TypedObject) and String("iter") in obj.type_.prototype:
+        from ..func import call
+        from ..special import Ref
+
+        return iter_(call._m_classcall_(Args(Ref.to(getattr_(obj, String("iter"))))))
     else:
         raise NotImplementedError(f"Object {obj} is not iterable in MyLang")
 
@@ -11,9 +11,12 @@ import inspect
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Generic,
     Iterable,
     Iterator,
+    NamedTuple,
+    Optional,
     TypeVar,
     final,
     overload,
@@ -42,6 +45,11 @@ if TYPE_CHECKING:
 
 @expose
 class Object(ObjectContract):
+    _incomplete_positions: "tuple[Any, ...] | None" = None
+    """The keys (or indexes) of the items that contain incomplete expressions,
+    an empty tuple if nothing in the object needs to be evaluated, or None if
+    unknown. See :func:`mark_incomplete_positions`."""
+
     def __init__(self, *args: Any, **kwargs: Any):
         if any(isinstance(arg, Args) for arg in args):
             positional = []
@@ -100,14 +108,23 @@ class IncompleteExpression(abc.ABC):
         Returns:
             obj The possibly modified object.
         """
-        from .func import StatementList
-
         if isinstance(obj, IncompleteExpression):
             return obj.evaluate()
 
+        positions = getattr(obj, "_incomplete_positions", None)
+        if positions is not None:
+            return IncompleteExpression._evaluate_positions(obj, positions) if positions else obj
+
+        from .func import StatementList
+
         if isinstance(obj, StatementList):
             return obj
 
+        from . import Path
+
+        if isinstance(obj, Path):
+            return Path(*(IncompleteExpression.evaluate_all_in_object(part) for part in obj.parts))
+
         dict_attributes = (
             "__dict__",
             *(("_m_dict_",) if hasattr(obj, "_m_dict_") else ()),
@@ -157,22 +174,109 @@ class IncompleteExpression(abc.ABC):
                     arr[i] = new_item
                     setattr(obj, "_m_array_", arr)
 
-        from . import Path
+        return obj
 
-        if isinstance(obj, Path):
-            return Path(*(IncompleteExpression.evaluate_all_in_object(part) for part in obj.parts))
+    @staticmethod
+    def _evaluate_positions(obj: "Dict | Array", positions: tuple[Any, ...]):
+        """Evaluate only the items at the given positions of a dict or an array.
 
-        return obj
+        Same as :meth:`evaluate_all_in_object`, but without inspecting the
+        object: the object is copied only if an item actually changes.
+        """
+        evaluate = IncompleteExpression.evaluate_all_in_object
+
+        if isinstance(obj, Array):
+            array = obj._m_array_
+            new_array = None
+            for i in positions:
+                item = array[i]
+                new_item = evaluate(item)
+                if new_item is not item:
+                    if new_array is None:
+                        new_array = array.copy()
+                    new_array[i] = new_item
+            if new_array is None:
+                return obj
+            new_obj = copy.copy(obj)
+            new_obj._m_array_ = new_array
+        else:
+            dict_ = obj._m_dict_
+            new_dict = None
+            for key in positions:
+                value = dict_[key]
+                new_key = evaluate(key)
+                new_value = evaluate(value)
+                if new_key is not key or new_value is not value:
+                    if new_dict is None:
+                        new_dict = dict_.copy()
+                    if new_key is not key:
+                        # A changed key moves to the end, as in the generic case
+                        del new_dict[key]
+                    new_dict[new_key] = new_value
+            if new_dict is None:
+                return obj
+            new_obj = copy.copy(obj)
+            new_obj._m_dict_ = new_dict
+
+        # Everything in the copy has been evaluated
+        new_obj._incomplete_positions = ()
+        return new_obj
+
+
+def contains_incomplete_expressions(obj: "AnyObject") -> bool:
+    """Check whether evaluating the object may give anything other than the
+    object itself. Objects that weren't marked with
+    :func:`mark_incomplete_positions` are assumed to."""
+    if isinstance(obj, IncompleteExpression):
+        return True
+    positions = getattr(obj, "_incomplete_positions", None)
+    return positions is None or bool(positions)
+
+
+def mark_incomplete_positions(obj: T) -> T:
+    """Record which items of a dict or an array contain incomplete expressions,
+    so that :meth:`IncompleteExpression.evaluate_all_in_object` visits only
+    them.
+
+    The items must have been marked already, so a tree is marked bottom-up,
+    e.g. while it is being built by the transformer. The object must not be
+    modified afterwards.
+
+    Returns:
+        The object.
+    """
+    if isinstance(obj, Array):
+        obj._incomplete_positions = tuple(
+            i for i, item in enumerate(obj._m_array_) if contains_incomplete_expressions(item)
+        )
+    elif isinstance(obj, Dict):
+        obj._incomplete_positions = tuple(
+            key
+            for key, value in obj._m_dict_.items()
+            if contains_incomplete_expressions(key) or contains_incomplete_expressions(value)
+        )
+    return obj
 
 
 @expose
 class Operation(Object, IncompleteExpression, abc.ABC):
-    __slots__ = "operator"
+    __slots__ = ("operator", "_function")
 
     def __init__(self, operator: str):
+        from ._operators import operator_functions
+
         self.operator = operator
+        self._function: Optional[Callable[..., Object]] = operator_functions.get(operator)
+        """The Python function that implements the operator, bound when the operation is created.
+
+        It is called directly, rather than through `op`. None if the operator
+        is unknown.
+        """
 
     def _call_op(self, *operands: Object):
+        if self._function is not None:
+            return self._function(*operands)
+
         from .func import op
         from ._utils import currently_called_func
         from .complex import String
@@ -186,7 +290,7 @@ class UnaryOperation(Operation, abc.ABC):
     __slots__ = "operand"
 
     def __init__(self, operator: str, operand: Object):
-        self.operator = operator
+        super().__init__(operator)
         self.operand = operand
 
     def evaluate(self):
@@ -355,6 +459,22 @@ class Dict(Object):
         return isinstance(value, self.__class__) and self._m_dict_ == value._m_dict_
 
 
+class _ArgsShape(NamedTuple):
+    """The positional and keyed items of :class:`Args`, as found in its ``_m_dict_``."""
+
+    dict_: dict
+    """The ``_m_dict_`` the shape was computed from."""
+    size: int
+    """The size of ``dict_`` when the shape was computed."""
+    positional: "tuple[AnyObject, ...]"
+    """The positional values, in order."""
+    keyed: "dict[AnyObject, AnyObject]"
+    """The keyed (i.e. non-positional) items."""
+    last_positional_index: Optional[int]
+    contiguous: bool
+    """Whether the positional indexes are ``0, 1, ...``, in order, so that they are the indexes of ``positional``."""
+
+
 # TODO: Check if there are any gaps in the positional argument indexes?
 @expose
 @final
@@ -363,23 +483,57 @@ class Args(Dict):
 
     Right now it does nothing extra by itself, but various contexts treat it
     differently than :class:`Dict`.
+
+    The items are stored in ``_m_dict_``, positional ones under :class:`Int`
+    keys. The positional values and the keyed items are split the first time
+    they are needed, and cached until ``_m_dict_`` is replaced or an item is
+    set, either with ``[]`` or with :meth:`_m_setattr_`. Writing to
+    ``_m_dict_`` directly bypasses the cache.
     """
 
-    def get_last_positional_index(self):
+    _shape: Optional[_ArgsShape] = None
+
+    def _get_shape(self) -> _ArgsShape:
+        dict_ = self._m_dict_
+        shape = self._shape
+        if shape is not None and shape.dict_ is dict_ and shape.size == len(dict_):
+            return shape
+
         from .primitive import Int
 
-        last_positional_arg_index = -1
-        for key in self._m_dict_:
+        positional = []
+        keyed = {}
+        last_positional_index = -1
+        contiguous = True
+        for key, value in dict_.items():
             if isinstance(key, Int):
-                last_positional_arg_index = max(last_positional_arg_index, key.value)
+                if key.value != len(positional):
+                    contiguous = False
+                positional.append(value)
+                last_positional_index = max(last_positional_index, key.value)
+            else:
+                keyed[key] = value
+
+        self._shape = shape = _ArgsShape(
+            dict_,
+            len(dict_),
+            tuple(positional),
+            keyed,
+            last_positional_index if last_positional_index >= 0 else None,
+            contiguous,
+        )
+        return shape
 
-        return last_positional_arg_index if last_positional_arg_index >= 0 else None
+    def get_last_positional_index(self):
+        return self._get_shape().last_positional_index
 
     def keyed_dict(self):
         """Get the keyed items (i.e. non-positional) of the Args."""
-        from .primitive import Int
+        return self._get_shape().keyed.copy()
 
-        return {k: v for k, v in self._m_dict_.items() if not isinstance(k, Int)}
+    def positional_values(self) -> "tuple[AnyObject, ...]":
+        """Get the positional values of the Args, without copying them to an :class:`Array` as ``args[:]`` does."""
+        return self._get_shape().positional
 
     @overload
     def __getitem__(self, key: slice, /) -> Array["AnyObject"]: ...
@@ -390,16 +544,32 @@ class Args(Dict):
     def __getitem__(self, key: Any, /) -> "AnyObject":
         """Get an item from the Args."""
         if isinstance(key, slice):
-            from .primitive import Int
+            # The values are MyLang objects already
+            array = Array.__new__(Array)
+            array._m_array_ = list(self._get_shape().positional[key])
+            return array
 
-            positional_args = tuple(v for k, v in self._m_dict_.items() if isinstance(k, Int))
-            return Array.from_iterable(positional_args[key])
-        else:
+        if type(key) is not int:
             from .primitive import Int
 
-            if isinstance(key, (int, Int)) and (_key := int(key)) < 0:
-                key = len(self[:]) + _key
-            return self._m_dict_[python_obj_to_mylang(key)]
+            if not isinstance(key, Int):
+                return self._m_dict_[python_obj_to_mylang(key)]
+            key = int(key)
+        shape = self._get_shape()
+        positional = shape.positional
+        if shape.contiguous and -len(positional) <= key < len(positional):
+            return positional[key]
+        if key < 0:
+            key += len(positional)
+        return self._m_dict_[python_obj_to_mylang(key)]
+
+    def _m_setattr_(self, key, value):
+        self._shape = None
+        super()._m_setattr_(key, value)
+
+    def __setitem__(self, key: Any, value: Any, /):
+        self._shape = None
+        return super().__setitem__(key, value)
 
     def __contains__(self, key: Any, /) -> bool:
         """Check if the Args contains a key."""
@@ -443,14 +613,11 @@ class Args(Dict):
 
     def is_positional_only(self) -> bool:
         """Check if the Args contains only positional arguments."""
-        # TODO: Use different logic
-        from .primitive import Int
-
-        return all(isinstance(k, Int) for k in self._m_dict_)
+        return not self._get_shape().keyed
 
     def is_keyed_only(self) -> bool:
         """Check if the Args contains only keyed arguments."""
-        return len(self) == len(self.keyed_dict())
+        return not self._get_shape().positional
 
     def is_mixed_positional_keyed(self) -> bool:
         """Check if the Args contains both positional and keyed arguments."""
@@ -1,8 +1,8 @@
-from typing import Any
+from typing import Any, Optional
 
-from .func import StatementList, fun, get
+from .func import StatementList, call, fun, get
 from . import undefined
-from ._context import current_stack_frame, LocalsDict
+from ._context import current_stack_frame, LocalsDict, StackFrame
 from ._utils import (
     FunctionAsClass,
     expose,
@@ -12,6 +12,7 @@ from ._utils import (
     python_obj_to_mylang,
     set_contextvar,
     currently_called_func,
+    receives_stack_frame,
 )
 from .base import Args, Object, TypedObject
 from .complex import String
@@ -119,12 +120,13 @@ class BoundMethod(fun):
         obj.__init__(bound_to, func)
         return obj
 
-    def _m_call_(self, args: Args, /) -> Any:
+    @receives_stack_frame
+    def _m_call_(self, args: Args, /, *, frame: Optional[StackFrame] = None) -> Any:
+        stack_frame = frame or current_stack_frame.get()
         # Inject `self` into the function's lexical scope
-        current_stack_frame.get().locals["self"] = self.self
-        if isinstance(self.func, type):
-            python_callable = self.func._m_classcall_
-        else:
-            python_callable = self.func._m_call_
+        stack_frame.locals["self"] = self.self
+        python_callable, _, receives_frame = call._resolve_call_impl(self.func)
+        if receives_frame:
+            return python_callable(args, frame=stack_frame)
         with set_contextvar(currently_called_func, python_callable):
             return python_callable(args)
@@ -1,6 +1,6 @@
-import functools
 from typing import Any
 
+from ._interning import strings
 from ._utils import expose, repr_, str_
 
 from .base import Args, Object
@@ -8,10 +8,15 @@ from .base import Args, Object
 
 @expose
 class String(Object):
-    # TODO: Use weak caching
-    @functools.cache
+    _incomplete_positions = ()
+
     def __new__(cls, *args, **kwargs):
-        return super().__new__(cls)
+        # Interned, see _interning
+        key = (cls, *args, *kwargs.items()) if kwargs else (cls, *args)
+        obj = strings.get(key)
+        if obj is None:
+            obj = strings.add(key, super().__new__(cls))
+        return obj
 
     def __init__(self, value: str = ""):
         self.value = value if isinstance(value, str) else str(value)
@@ -71,6 +76,8 @@ class Path(Object):
 class Dots(Object):
     """Something like Python's ellipsis, but represents an arbitrary number of dots (1 or more)"""
 
+    _incomplete_positions = ()
+
     def __init__(self, count: int):
         assert count > 0, "Dots count must be positive"
         self.count = count
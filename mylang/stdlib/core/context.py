@@ -54,6 +54,8 @@ class context(Object, FunctionAsClass):
             context = existing_context_in_current_stack_frame
         else:
             context = Context(parent=cls.get())
+            # The context is looked up by the stack frame and its children
+            stack_frame.capture()
             _stack_frame_to_context[stack_frame] = context
         require_parent_locals()[key] = context
         return context
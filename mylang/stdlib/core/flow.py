@@ -1,26 +1,23 @@
 import abc
-import dataclasses
-from typing import NamedTuple
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional
 
 from .func import StatementList
-from ._utils import expose, function_defined_as_class, FunctionAsClass, issubclass_
+from ._utils import expose, function_defined_as_class, FunctionAsClass, issubclass_, receives_stack_frame
 from .base import Object, Args
 from .primitive import undefined
 from .complex import String
 from .error import Error, ErrorCarrier
-from ._context import CatchSpec
+from ._context import CatchSpec, StackFrame
+from . import _release
+from ._compiler import compile_expression
 
 
-class _Symbols:
-    CURRENT_IF_BLOCK_DATA = type("_CURRENT_IF_BLOCK_DATA", (object,), {})
-    CURRENT_LOOP_DATA = type("_CURRENT_LOOP_DATA", (object,), {})
+if TYPE_CHECKING:
+    from ._utils.types import AnyObject
 
 
-@dataclasses.dataclass
-class _LoopData:
-    copied_statement_list: StatementList
-    broken: bool = False
-    should_continue: bool = False
+_NO_ARGS = Args()
+_WHILE = String("while")
 
 
 @expose
@@ -29,70 +26,69 @@ class if_(Object, FunctionAsClass):
     _m_name_ = "if"
     _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
 
-    class __IfBlockData(NamedTuple):
-        modified_statement_list: StatementList
+    class _Branch(NamedTuple):
+        """A branch of an if-else block."""
 
-    @classmethod
-    def _m_classcall_(cls, args, /):
-        from . import Ref
+        condition: Optional[Callable[[], "AnyObject"]]
+        """Evaluates the condition of the branch, or None for else."""
+        body: StatementList
 
-        # TODO: Validate args
+    @classmethod
+    def _validate_args(cls, args: Args, /):
         assert len(args) in (1, 2), "if requires 1 or 2 arguments"
-        condition = args[0] if len(args) == 2 else None
         statement_list = args[-1]
         assert isinstance(statement_list, StatementList), "The last argument of an if must be a StatementList"
-        # Complex if statement with nested conditions and (optional) else
-        if condition is None:
-            # TODO: Make this kind of behavior a first-class citizen
-            stud_args = Args(None)
-            modified_statement_list = StatementList.from_iterable(
-                (stud_args + Args(statement)) for statement in statement_list
-            )
-            for i, orig_statement in enumerate(statement_list):
-                orig_statement: Args
-                assert isinstance(
-                    orig_statement[-1], StatementList
-                ), "The last argument in each statement of an if-else block must be a StatementList"
-                if isinstance(orig_statement[0], String) and orig_statement[0] == String("else"):
-                    from .func import call
-
-                    assert len(orig_statement) == 2, "else must have exactly 1 argument"
-                    assert i == len(statement_list) - 1, "else must be the last statement in an if-else block"
-                    modified_statement_list[i][0] = Ref(call)
-                    modified_statement_list[i][1] = Ref(cls.__Else)
-                else:
-                    assert (
-                        orig_statement.is_positional_only() and len(orig_statement) == 2
-                    ), "condition statement must have exactly 2 arguments"
-                    # Replace the first argument with a ref of `if` (the simple case with a single condition)
-                    modified_statement_list[i][0] = Ref(cls)
-
-            cls._caller_stack_frame().lexical_scope.custom_data[_Symbols.CURRENT_IF_BLOCK_DATA] = cls.__IfBlockData(
-                modified_statement_list
-            )
+        if len(args) == 2:
+            return
+        for i, orig_statement in enumerate(statement_list):
+            orig_statement: Args
+            assert isinstance(
+                orig_statement[-1], StatementList
+            ), "The last argument in each statement of an if-else block must be a StatementList"
+            if cls.__is_else(orig_statement):
+                assert len(orig_statement) == 2, "else must have exactly 1 argument"
+                assert i == len(statement_list) - 1, "else must be the last statement in an if-else block"
+            else:
+                assert (
+                    orig_statement.is_positional_only() and len(orig_statement) == 2
+                ), "condition statement must have exactly 2 arguments"
 
-            value = modified_statement_list()
-            return value
-        # Simple if statement with single condition
-        elif condition:
-            if_block_data = cls._caller_stack_frame().lexical_scope.custom_data.get(
-                _Symbols.CURRENT_IF_BLOCK_DATA, None
-            )
-            if if_block_data is not None:
-                if_block_data.modified_statement_list.aborted = True
-            return statement_list()
-        else:
-            return undefined
+    @staticmethod
+    def __is_else(statement: Args) -> bool:
+        return isinstance(statement[0], String) and statement[0] == String("else")
 
-    @function_defined_as_class()
-    class __Else(FunctionAsClass):
-        _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
+    @classmethod
+    def _get_branches(cls, statement_list: StatementList) -> tuple[_Branch, ...]:
+        """Get the branches of an if-else block, compiled the first time it is executed."""
+        if statement_list._control_flow is None:
+            statement_list._control_flow = tuple(
+                cls._Branch(None if cls.__is_else(statement) else compile_expression(statement[0]), statement[-1])
+                for statement in statement_list
+            )
+        return statement_list._control_flow
 
-        @classmethod
-        def _m_classcall_(cls, args: Args, /):
-            assert len(args) == 1, "if requires exactly 1 argument"
-            assert isinstance(statement_list := args[0], StatementList), "if requires exactly 1 argument"
-            return statement_list()
+    @classmethod
+    @receives_stack_frame
+    def _m_classcall_(cls, args, /, *, frame: Optional[StackFrame] = None):
+        if not _release.release_mode:
+            cls._validate_args(args)
+        statement_list = args[-1]
+        # Simple if statement with single condition
+        if len(args) == 2:
+            return statement_list._m_call_(_NO_ARGS, frame=frame) if args[0] else undefined
+
+        # Complex if statement with nested conditions and (optional) else.
+        # The conditions are evaluated in order, until one is true.
+        branches = cls._get_branches(statement_list)
+        for i, (condition, body) in enumerate(branches):
+            if condition is None or condition():
+                stack_frame = frame or cls._caller_stack_frame()
+                value = body._m_call_(_NO_ARGS, frame=stack_frame)
+                # The value is that of the body, but only if it's the last one
+                if i == len(branches) - 1 or stack_frame.return_value is not None:
+                    return value
+                return undefined
+        return undefined
 
 
 @expose
@@ -102,15 +98,103 @@ class return_(Object, FunctionAsClass):
     _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /):
-        # TODO: Make sure return skips execution of remaining statements
+    def _validate_args(cls, args: Args, /):
         # TODO: Also check that args are positional
         if len(args) > 1:
             raise ValueError("return requires zero or one argument")
-        cls._caller_stack_frame().return_value = return_value = args[0] if len(args) == 1 else undefined
+
+    @classmethod
+    @receives_stack_frame
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None):
+        # TODO: Make sure return skips execution of remaining statements
+        if not _release.release_mode:
+            cls._validate_args(args)
+        (frame or cls._caller_stack_frame()).return_value = return_value = args[0] if len(args) == 1 else undefined
         return return_value
 
 
+class _LoopSignal(BaseException):
+    """Raised by a loop control statement, and caught by the loop executing in its stack frame.
+
+    It isn't an :class:`Exception`, so that neither ``call`` nor ``try`` catch
+    it as an error of the function that raised it.
+    """
+
+
+class _Break(_LoopSignal):
+    """Exits the loop."""
+
+
+class _Continue(_LoopSignal):
+    """Continues with the next iteration of the loop."""
+
+
+class _LoopStep(NamedTuple):
+    """A part of the body of a loop: a ``while`` at its top level, and the statements until the next one."""
+
+    condition: Optional[Callable[[], "AnyObject"]]
+    """Evaluates the condition of the ``while``, or None before the first one."""
+    statements: Optional[StatementList]
+    """The statements after the ``while``, or None if there are none."""
+
+
+def _get_loop_steps(body: StatementList, frame: StackFrame) -> tuple[_LoopStep, ...]:
+    """Get the steps of the iterations of a loop, compiled the first time the loop is executed.
+
+    The loop evaluates the condition of a ``while`` at the top level of its
+    body itself, rather than calling ``while``, unless the name doesn't refer
+    to the builtin in the stack frame when the loop starts.
+    """
+    if body._control_flow is not None:
+        steps = body._control_flow
+    else:
+        steps = []
+        condition, statements = None, []
+        for statement in body:
+            if type(statement) is Args and len(statement) == 2 and statement.is_positional_only():
+                if type(statement[0]) is String and statement[0] == _WHILE:
+                    if condition is not None or statements:
+                        steps.append(_LoopStep(condition, StatementList.from_iterable(statements)))
+                    condition, statements = compile_expression(statement[1]), []
+                    continue
+            statements.append(statement)
+        if condition is None:
+            steps = body._control_flow = (_LoopStep(None, body),)
+            return steps
+        steps.append(_LoopStep(condition, StatementList.from_iterable(statements) if statements else None))
+        steps = body._control_flow = tuple(steps)
+
+    if len(steps) > 1 or steps[0].condition is not None:
+        try:
+            is_builtin = frame.lexical_scope[_WHILE] is while_
+        except KeyError:
+            is_builtin = False
+        if not is_builtin:
+            return (_LoopStep(None, body),)
+    return steps
+
+
+def _execute_iteration(steps: tuple[_LoopStep, ...], frame: StackFrame) -> bool:
+    """Execute an iteration of a loop.
+
+    Returns:
+        Whether the loop exits, as a ``while`` or ``break`` ends it, or as it returns from the stack frame.
+    """
+    try:
+        for condition, statements in steps:
+            if condition is not None and not condition():
+                return True
+            if statements is not None:
+                statements._m_call_(_NO_ARGS, frame=frame)
+                if frame.return_value is not None:
+                    return True
+    except _Continue:
+        pass
+    except _Break:
+        return True
+    return False
+
+
 @expose
 @function_defined_as_class()
 class loop(Object, FunctionAsClass):
@@ -120,26 +204,25 @@ class loop(Object, FunctionAsClass):
     _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /):
+    def _validate_args(cls, args: Args, /):
         assert len(args) == 1, "loop requires exactly one argument"
         assert isinstance(args[0], StatementList), "The argument to loop must be a StatementList"
 
-        copied_statement_list = StatementList.from_iterable(args[0])
-        stack_frame = cls._caller_stack_frame()
-        loop_data = _LoopData(copied_statement_list=copied_statement_list)
-        cls._caller_lexical_scope().custom_data[_Symbols.CURRENT_LOOP_DATA] = loop_data
-        # TODO: Consider adding some return value from the loop
-        while True:
-            # Execute statement list (it will abort something breaks or continues the loop)
-            copied_statement_list()
-
-            # Check if break or return was called
-            if loop_data.broken or stack_frame.return_value is not None:
-                return undefined
-            # Check if continue was called
-            elif loop_data.should_continue:
-                loop_data.should_continue = False
-                copied_statement_list.aborted = False
+    @classmethod
+    @receives_stack_frame
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None):
+        if not _release.release_mode:
+            cls._validate_args(args)
+        stack_frame = frame or cls._caller_stack_frame()
+        steps = _get_loop_steps(args[0], stack_frame)
+        stack_frame.loop_depth += 1
+        try:
+            # TODO: Consider adding some return value from the loop
+            while not _execute_iteration(steps, stack_frame):
+                pass
+        finally:
+            stack_frame.loop_depth -= 1
+        return undefined
 
 
 @expose
@@ -149,20 +232,39 @@ class for_(Object, FunctionAsClass):
     _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = True
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /):
-        from ._context import current_stack_frame
-        from ._utils import iter_
-
+    def _validate_args(cls, args: Args, /):
         assert args.is_positional_only() and len(args) == 4, "for requires exactly 4 positional arguments"
-        loop_var, in_, iterable, statement_list = args[:]
+        _, in_, _, statement_list = args[:]
         assert in_ == String("in"), "The second argument to for must be 'in'"
         assert isinstance(statement_list, StatementList), "The last argument to for must be a StatementList"
 
-        stack_frame = current_stack_frame.get()
+    @classmethod
+    @receives_stack_frame
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None):
+        from ._context import current_stack_frame
+        from ._utils import iter_
+
+        if not _release.release_mode:
+            cls._validate_args(args)
+        loop_var, _, iterable, statement_list = args[:]
+
+        stack_frame = frame or current_stack_frame.get()
         stack_frame.set_parent_lexical_scope(stack_frame.parent.lexical_scope)
-        for value in iter_(iterable):
-            stack_frame.locals[loop_var] = value
-            statement_list()
+        steps = _get_loop_steps(statement_list, stack_frame)
+        set_loop_var = None
+        stack_frame.loop_depth += 1
+        try:
+            for value in iter_(iterable):
+                if set_loop_var is None:
+                    # Bind the variable once, then assign it in place
+                    stack_frame.locals[loop_var] = value
+                    set_loop_var = stack_frame.locals.setter(loop_var)
+                else:
+                    set_loop_var(value)
+                if _execute_iteration(steps, stack_frame):
+                    break
+        finally:
+            stack_frame.loop_depth -= 1
 
         return undefined
 
@@ -174,13 +276,16 @@ class _LoopControlFunction(Object, FunctionAsClass, abc.ABC):
 
     @classmethod
     @abc.abstractmethod
-    def _m_classcall_(cls, args: Args, /): ...
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None): ...
+
+    @classmethod
+    def _validate_args(cls, args: Args, /):
+        if len(args) != 0:
+            raise ValueError(f"{cls._m_name_} does not take any arguments")
 
     @classmethod
-    def _get_loop_data(cls) -> _LoopData:
-        loop_data = cls._caller_lexical_scope().custom_data.get(_Symbols.CURRENT_LOOP_DATA, None)
-        assert loop_data is not None, f"{cls._m_name_} statement not inside a loop"
-        return loop_data
+    def _check_inside_loop(cls, frame: Optional[StackFrame] = None):
+        assert (frame or cls._caller_stack_frame()).loop_depth, f"{cls._m_name_} statement not inside a loop"
 
 
 @expose
@@ -189,15 +294,18 @@ class while_(_LoopControlFunction):
     _m_name_ = "while"
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /):
+    def _validate_args(cls, args: Args, /):
         assert len(args) == 1, "while requires exactly 1 argument"
-        condition = args[0]
-        loop_data = cls._get_loop_data()
 
-        if not condition:
-            loop_data.broken = True
-            loop_data.copied_statement_list.aborted = True
-            return undefined
+    @classmethod
+    @receives_stack_frame
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None):
+        if not _release.release_mode:
+            cls._validate_args(args)
+        cls._check_inside_loop(frame)
+        if not args[0]:
+            raise _Break
+        return undefined
 
 
 @expose
@@ -209,13 +317,12 @@ class break_(_LoopControlFunction):
     _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /):
-        if len(args) != 0:
-            raise ValueError("break does not take any arguments")
-        loop_data = cls._get_loop_data()
-        loop_data.broken = True
-        loop_data.copied_statement_list.aborted = True
-        return undefined
+    @receives_stack_frame
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None):
+        if not _release.release_mode:
+            cls._validate_args(args)
+        cls._check_inside_loop(frame)
+        raise _Break
 
 
 @expose
@@ -225,13 +332,12 @@ class continue_(_LoopControlFunction):
     _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /):
-        if len(args) != 0:
-            raise ValueError("continue does not take any arguments")
-        loop_data = cls._get_loop_data()
-        loop_data.should_continue = True
-        loop_data.copied_statement_list.aborted = True
-        return undefined
+    @receives_stack_frame
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None):
+        if not _release.release_mode:
+            cls._validate_args(args)
+        cls._check_inside_loop(frame)
+        raise _Continue
 
 
 # TODO: Maybe move somewhere else
@@ -255,18 +361,23 @@ class try_(Object, FunctionAsClass):
     _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /):
-        assert len(args) >= 1 and isinstance(
-            body := args[0], StatementList
-        ), "try's first argument must be a StatementList"
+    def _validate_args(cls, args: Args, /):
+        assert len(args) >= 1 and isinstance(args[0], StatementList), "try's first argument must be a StatementList"
         assert len(args) >= 3, "try requires 'catch' and a catch body"
         assert args[1] == String("catch"), "try's 2nd argument must be 'catch'"
-        error_key = args[2] if len(args) == 4 else None
-
         assert isinstance(catch_body := args[-1], StatementList), "catch's body must be a StatementList"
         cls.__validate_catch_body(catch_body)
 
-        cls._caller_stack_frame().catch_spec = CatchSpec(error_key, catch_body)
+    @classmethod
+    @receives_stack_frame
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None):
+        if not _release.release_mode:
+            cls._validate_args(args)
+        body = args[0]
+        error_key = args[2] if len(args) == 4 else None
+        catch_body = args[-1]
+
+        (frame or cls._caller_stack_frame()).catch_spec = CatchSpec(error_key, catch_body)
 
         return body()
 
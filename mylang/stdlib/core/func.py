@@ -1,16 +1,22 @@
 import contextlib
+import functools
 import os
 import pathlib
-from typing import Any, Callable, Generic, Optional, TypeVar, Union, final
+from types import MethodType
+from typing import Any, Callable, Generic, Iterable, NamedTuple, Optional, TypeVar, Union, final
 
+from ._compiler import CompiledStatement, compile_statement_list, current_engine
 from ._context import (
+    UNBOUND,
     CatchSpec,
+    check_stack_depth,
     internal_module_bridge,
     current_stack_frame,
     nested_stack_frame,
     LexicalScope,
     StackFrame,
 )
+from ._inline_cache import CallSiteCache
 from ._utils import (
     repr_,
     get_actual_python_module_export,
@@ -24,15 +30,17 @@ from ._utils import (
     python_obj_to_mylang,
     set_contextvar,
     FunctionAsClass,
-    populate_locals_for_callable,
     expose_instance_attr,
     is_attr_exposed,
+    receives_stack_frame,
 )
+from ._binding import BindingPlan
+from . import _release
 from ._utils.types import AnyObject, PythonContext
 from .base import Args, Array, Dict, IncompleteExpression, Object, TypedObject
 from .complex import Path, String
 from .error import Error, ErrorCarrier
-from .primitive import undefined
+from .primitive import Int, undefined
 
 
 __all__ = ("fun", "call", "get", "set_", "use", "op", "export", "StatementList", "ExecutionBlock")
@@ -46,6 +54,60 @@ class _Symbols:
     """The object that will be exported from the current module."""
 
 
+class TailCall(NamedTuple):
+    """A call made by ``return {f ...}``, which the function returning it makes in its place (see
+    :meth:`fun._m_call_`), so that the stack frames of the two don't nest."""
+
+    function: "fun"
+    args: Args
+    """The key of the function, followed by the arguments."""
+
+
+_RETURN = String("return")
+
+
+def tail_call_items(items: dict) -> Optional[dict]:
+    """Get the items of the call in the statement ``return {f ...}``, if it's a call of a function by name."""
+    if (
+        len(items) != 2
+        or type(head := items.get(Int(0))) is not String
+        or head != _RETURN
+        or type(block := items.get(Int(1))) is not ExecutionBlock
+        or len(block) != 1
+    ):
+        return None
+    call_items = Args(block[0])._m_dict_
+    if type(call_items.get(Int(0))) is not String:
+        return None
+    return call_items
+
+
+def _tail_call(statement: Object, frame: StackFrame) -> Optional[TailCall]:
+    """Get the tail call made by a statement with the tree-walking engine, if it is one.
+
+    The arguments are evaluated in the current scope, where the execution
+    block would look them up.
+    """
+    from .flow import return_
+
+    if frame.catch_spec is not None or type(statement) is not Args:
+        return None
+    if (call_items := tail_call_items(statement._m_dict_)) is None:
+        return None
+    try:
+        if frame.lexical_scope[_RETURN] is not return_:
+            return None
+        function = frame.lexical_scope[call_items[Int(0)]]
+    except KeyError:
+        return None
+    if type(function) is not fun:
+        return None
+    args = Args.__new__(Args)
+    args._m_dict_ = call_items
+    frame.return_value = tail_call = TailCall(function, IncompleteExpression.evaluate_all_in_object(args))
+    return tail_call
+
+
 @expose
 @function_defined_as_class()
 @expose_instance_attr("name", "parameters", "body")
@@ -53,6 +115,9 @@ class fun(Object, FunctionAsClass, Generic[TypeReturn]):
     _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
     _CALL_SHOULD_RECEIVE_NEW_STACK_FRAME = True
 
+    _code = None
+    """The bytecode of the body, once called by the ``vm`` engine (see :mod:`mylang.vm`)."""
+
     def __init__(self, name: "AnyObject", /, *parameters_and_body: "AnyObject", **kwargs):
         # When somebody constructs fun(...), Python will run __init__ automatically. Since we already called it from
         # _m_classcall_, another call should do nothing
@@ -60,37 +125,69 @@ class fun(Object, FunctionAsClass, Generic[TypeReturn]):
             return
 
         parameters_and_body_args = (
-            parameters_and_body if isinstance(parameters_and_body, Args) else Args(*parameters_and_body)
+            parameters_and_body[0]
+            if len(parameters_and_body) == 1 and isinstance(parameters_and_body[0], Args)
+            else Args(*parameters_and_body)
         )
-        parameters = (
-            Args(*parameters_and_body_args[:-1])
-            + Args.from_dict(parameters_and_body_args.keyed_dict())
-            + Args(**kwargs)
+        *positional_parameters, body = parameters_and_body_args.positional_values()
+        parameters = Args.from_positional_keyed(
+            positional_parameters, parameters_and_body_args.keyed_dict() | python_dict_from_args_kwargs(**kwargs)
         )
-        body = parameters_and_body_args[-1]
         assert isinstance(body, StatementList), "Body must be a StatementList"
         self.name = python_obj_to_mylang(name)
         self.parameters = parameters
         self.body = body
+        self._binding_plan = BindingPlan(parameters, self.name)
+        """How to bind the arguments of a call to the parameters."""
         self.closure_lexical_scope = self.__class__._caller_lexical_scope()
         """The lexical scope in which this function was defined."""
+        self.closure_lexical_scope.capture()
         self.__class__._caller_locals()[name] = self
 
     @classmethod
     def _m_classcall_(cls, args: "Args", /):
+        from .generator import GeneratorFunction, yields
+
         # TODO: Args must have unique names
-        func = super().__new__(cls)
+        body = args.positional_values()[-1]
+        func = super().__new__(GeneratorFunction if isinstance(body, StatementList) and yields(body) else cls)
         func.__init__(
             args[0],
             Args(*args[1:]) + Args.from_dict(args.keyed_dict()),
         )
         return func
 
-    def _m_call_(self, args: Args, /) -> TypeReturn:
-        stack_frame = current_stack_frame.get()
+    @receives_stack_frame
+    def _m_call_(self, args: Args, /, *, frame: Optional[StackFrame] = None) -> TypeReturn:
+        stack_frame = frame or current_stack_frame.get()
+        value = self.__execute(args, stack_frame)
+        while type(value) is TailCall:
+            # The function returned a call to make in its place, in a stack
+            # frame as deep as its own
+            function, call_args = value
+            stack_frame = StackFrame.acquire(parent=stack_frame.parent)
+            with stack_frame:
+                value = function.__execute(
+                    Args.from_positional_keyed(call_args.positional_values()[1:], call_args.keyed_dict()),
+                    stack_frame,
+                )
+            stack_frame.release()
+        return value
+
+    def __execute(self, args: Args, stack_frame: StackFrame):
+        """Execute the body in the stack frame, or return the tail call it makes instead (see :class:`TailCall`)."""
+        check_stack_depth(stack_frame)
         stack_frame.set_parent_lexical_scope(self.closure_lexical_scope)
-        populate_locals_for_callable(stack_frame.locals, self.parameters, args)
-        return self.body()  # type: ignore
+        self._binding_plan.bind(stack_frame.locals, args)
+        stack_frame.accepts_tail_call = True
+        try:
+            return self.body._m_call_(Args(), frame=stack_frame)  # type: ignore
+        except RecursionError:
+            # The tree-walking and closure engines recurse in Python, whose
+            # stack may be exhausted first
+            raise Error("Maximum stack depth of the Python interpreter exceeded") from None
+        finally:
+            stack_frame.accepts_tail_call = False
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.name!r})"
@@ -127,48 +224,80 @@ class call(Object, FunctionAsClass):
         super().__init__(func_key, *args, **kwargs)
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /):
-        func_key, rest = args[0], args[1:]
+    def _m_classcall_(
+        cls, args: Args, /, cache: Optional[CallSiteCache] = None, *, frame: Optional[StackFrame] = None
+    ):
+        """Call the function under the key given by the first argument.
 
-        caller_stack_frame = cls._caller_stack_frame()
+        Args:
+            args: The key of the function, followed by the arguments.
+            cache: The cache of the call site, if its key is always the same.
+            frame: The stack frame of the caller, if not the current one.
+        """
+        func_key, rest = args[0], args.positional_values()[1:]
 
-        obj_to_call = cls.__resolve_callable_object(func_key)
-        python_callable, needs_new_stack_frame = cls.__resolve_call_impl(obj_to_call)
+        caller_stack_frame = frame or cls._caller_stack_frame()
 
-        with (
-            set_contextvar(currently_called_func, python_callable),
-            nested_stack_frame() if needs_new_stack_frame else contextlib.nullcontext(),
-        ):
-            fun_args = Args.from_positional_keyed(rest, args.keyed_dict())
-            try:
-                value = python_callable(fun_args)
-                return value
-            except Exception as e:
-                if isinstance(e, ErrorCarrier):
-                    e = e.error
-
-                catch_spec = caller_stack_frame.catch_spec
-                if catch_spec is not None:
-                    caller_stack_frame.catch_spec = None
-                    result = cls.__process_caught_error(e, catch_spec)
-                    if result is not None:
-                        return result
-                    else:
-                        # No catch clause matched the type of the error
-                        raise
+        if cache is not None and (obj_to_call := cache.lookup(caller_stack_frame.lexical_scope)) is not UNBOUND:
+            python_callable, needs_new_stack_frame, receives_frame = cache.dispatch(obj_to_call)
+        else:
+            obj_to_call = cls.__resolve_callable_object(func_key, caller_stack_frame)
+            python_callable, needs_new_stack_frame, receives_frame = cls._resolve_call_impl(obj_to_call)
+
+        fun_args = Args.from_positional_keyed(rest, args.keyed_dict())
+        if not receives_frame:
+            with (
+                set_contextvar(currently_called_func, python_callable),
+                nested_stack_frame() if needs_new_stack_frame else contextlib.nullcontext(),
+            ):
+                return cls.__call_catching_errors(python_callable, fun_args, caller_stack_frame)
+        if not needs_new_stack_frame:
+            return cls.__call_catching_errors(python_callable, fun_args, caller_stack_frame, caller_stack_frame)
+
+        stack_frame = StackFrame.acquire(parent=caller_stack_frame)
+        with stack_frame:
+            value = cls.__call_catching_errors(python_callable, fun_args, caller_stack_frame, stack_frame)
+        stack_frame.release()
+        return value
+
+    @classmethod
+    def __call_catching_errors(
+        cls,
+        python_callable: Callable,
+        args: Args,
+        caller_stack_frame: StackFrame,
+        frame: Optional[StackFrame] = None,
+    ) -> "AnyObject":
+        """Call the Python callable, with the stack frame if given, catching errors as the caller's `try` specifies."""
+        try:
+            if frame is None:
+                return python_callable(args)
+            return python_callable(args, frame=frame)
+        except Exception as e:
+            if isinstance(e, ErrorCarrier):
+                e = e.error
+
+            catch_spec = caller_stack_frame.catch_spec
+            if catch_spec is not None:
+                caller_stack_frame.catch_spec = None
+                result = cls.__process_caught_error(e, catch_spec)
+                if result is not None:
+                    return result
                 else:
+                    # No catch clause matched the type of the error
                     raise
+            else:
+                raise
 
     @classmethod
-    def __resolve_callable_object(cls, key: "AnyObject") -> "AnyObject":
+    def __resolve_callable_object(cls, key: "AnyObject", caller_stack_frame: StackFrame) -> "AnyObject":
         from . import Ref
 
         obj_to_call: "AnyObject"
         if isinstance(ref := key, Ref):
             obj_to_call = ref.obj
         else:
-            with set_contextvar(currently_called_func, get._m_classcall_):
-                obj_to_call = get._m_classcall_(Args(key))
+            obj_to_call = get._lookup(key, caller_stack_frame.lexical_scope)
 
         if isinstance(ref := obj_to_call, Ref):
             obj_to_call = ref.obj
@@ -176,7 +305,13 @@ class call(Object, FunctionAsClass):
         return obj_to_call
 
     @classmethod
-    def __resolve_call_impl(cls, obj_to_call: "AnyObject"):
+    def _resolve_call_impl(cls, obj_to_call: "AnyObject") -> tuple[Callable, bool, bool]:
+        """Get the Python callable that calls an object, whether it needs a new stack frame, and whether it receives it.
+
+        A callable that receives the stack frame it runs in (see
+        `receives_stack_frame`) is called without the check of
+        `only_callable_by_call_decorator`.
+        """
         needs_new_stack_frame = True
 
         if isinstance(obj_to_call, type) and issubclass(obj_to_call, FunctionAsClass):
@@ -191,7 +326,12 @@ class call(Object, FunctionAsClass):
             # Regular MyLang callable
             python_callable = obj_to_call._m_call_
 
-        return python_callable, needs_new_stack_frame
+        receives_frame = getattr(python_callable, "_receives_stack_frame", False)
+        if receives_frame:
+            func = python_callable.__func__
+            python_callable = MethodType(getattr(func, "__wrapped__", func), python_callable.__self__)
+
+        return python_callable, needs_new_stack_frame, receives_frame
 
     @classmethod
     def __process_caught_error(cls, e: Error | Exception, catch_spec: CatchSpec) -> Optional[Object]:
@@ -228,6 +368,9 @@ class call(Object, FunctionAsClass):
                     any_error_matched = True
                     assert isinstance(original_body := args[-1], StatementList)
                     if catch_spec.error_key is not None:
+                        # The error is kept under the key, and its traceback references the stack frames
+                        # between the one that raised it and the one that caught it
+                        caller_stack_frame.capture()
                         # Inject the error into the catch body, under the specified key
                         body = StatementList.from_iterable(
                             [
@@ -245,18 +388,15 @@ class call(Object, FunctionAsClass):
                     else:
                         body = original_body
 
-                    catch_body.aborted = True
                     return body()
 
-        catch_body = StatementList.from_iterable(
-            (Args(Ref(execute_if_error_matches)) + args for args in catch_spec.body)
-        )
-        value = catch_body()
-
-        if any_error_matched:
-            return value
-        else:
-            return None
+        # The clauses are executed until one matches the error. The value is
+        # that of its body, but only if it's the last one
+        for i, clause in enumerate(catch_spec.body):
+            value = StatementList.from_iterable((Args(Ref(execute_if_error_matches)) + clause,))()
+            if any_error_matched:
+                return value if i == len(catch_spec.body) - 1 or caller_stack_frame.return_value else undefined
+        return None
 
 
 @expose
@@ -265,22 +405,33 @@ class get(Object, FunctionAsClass):
     _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /) -> "AnyObject":
-        from . import Ref
-
+    def _validate_args(cls, args: Args, /):
         # TODO: Proper exception type
         assert len(args) == 1, "get function requires exactly one argument"
+
+    @classmethod
+    @receives_stack_frame
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None) -> "AnyObject":
+        from . import Ref
+
+        if not _release.release_mode:
+            cls._validate_args(args)
         if isinstance(ref := args[0], Ref):
             return ref.obj
 
-        parts = path.parts if isinstance(path := args[0], Path) else (args[0],)
+        return cls._lookup(args[0], (frame or cls._caller_stack_frame()).lexical_scope)
+
+    @classmethod
+    def _lookup(cls, key: "AnyObject", lexical_scope: LexicalScope) -> "AnyObject":
+        """Get the object under a key, or a path of keys, in a lexical scope."""
+        parts = path.parts if isinstance(path := key, Path) else (key,)
 
-        obj = cls._caller_lexical_scope()
+        obj: Any = lexical_scope
 
         for part in parts:
-            obj = getattr_(obj, part)  # type: ignore
+            obj = getattr_(obj, part)
 
-        return obj  # type: ignore
+        return obj
 
 
 @expose
@@ -290,10 +441,11 @@ class set_(Object, FunctionAsClass):
     _m_name_ = "set"
 
     @classmethod
-    def _m_classcall_(cls, args: Args, /):
+    @receives_stack_frame
+    def _m_classcall_(cls, args: Args, /, *, frame: Optional[StackFrame] = None):
         from .primitive import undefined
 
-        lexical_scope_locals = cls._caller_lexical_scope().locals
+        lexical_scope_locals = (frame or cls._caller_stack_frame()).lexical_scope.locals
         for key, value in args._m_dict_.items():
             obj = lexical_scope_locals
             if isinstance(key, Path):
@@ -386,6 +538,9 @@ class use(Object, FunctionAsClass):
         else:
             assert False, "Unreachable"
 
+        # The module may bind keys that shadow the functions cached by call sites
+        LexicalScope.version += 1
+
         # Look up in cache and return if found
         cache_id = cls._get_cache_id(source, loader)
 
@@ -425,25 +580,29 @@ class use(Object, FunctionAsClass):
         return (source, loader)
 
     @classmethod
-    def _load_mylang_module(cls, code: str):
+    def _load_mylang_module(cls, code: "str | StatementList | Iterable[StatementList]"):
         """Load and execute a MyLang module from source code.
 
         Parse the code, transform it into executable statements, and execute
         the module in a nested stack frame with builtins injected.
 
         Args:
-            code: The MyLang source code to execute
+            code: The MyLang source code to execute, its already compiled
+                statement list, or statement lists to execute one after another
+                as they are compiled (see :mod:`mylang.streaming`)
 
         Returns:
             A tuple of (exported_value, lexical_scope) where:
             - exported_value: The module's exported value (return value or exported dict)
             - lexical_scope: The module's lexical scope for further manipulation
         """
-        from ...parser import parser
-        from ...transformer import Transformer
+        from ...cache import compile_source
+        from ...streaming import execute_stream
         from .. import builtins_
 
-        tree = parser.parse(code, start="module")
+        if isinstance(code, str):
+            code = compile_source(code)
+        statement_lists = [code] if isinstance(code, StatementList) else code
 
         # Enter a nested context, execute the module and obtain its exported
         # value. The exported value is either a dict of the module's locals or a
@@ -453,8 +612,9 @@ class use(Object, FunctionAsClass):
         # Inject builtins
         stack_frame = current_stack_frame.get()
         stack_frame.set_parent_lexical_scope(LexicalScope(builtins_.create_locals_dict()))
-        statement_list = Transformer().transform(tree)
-        statement_list()
+        # The lexical scope of the module is returned
+        stack_frame.lexical_scope.capture()
+        execute_stream(statement_lists)
 
         if stack_frame.return_value is not None:
             exported_value = stack_frame.return_value
@@ -469,7 +629,10 @@ class use(Object, FunctionAsClass):
     def _load_mylang_file(cls, path: str | os.PathLike):
         """Load and execute a MyLang module from a file.
 
-        Reads the file content and delegates to _load_mylang_module for execution.
+        Gets the compiled file content from the on-disk cache (compiling it if
+        needed) and delegates to _load_mylang_module for execution. Large files
+        are streamed instead, i.e. executed statement by statement while they
+        are being read.
 
         Args:
             path: File system path to the .my file to load
@@ -477,9 +640,13 @@ class use(Object, FunctionAsClass):
         Returns:
             A tuple of (exported_value, lexical_scope) as returned by _load_mylang_module
         """
-        with open(path, "r") as f:
-            code = f.read()
-        return cls._load_mylang_module(code)
+        from ...cache import load_file
+        from ...streaming import compile_stream, should_stream
+
+        if should_stream(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return cls._load_mylang_module(compile_stream(f))
+        return cls._load_mylang_module(load_file(path))
 
     class loaders:
         """Contains loader delegates that are used based on the type of source.
@@ -629,28 +796,45 @@ class use(Object, FunctionAsClass):
 
 @expose
 class StatementList(Array[Args]):
+    _incomplete_positions = ()
+    """A statement list is executed, not evaluated."""
+
     def __init__(self, *args, **kwargs):
-        self.aborted = False
-        """Used by executed code to signal that the execution of the StatementList should be aborted."""
+        self._compiled: Optional[tuple[CompiledStatement, ...]] = None
+        """The compiled statements, once executed by the closure engine."""
+        self._code = None
+        """The bytecode, once executed by the ``vm`` engine (see :mod:`mylang.vm`)."""
+        self._enclosing_layouts: tuple = ()
+        """The slot layouts of the scopes the statement list is nested in, if known to the ``vm`` engine."""
+        self._control_flow: Optional[tuple] = None
+        """How a control flow function executes the statement list, once compiled: the branches of an if-else
+        block (see :meth:`.flow.if_._get_branches`), or the steps of a loop body."""
         super().__init__(*args, **kwargs)
 
-    def _m_call_(self, args: Args) -> Object:
+    @receives_stack_frame
+    def _m_call_(self, args: Args, /, *, frame: Optional[StackFrame] = None) -> Object:
         assert not args, "StatementList does not accept arguments"
         from . import undefined
 
-        for i_statement, statement in enumerate(self):
-            result: Object
-            # Make sure an expression is converted to Args. If already Args, it
-            # won't be modified
-            args = Args(statement)
-            args = IncompleteExpression.evaluate_all_in_object(args)
+        # The statements are executed in the same stack frame, which they are given
+        stack_frame = frame or current_stack_frame.get()
 
-            if args.is_keyed_only():
-                result = set_(args)
-            else:
-                result = call(args)
+        engine = current_engine.get()
+        if engine == "vm":
+            from ...vm.interpreter import execute
+
+            return execute(self, stack_frame)
 
-            stack_frame = current_stack_frame.get()
+        statements: Iterable[Callable[[StackFrame], Object]]
+        if engine == "closure":
+            if self._compiled is None:
+                self._compiled = compile_statement_list(self)
+            statements = self._compiled
+        else:
+            statements = (functools.partial(self._interpret_statement, statement) for statement in self)
+
+        for i_statement, statement in enumerate(statements):
+            result = statement(stack_frame)
 
             if stack_frame.return_value is not None:
                 # If a return value was set, we stop executing further statements
@@ -659,11 +843,35 @@ class StatementList(Array[Args]):
             if i_statement == len(self) - 1:
                 return result
 
-            if self.aborted:
-                return stack_frame.return_value or undefined
-
         return undefined
 
+    @staticmethod
+    def _interpret_statement(statement: Object, frame: Optional[StackFrame] = None) -> Object:
+        """Execute a statement with the tree-walking engine, in the given stack frame or the current one."""
+        from . import Ref
+
+        if frame is not None and frame.accepts_tail_call and (tail_call := _tail_call(statement, frame)) is not None:
+            return tail_call
+
+        if type(statement) is Args and statement._incomplete_positions is not None:
+            # Args from the transformer are already numbered as Args() would
+            # do, so only the items that need it are evaluated, and the rest
+            # is copied, as the called function may modify its Args
+            args = IncompleteExpression.evaluate_all_in_object(statement)
+            if args is statement:
+                args = Args.__new__(Args)
+                args._m_dict_ = statement._m_dict_.copy()
+        else:
+            # Make sure an expression is converted to Args. If already Args,
+            # it won't be modified
+            args = Args(statement)
+            args = IncompleteExpression.evaluate_all_in_object(args)
+
+        if args.is_keyed_only():
+            return call._m_classcall_(Args.from_dict({0: Ref.to(set_)} | args._m_dict_), frame=frame)
+        else:
+            return call._m_classcall_(args, frame=frame)
+
     def _m_repr_(self):
         from .complex import String
 
@@ -677,9 +885,12 @@ class StatementList(Array[Args]):
 class ExecutionBlock(StatementList, IncompleteExpression):
     def evaluate(self) -> Object:
         caller_stack_frame = current_stack_frame.get()
-        with nested_stack_frame() as stack_frame:
-            stack_frame.set_parent_lexical_scope(caller_stack_frame.lexical_scope)
-            return super().__call__()
+        stack_frame = StackFrame.acquire(parent=caller_stack_frame)
+        stack_frame.set_parent_lexical_scope(caller_stack_frame.lexical_scope)
+        with stack_frame:
+            value = self._m_call_(Args(), frame=stack_frame)
+        stack_frame.release()
+        return value
 
 
 @expose
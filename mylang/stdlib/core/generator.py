@@ -0,0 +1,199 @@
+"""Generator functions, whose bodies produce values one at a time with `yield`.
+
+A function whose body contains a `yield` statement (outside of the functions
+defined in it) is a :class:`GeneratorFunction`. Calling it binds the
+arguments, but instead of running the body, returns a :class:`Generator`.
+Iterating over the generator, e.g. with `for`, runs the body until the next
+`yield`, and suspends it there until the next value is needed, so values are
+produced as they are consumed rather than collected upfront.
+
+The engines execute MyLang code by recursing in Python, so a body can't be
+suspended in the middle of its Python stack. Instead, each generator runs its
+body in a thread of its own, with a stack of its own. Only one of the two runs
+at a time: the consumer waits while the body runs until the next `yield`, and
+the body waits while the consumer runs, so the thread merely holds the
+suspended stack. A generator that is not iterated to the end is closed once
+nothing references its iterator anymore, e.g. when a `for` loop over it is
+exited by `break`, which unwinds its body. If it is collected without being
+closed, e.g. as part of a reference cycle, its body is unwound in its thread
+without waiting for it, so that the thread doesn't stay parked forever.
+"""
+
+import contextvars
+import queue
+import sys
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Iterator, NamedTuple, Optional
+
+from ._context import StackFrame, current_stack_frame
+from ._utils import FunctionAsClass, expose, function_defined_as_class, receives_stack_frame, repr_
+from . import _release
+from .base import Args, Object
+from .complex import String
+from .func import StatementList, fun
+from .primitive import undefined
+
+
+if TYPE_CHECKING:
+    from ._utils.types import AnyObject
+
+
+__all__ = ("Generator", "GeneratorFunction", "yield_", "yields")
+
+
+_YIELD = String("yield")
+_FUN = String("fun")
+
+
+def yields(body: StatementList) -> bool:
+    """Check whether a function body contains a `yield` statement, outside of the functions defined in it."""
+    pending = [body]
+    while pending:
+        for statement in pending.pop():
+            positional = statement.positional_values() if type(statement) is Args else ()
+            if positional and positional[0] == _YIELD:
+                return True
+            if not (positional and positional[0] == _FUN):
+                pending.extend(_release.nested_statement_lists(statement))
+    return False
+
+
+class _Channel(NamedTuple):
+    """The queues through which a generator and its body hand over control to each other."""
+
+    to_body: "queue.SimpleQueue[bool]"
+    """Resumes the body, unless closed (False)."""
+    from_body: "queue.SimpleQueue[tuple[str, Any]]"
+    """Yields a value, returns, or raises an error (``"yield"``, ``"return"`` or ``"error"``, and the value)."""
+
+
+_current_channel: contextvars.ContextVar[Optional[_Channel]] = contextvars.ContextVar("_current_channel", default=None)
+"""The channel of the generator whose body runs in the current thread."""
+
+
+class _GeneratorExit(BaseException):
+    """Unwinds the body of a generator that is closed before it returns."""
+
+
+def _abandon(channel: _Channel):
+    """Unwind the body of a generator that was collected without being closed, without waiting for it."""
+    channel.to_body.put(False)
+
+
+def _run_body(body: StatementList, frame: StackFrame, channel: _Channel):
+    """Run the body of a generator, once the first value is needed, and report how it ended."""
+    _current_channel.set(channel)
+    channel.to_body.get()
+    try:
+        body._m_call_(Args(), frame=frame)
+    except _GeneratorExit:
+        pass
+    except BaseException as e:  # pylint: disable=broad-exception-caught
+        channel.from_body.put(("error", e))
+        return
+    channel.from_body.put(("return", undefined))
+
+
+@expose
+class Generator(Object):
+    """The values yielded by a call of a generator function, produced as they are iterated over."""
+
+    _incomplete_positions = ()
+
+    def __init__(self, func: "GeneratorFunction", frame: StackFrame):
+        self.func = func
+        # The body runs in the stack frame after the call returns
+        frame.capture()
+        self._channel = _Channel(queue.SimpleQueue(), queue.SimpleQueue())
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            # The body runs in a copy of the context it was called in
+            target=contextvars.copy_context().run,
+            args=(_run_body, func.body, frame, self._channel),
+            name=f"mylang generator {func.name}",
+            daemon=True,
+        )
+        self._started = False
+        self._finalizer = weakref.finalize(self, _abandon, self._channel)
+        # Daemon threads are frozen while the interpreter shuts down
+        self._finalizer.atexit = False
+
+    def __iter__(self) -> Iterator["AnyObject"]:
+        assert not self._started, "A generator can only be iterated over once"
+        self._started = True
+        try:
+            while True:
+                kind, value = self._resume(True)
+                if kind == "yield":
+                    yield value
+                else:
+                    if kind == "error":
+                        raise value
+                    return
+        finally:
+            self.close()
+
+    def _resume(self, resume: bool) -> tuple[str, Any]:
+        """Resume the body, or unwind it if not `resume`, and wait until it yields or ends."""
+        assert self._thread is not None, "The generator has already ended"
+        if self._thread.ident is None:
+            self._thread.start()
+        self._channel.to_body.put(resume)
+        kind, value = self._channel.from_body.get()
+        if kind != "yield":
+            self._thread.join()
+            self._thread = None
+            self._finalizer.detach()
+        return kind, value
+
+    def close(self):
+        """Unwind the body, if it hasn't ended."""
+        if self._thread is None:
+            return
+        if self._thread.ident is None or sys.is_finalizing():
+            # Daemon threads are frozen while the interpreter shuts down
+            self._thread = None
+            self._finalizer.detach()
+        else:
+            self._resume(False)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.func!r})"
+
+    def _m_repr_(self):
+        return String(f"{{generator {repr_(self.func.name)}}}")
+
+
+class GeneratorFunction(fun):
+    """A function whose body contains `yield`, see :func:`yields`."""
+
+    @receives_stack_frame
+    def _m_call_(self, args: Args, /, *, frame: Optional[StackFrame] = None) -> Generator:  # type: ignore[override]
+        stack_frame = frame or current_stack_frame.get()
+        stack_frame.set_parent_lexical_scope(self.closure_lexical_scope)
+        self._binding_plan.bind(stack_frame.locals, args)
+        return Generator(self, stack_frame)
+
+
+@expose
+@function_defined_as_class()
+class yield_(Object, FunctionAsClass):
+    """Hand a value over to whoever iterates over the generator, and wait until the next value is needed."""
+
+    _m_name_ = "yield"
+    _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
+
+    @classmethod
+    def _validate_args(cls, args: Args, /):
+        assert args.is_positional_only() and len(args) == 1, "yield requires exactly one positional argument"
+
+    @classmethod
+    def _m_classcall_(cls, args: Args, /):
+        if not _release.release_mode:
+            cls._validate_args(args)
+        channel = _current_channel.get()
+        assert channel is not None, "yield statement not inside a generator"
+        channel.from_body.put(("yield", args[0]))
+        if not channel.to_body.get():
+            raise _GeneratorExit
+        return undefined
@@ -0,0 +1,215 @@
+"""Lazy pipelines over iterables.
+
+The combinators, such as `map`, `filter` and `take`, take any iterable (an
+array, a range, a generator, the lines of a file...) and return a
+:class:`Stream`, which computes its values only as they are iterated over.
+Chained combinators form a single pipeline that pulls each value through all
+the steps before the next one, so each value is computed once, and no array
+is built in between. The values are collected in an array by `collect`, or
+combined into one by `reduce`, or iterated over by `for`.
+
+    collect {take 3 {filter $is_even {map $square 0..1000000}}}
+"""
+
+import functools
+import itertools
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from . import _release
+from ._utils import FunctionAsClass, expose, function_defined_as_class, iter_
+from .base import Args, Array, Object
+from .complex import String
+from .error import Error
+from .primitive import Int
+
+
+if TYPE_CHECKING:
+    from ._utils.types import AnyObject
+
+
+__all__ = ("Stream", "map_", "filter_", "take", "drop", "zip_", "enumerate_", "reduce", "collect")
+
+
+@expose
+class Stream(Object):
+    """Values computed as they are iterated over, which can be iterated over only once."""
+
+    _incomplete_positions = ()
+
+    def __init__(self, iterator: Iterator["AnyObject"]):
+        self._iterator = iterator
+
+    def __iter__(self) -> Iterator["AnyObject"]:
+        return self._iterator
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._iterator!r})"
+
+    def _m_repr_(self):
+        return String("{stream}")
+
+
+def _calling(func: "AnyObject") -> Callable[..., "AnyObject"]:
+    """Get a Python function that calls a MyLang function with `call`, as `$` calls `get`."""
+    from .func import call
+    from .special import Ref
+
+    ref = Ref.to(func)
+
+    def call_func(*values: "AnyObject") -> "AnyObject":
+        return call._m_classcall_(Args(ref, *values))
+
+    return call_func
+
+
+class _Combinator(Object, FunctionAsClass):
+    """Base class for the functions that build and consume pipelines."""
+
+    _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
+
+    _ARGS_COUNT: "tuple[int, int | None]"
+    """The minimum and maximum (or None) number of positional arguments."""
+
+    @classmethod
+    def _validate_args(cls, args: Args, /):
+        minimum, maximum = cls._ARGS_COUNT
+        assert args.is_positional_only() and len(args) >= minimum and (maximum is None or len(args) <= maximum), (
+            f"{cls._m_name_} requires {minimum} positional arguments"
+            if minimum == maximum
+            else f"{cls._m_name_} requires {minimum} to {maximum or 'any number of'} positional arguments"
+        )
+
+    @classmethod
+    def _m_classcall_(cls, args: Args, /) -> "AnyObject":
+        if not _release.release_mode:
+            cls._validate_args(args)
+        return cls._apply(*args[:])
+
+    @classmethod
+    def _apply(cls, *args: "AnyObject") -> "AnyObject":
+        raise NotImplementedError
+
+
+class _CountCombinator(_Combinator):
+    """A combinator that takes a number of values and an iterable."""
+
+    _ARGS_COUNT = (2, 2)
+
+    @classmethod
+    def _m_classcall_(cls, args: Args, /) -> "AnyObject":
+        if not _release.release_mode:
+            cls._validate_args(args)
+        # The count is only known when called, also in release mode
+        assert type(args[0]) is Int and args[0].value >= 0, f"The first argument to {cls._m_name_} must be a count"
+        return cls._apply(*args[:])
+
+
+@expose
+@function_defined_as_class()
+class map_(_Combinator):
+    """Call a function with each value of an iterable, or with the values at the same position in each iterable."""
+
+    _m_name_ = "map"
+    _ARGS_COUNT = (2, None)
+
+    @classmethod
+    def _apply(cls, func, *iterables):
+        return Stream(map(_calling(func), *map(iter_, iterables)))
+
+
+@expose
+@function_defined_as_class()
+class filter_(_Combinator):
+    """Keep the values of an iterable for which a function returns a true value."""
+
+    _m_name_ = "filter"
+    _ARGS_COUNT = (2, 2)
+
+    @classmethod
+    def _apply(cls, func, iterable):
+        return Stream(filter(_calling(func), iter_(iterable)))
+
+
+@expose
+@function_defined_as_class()
+class take(_CountCombinator):
+    """Keep the first values of an iterable, and stop iterating over it."""
+
+    _m_name_ = "take"
+
+    @classmethod
+    def _apply(cls, count, iterable):
+        return Stream(itertools.islice(iter_(iterable), count.value))
+
+
+@expose
+@function_defined_as_class()
+class drop(_CountCombinator):
+    """Skip the first values of an iterable."""
+
+    _m_name_ = "drop"
+
+    @classmethod
+    def _apply(cls, count, iterable):
+        return Stream(itertools.islice(iter_(iterable), count.value, None))
+
+
+@expose
+@function_defined_as_class()
+class zip_(_Combinator):
+    """Make arrays of the values at the same position in each iterable, until the shortest one ends."""
+
+    _m_name_ = "zip"
+    _ARGS_COUNT = (1, None)
+
+    @classmethod
+    def _apply(cls, *iterables):
+        return Stream(map(Array.from_iterable, zip(*map(iter_, iterables))))
+
+
+@expose
+@function_defined_as_class()
+class enumerate_(_Combinator):
+    """Make arrays of the position of each value of an iterable, counted from 0, and the value."""
+
+    _m_name_ = "enumerate"
+    _ARGS_COUNT = (1, 1)
+
+    @classmethod
+    def _apply(cls, iterable):
+        return Stream(map(Array.from_iterable, enumerate(iter_(iterable))))
+
+
+@expose
+@function_defined_as_class()
+class reduce(_Combinator):
+    """Combine the values of an iterable into one, calling a function with the result so far and the next value.
+
+    The result so far starts as the initial value, if given, or as the first
+    value otherwise.
+    """
+
+    _m_name_ = "reduce"
+    _ARGS_COUNT = (2, 3)
+
+    @classmethod
+    def _apply(cls, func, iterable, *initial):
+        iterator = iter_(iterable)
+        if not initial:
+            initial = tuple(itertools.islice(iterator, 1))
+            if not initial:
+                raise Error("reduce of an empty iterable requires an initial value")
+        return functools.reduce(_calling(func), iterator, initial[0])
+
+
+@expose
+@function_defined_as_class()
+class collect(_Combinator):
+    """Iterate over an iterable, e.g. the end of a pipeline, and make an array of its values."""
+
+    _m_name_ = "collect"
+    _ARGS_COUNT = (1, 1)
+
+    @classmethod
+    def _apply(cls, iterable):
+        return Array.from_iterable(iter_(iterable))
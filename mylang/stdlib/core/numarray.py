@@ -0,0 +1,352 @@
+"""Numeric arrays, whose operators compute on all their values at once.
+
+A :class:`NumArray` holds numbers of a single type (integers, floats or
+booleans) unboxed, rather than as MyLang objects. The operators in the
+operator table (see :mod:`._operators`) compute elementwise on numeric arrays,
+and on a numeric array and a number, in a single call, as do the reductions,
+like `sum`:
+
+    xs = {numarray 0..1000000}
+    sum {$xs * $xs}
+
+The values are stored in a NumPy array if NumPy is installed, which is
+imported when the first numeric array is created. Otherwise, they are stored
+in an :class:`array.array`, and computed on by Python loops, which is slower,
+but still avoids boxing each value and dispatching each operation.
+
+Both give the same results: dividing by zero, or computing an integer that
+doesn't fit in 64 bits or a float too large to represent, raises an
+:class:`~.error.Error`, which NumPy doesn't do by itself.
+"""
+
+import array
+import functools
+import itertools
+import math
+import operator
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
+
+from . import _release
+from ._utils import FunctionAsClass, expose, function_defined_as_class, iter_, repr_
+from .base import Args, Array, Object
+from .complex import String
+from .error import Error
+from .primitive import Bool, Float, Int
+
+
+if TYPE_CHECKING:
+    from ._utils.types import AnyObject
+
+
+__all__ = ("NumArray", "sum_", "min_", "max_", "mean")
+
+
+_TYPECODES = {Int: "q", Float: "d", Bool: "b"}
+"""The typecodes of :class:`array.array` that store the values of each type."""
+_DTYPES = {Int: "int64", Float: "float64", Bool: "bool"}
+"""The dtypes of NumPy arrays that store the values of each type."""
+_PYTHON_TYPES = {Int: int, Float: float, Bool: bool}
+"""The Python types of the values of each type, to convert the stored values to, e.g. booleans stored as integers."""
+_INT_MIN, _INT_MAX = -(2**63), 2**63 - 1
+"""The range of the integers that a numeric array can hold."""
+_INEXACT_INT = 2.0**62
+"""From which magnitude an integer computed on floats may not fit in 64 bits, and is computed exactly to check it."""
+_TOO_LARGE = {
+    Int: "Numeric arrays can only hold integers that fit in 64 bits",
+    Float: "Numeric arrays can only hold floats that are not too large to represent",
+}
+"""The messages of the errors raised when a number is too large for a numeric array, by the type of the number."""
+
+
+@functools.cache
+def _numpy() -> Optional[Any]:
+    """Get the NumPy module, or None if it is not installed."""
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return numpy
+
+
+def _value_type(values: Iterable["AnyObject"]) -> type:
+    """Get the type that can hold all the values: Float if any of them is a Float, else Int, else Bool."""
+    types = set(map(type, values))
+    assert types <= _TYPECODES.keys(), "A numeric array can only hold integers, floats and booleans"
+    return Float if Float in types else Int if Int in types or not types else Bool
+
+
+@expose
+@function_defined_as_class()
+class NumArray(Object, FunctionAsClass):
+    """An array of numbers of one type, on which operators compute elementwise.
+
+    Created by `numarray iterable`, e.g. from an array or a range.
+    """
+
+    _m_name_ = "numarray"
+    _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
+    _incomplete_positions = ()
+
+    __slots__ = ("type_", "_values")
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any], type_: type, /) -> "NumArray":
+        """Create a numeric array with Python values.
+
+        Args:
+            values: The Python values, or a NumPy array.
+            type_: The MyLang type of the values, Int, Float or Bool.
+        """
+        numpy = _numpy()
+        obj = super().__new__(cls)
+        obj.type_ = type_
+        try:
+            obj._values = (
+                numpy.asarray(values, dtype=_DTYPES[type_]) if numpy else array.array(_TYPECODES[type_], values)
+            )
+        except OverflowError:
+            raise Error(_TOO_LARGE[type_]) from None
+        return obj
+
+    @classmethod
+    def from_iterable(cls, iterable: "AnyObject", /) -> "NumArray":
+        """Create a numeric array with the values of a MyLang iterable."""
+        from .range_ import Range
+
+        if type(iterable) is Range:
+            numpy = _numpy()
+            range_ = iterable._range
+            values = numpy.arange(range_.start, range_.stop, range_.step) if numpy else range_
+            return cls.from_values(values, Int)
+        values = list(iter_(iterable))
+        return cls.from_values([value.value for value in values], _value_type(values))
+
+    @classmethod
+    def _validate_args(cls, args: Args, /):
+        assert args.is_positional_only() and len(args) == 1, "numarray requires exactly one positional argument"
+
+    @classmethod
+    def _m_classcall_(cls, args: Args, /) -> "NumArray":
+        if not _release.release_mode:
+            cls._validate_args(args)
+        return cls.from_iterable(args[0])
+
+    @classmethod
+    def apply(cls, compute: Callable[[Any, Any], Any], a: "AnyObject", b: "AnyObject", type_: Optional[type] = None):
+        """Compute an operation on each pair of values of two numeric arrays, or of a numeric array and a number.
+
+        Args:
+            compute: Computes the operation on two Python values, or on two NumPy arrays.
+            type_: The type of the result values, or None for Float if any of
+                the operands is of floats, and Int otherwise.
+
+        Raises:
+            Error: If the operation divides by zero, or if a result doesn't fit
+                the type of the result values.
+        """
+        operands = (a, b)
+        assert all(type(x) is NumArray or type(x) in _TYPECODES for x in operands), (
+            "The operands of a numeric array operation must be numeric arrays or numbers"
+        )
+        types = {x.type_ if type(x) is NumArray else type(x) for x in operands}
+        if type_ is None:
+            type_ = Float if Float in types else Int
+        lengths = {len(x) for x in operands if type(x) is NumArray}
+        assert len(lengths) == 1, "The numeric arrays of an operation must have the same length"
+        if compute is operator.truediv and 0 in (b._values if type(b) is NumArray else (b.value,)):
+            raise Error("Division by zero in a numeric array operation")
+
+        if numpy := _numpy():
+            # NumPy computes arithmetic on booleans as logic, so they are computed on as integers
+            arrays = tuple(
+                (x._values.astype(_DTYPES[Int]) if x.type_ is Bool and type_ is not Bool else x._values)
+                if type(x) is NumArray
+                else x.value
+                for x in operands
+            )
+            # Overflows are checked below, rather than warned about
+            with numpy.errstate(all="ignore"):
+                values = compute(*arrays)
+            if type_ is Int and values.size:
+                _check_ints(numpy, compute, arrays)
+        else:
+            iterables = (x._values if type(x) is NumArray else itertools.repeat(x.value) for x in operands)
+            values = map(compute, *iterables)
+        result = cls.from_values(values, type_)
+        if type_ is Float:
+            _check_floats(result, operands)
+        return result
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self) -> Iterator["AnyObject"]:
+        return map(self.type_, map(_PYTHON_TYPES[self.type_], self._values.tolist()))
+
+    def __getitem__(self, index: int, /) -> "AnyObject":
+        return self.box(self._values[index])
+
+    def box(self, value: Any, /) -> "AnyObject":
+        """Convert a stored value, or a NumPy scalar, to a MyLang object of the type of the values."""
+        return self.type_(_PYTHON_TYPES[self.type_](value))
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, NumArray)
+            and self.type_ is other.type_
+            and self._values.tolist() == other._values.tolist()
+        )
+
+    def __hash__(self):
+        return id(self)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._values.tolist()!r}, {self.type_.__name__})"
+
+    def _m_repr_(self):
+        return String(f"{{numarray {repr_(Array.from_iterable(self)).value}}}")
+
+    def _m_getattr_(self, key: "Object", /):
+        if isinstance(key, Int):
+            if not -len(self) <= key.value < len(self):
+                raise Error(f"Index {key.value} out of a numeric array of length {len(self)}")
+            return self[key.value]
+        else:
+            raise Error(f"A numeric array has no attribute {repr_(key).value}")
+
+
+def _check_ints(numpy: Any, compute: Callable[[Any, Any], Any], arrays: tuple):
+    """Check that the integers computed by NumPy, which wraps them around, fit in 64 bits.
+
+    The operations on integers (addition, subtraction and multiplication) are
+    largest at the corners of the ranges of their operands, so there is nothing
+    to check if they fit there. Otherwise, the integers are computed on floats,
+    and those that may not fit are computed again exactly, on Python integers.
+    """
+    bounds_by_id: dict[int, tuple[int, int]] = {}
+    for x in arrays:
+        # The same array may be both operands, e.g. to square it
+        if isinstance(x, numpy.ndarray) and id(x) not in bounds_by_id:
+            bounds_by_id[id(x)] = (int(x.min()), int(x.max()))
+    bounds = [bounds_by_id[id(x)] if isinstance(x, numpy.ndarray) else (x, x) for x in arrays]
+    if all(_INT_MIN <= compute(*corner) <= _INT_MAX for corner in itertools.product(*bounds)):
+        return
+    with numpy.errstate(all="ignore"):
+        approximate = compute(*(x.astype("float64") if isinstance(x, numpy.ndarray) else float(x) for x in arrays))
+    large = numpy.abs(approximate) >= _INEXACT_INT
+    if large.any():
+        exact = compute(*(x[large].astype(object) if isinstance(x, numpy.ndarray) else x for x in arrays))
+        if any(not _INT_MIN <= value <= _INT_MAX for value in exact.tolist()):
+            raise Error(_TOO_LARGE[Int])
+
+
+def _check_floats(result: NumArray, operands: Iterable["AnyObject"]):
+    """Check that the floats computed from finite numbers are finite, i.e. that they didn't overflow."""
+    numpy = _numpy()
+    if numpy.isfinite(result._values).all() if numpy else all(map(math.isfinite, result._values)):
+        return
+    finite = [
+        map(math.isfinite, x._values) if type(x) is NumArray else itertools.repeat(math.isfinite(x.value))
+        for x in operands
+    ]
+    values = result._values.tolist() if numpy else result._values
+    if any(not math.isfinite(value) and all(operands_finite) for value, *operands_finite in zip(values, *finite)):
+        raise Error(_TOO_LARGE[Float])
+
+
+class _Reduction(Object, FunctionAsClass):
+    """Base class for the functions that reduce the numbers of an iterable, e.g. a numeric array, to one."""
+
+    _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
+
+    _EMPTY: "AnyObject | None" = None
+    """The result for no numbers, or None if it's an error."""
+
+    @classmethod
+    def _validate_args(cls, args: Args, /):
+        assert args.is_positional_only() and len(args) == 1, f"{cls._m_name_} requires exactly one positional argument"
+
+    @classmethod
+    def _m_classcall_(cls, args: Args, /) -> "AnyObject":
+        if not _release.release_mode:
+            cls._validate_args(args)
+        numbers = args[0] if type(args[0]) is NumArray else NumArray.from_iterable(args[0])
+        if not len(numbers):
+            if cls._EMPTY is None:
+                raise Error(f"{cls._m_name_} of no numbers")
+            return cls._EMPTY
+        return cls._reduce(numbers)
+
+    @classmethod
+    def _reduce(cls, numbers: NumArray) -> "AnyObject":
+        raise NotImplementedError
+
+
+@expose
+@function_defined_as_class()
+class sum_(_Reduction):
+    """Add up the numbers of an iterable, e.g. a numeric array."""
+
+    _m_name_ = "sum"
+    _EMPTY = Int(0)
+
+    @classmethod
+    def _reduce(cls, numbers):
+        if numpy := _numpy():
+            with numpy.errstate(all="ignore"):
+                total = numbers._values.sum().item()
+            if numbers.type_ is not Float and abs(numbers._values.sum(dtype="float64")) >= _INEXACT_INT:
+                # NumPy wraps the integers around, so the sum may not fit in 64 bits
+                total = sum(numbers._values.tolist())
+        else:
+            total = sum(numbers._values)
+        if numbers.type_ is Float:
+            if not math.isfinite(total) and all(map(math.isfinite, numbers._values)):
+                raise Error(_TOO_LARGE[Float])
+            return Float(total)
+        if not _INT_MIN <= total <= _INT_MAX:
+            raise Error(_TOO_LARGE[Int])
+        return Int(total)
+
+
+@expose
+@function_defined_as_class()
+class min_(_Reduction):
+    """Get the smallest number of an iterable, e.g. a numeric array."""
+
+    _m_name_ = "min"
+
+    @classmethod
+    def _reduce(cls, numbers):
+        return numbers.box(numbers._values.min() if _numpy() else min(numbers._values))
+
+
+@expose
+@function_defined_as_class()
+class max_(_Reduction):
+    """Get the largest number of an iterable, e.g. a numeric array."""
+
+    _m_name_ = "max"
+
+    @classmethod
+    def _reduce(cls, numbers):
+        return numbers.box(numbers._values.max() if _numpy() else max(numbers._values))
+
+
+@expose
+@function_defined_as_class()
+class mean(_Reduction):
+    """Get the arithmetic mean of the numbers of an iterable, e.g. a numeric array."""
+
+    _m_name_ = "mean"
+
+    @classmethod
+    def _reduce(cls, numbers):
+        if numpy := _numpy():
+            with numpy.errstate(all="ignore"):
+                mean_ = numbers._values.mean().item()
+        else:
+            mean_ = sum(numbers._values) / len(numbers._values)
+        if not math.isfinite(mean_) and all(map(math.isfinite, numbers._values)):
+            raise Error(_TOO_LARGE[Float])
+        return Float(mean_)
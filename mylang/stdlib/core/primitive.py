@@ -7,10 +7,10 @@ booleans, and special values like undefined and null.
 from abc import ABC
 from typing import Generic, TypeVar, final
 
+from ._interning import primitives
 from ._utils import expose, str_, repr_
 
 from .base import Object
-import functools
 
 
 TypeValue = TypeVar("TypeValue")
@@ -18,10 +18,15 @@ TypeValue = TypeVar("TypeValue")
 
 @expose
 class Primitive(Object):
-    # TODO: Use weak caching
-    @functools.cache
-    def __new__(cls, *_):
-        return super().__new__(cls)
+    _incomplete_positions = ()
+
+    def __new__(cls, *args):
+        # Interned, see _interning
+        key = (cls, *args)
+        obj = primitives.get(key)
+        if obj is None:
+            obj = primitives.add(key, super().__new__(cls))
+        return obj
 
 
 @expose
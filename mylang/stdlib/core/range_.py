@@ -0,0 +1,110 @@
+"""Lazy ranges of integers."""
+
+from typing import Iterator, overload
+
+from . import _release
+from ._utils import FunctionAsClass, expose, function_defined_as_class, repr_
+from .base import Args, Object
+from .error import Error
+from .primitive import Int, Number
+
+
+@expose
+@function_defined_as_class()
+class Range(Object, FunctionAsClass):
+    """The integers from `start` up to, but excluding, `stop`, by `step`.
+
+    The integers are computed when needed, so a range takes the same memory
+    whatever its length, and its length, items and membership are computed in
+    constant time. Created by `range stop`, `range start stop` and
+    `range start stop step`, or by the `..` operator, as in `0..10`.
+    """
+
+    _m_name_ = "range"
+    _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
+    _incomplete_positions = ()
+
+    __slots__ = ("_range",)
+
+    def __init__(self, start: int, stop: int, step: int = 1):
+        self._range = range(start, stop, step)
+
+    @classmethod
+    def from_range(cls, range_: range, /) -> "Range":
+        """Create a range with the same integers as a Python range."""
+        obj = super().__new__(cls)
+        obj._range = range_
+        return obj
+
+    @classmethod
+    def _validate_args(cls, args: Args, /):
+        assert args.is_positional_only() and 1 <= len(args) <= 3, "range requires 1 to 3 positional arguments"
+
+    @classmethod
+    def _m_classcall_(cls, args: Args, /) -> "Range":
+        if not _release.release_mode:
+            cls._validate_args(args)
+        # The values of the arguments are only known when called, also in release mode
+        assert all(isinstance(arg, Int) for arg in args[:]), "The arguments to range must be integers"
+        assert len(args) < 3 or args[2].value != 0, "The step of a range must not be zero"
+        return cls.from_range(range(*(arg.value for arg in args[:])))
+
+    @property
+    def start(self) -> Int:
+        return Int(self._range.start)
+
+    @property
+    def stop(self) -> Int:
+        return Int(self._range.stop)
+
+    @property
+    def step(self) -> Int:
+        return Int(self._range.step)
+
+    def __eq__(self, other):
+        return isinstance(other, Range) and self._range == other._range
+
+    def __hash__(self):
+        return hash(self._range)
+
+    def __iter__(self) -> Iterator[Int]:
+        return map(Int, self._range)
+
+    def __len__(self):
+        return len(self._range)
+
+    def __contains__(self, value):
+        return isinstance(value, Number) and value.value in self._range
+
+    @overload
+    def __getitem__(self, key: slice, /) -> "Range": ...
+    @overload
+    def __getitem__(self, key: int, /) -> Int: ...
+
+    def __getitem__(self, key: int | slice, /):
+        if isinstance(key, slice):
+            return Range.from_range(self._range[key])
+        return Int(self._range[key])
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._range.start!r}, {self._range.stop!r}, {self._range.step!r})"
+
+    def _m_repr_(self):
+        from .complex import String
+
+        start, stop, step = self._range.start, self._range.stop, self._range.step
+        if step == 1:
+            return String(f"{start}..{stop}")
+        return String(f"{{range {start} {stop} {step}}}")
+
+    def _m_getattr_(self, key: "Object", /):
+        from .complex import String
+
+        if isinstance(key, Int):
+            if not -len(self._range) <= key.value < len(self._range):
+                raise Error(f"Index {key.value} out of range {repr_(self).value}")
+            return self[key.value]
+        elif isinstance(key, String) and key.value in ("start", "stop", "step"):
+            return getattr(self, key.value)
+        else:
+            raise Error(f"A range has no attribute {repr_(key).value}")
@@ -3,8 +3,11 @@
 This module provides basic I/O operations like printing to stdout.
 """
 
-from ..core import undefined
+from typing import Iterator
+
+from ..core import String, undefined
 from ..core.base import Args, Object
+from ..core.iteration import Stream
 from ..core._utils import expose, function_defined_as_class, FunctionAsClass, str_
 
 
@@ -21,3 +24,31 @@ class echo(Object, FunctionAsClass):
         """Prints the input value to stdout."""
         print(*(str_(arg).value for arg in args[:]))
         return undefined
+
+
+@expose
+@function_defined_as_class()
+class lines(Object, FunctionAsClass):
+    """Reads the lines of a text file, one at a time as they are iterated over."""
+
+    _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
+
+    @classmethod
+    def _validate_args(cls, args: Args, /):
+        assert args.is_positional_only() and len(args) == 1, "lines requires exactly one positional argument"
+
+    @classmethod
+    def _m_classcall_(cls, args: Args, /):
+        """Returns a stream of the lines of the file at the given path, without their line endings."""
+        from ..core import _release
+
+        if not _release.release_mode:
+            cls._validate_args(args)
+        return Stream(cls._read(str_(args[0]).value))
+
+    @staticmethod
+    def _read(path: str) -> Iterator[String]:
+        # The file is closed once read to the end, or once the stream is no longer referenced
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield String(line.rstrip("\r\n"))
@@ -11,14 +11,15 @@ import sys
 import traceback
 import termios
 
-from lark import Tree, UnexpectedCharacters, UnexpectedEOF
+from lark import Tree, UnexpectedEOF, UnexpectedInput
 
 from .state import InteractiveTextBuffer
 
 from ..ui.keyboard import Key
 from ..ui.term import ANSISequence, KeyChord, UnknownANSISequence, next_token
 
-from ...parser import parser
+from ...incremental import IncrementalParser
+from ...parser import get_parser
 from ..core import undefined, Object
 from ...transformer import Transformer
 from ..core.func import StatementList
@@ -54,6 +55,7 @@ class REPL:
         self.continuation_prompt = continuation_prompt
         self.buffer = InteractiveTextBuffer()
         self.input_source = input_source
+        self.parser = IncrementalParser(get_parser("lalr"), start="statement_list", tree_parser=get_parser())
 
     def prompt(self):
         """Prompt the user for input."""
@@ -130,7 +132,7 @@ class REPL:
         Side effects:
             Clears the buffer on successful evaluation.
         Raises:
-            UnexpectedCharacters: If the input has a syntax error.
+            UnexpectedInput: If the input has a syntax error.
             UnexpectedEOF: If the input is incomplete.
         """
         content = self.buffer.content.strip()
@@ -138,11 +140,13 @@ class REPL:
             self.buffer = InteractiveTextBuffer()
             return undefined
 
-        # Parse the buffer
+        # Parse the buffer, feeding only the lines that are new since the last attempt
         # Buffer is cleared on successful parsing or on syntax error
         try:
-            tree = parser.parse(self.buffer.content + "\n", start="statement_list")
-        except UnexpectedCharacters:
+            tree = self.parser.parse(self.buffer.content + "\n")
+        except UnexpectedEOF:
+            raise
+        except UnexpectedInput:
             self.buffer = InteractiveTextBuffer()
             raise
         self.buffer = InteractiveTextBuffer()
@@ -152,7 +156,7 @@ class REPL:
         if os.getenv("MYLANG_DEBUG"):
             _print_debug_info(tree)
 
-        statement_list = Transformer().transform(tree)
+        statement_list = Transformer(whole_module=False).transform(tree)
 
         assert isinstance(
             statement_list, StatementList
@@ -198,12 +202,12 @@ class REPL:
                     print("^C")
                     self.buffer = InteractiveTextBuffer()
                     continue
-                except UnexpectedCharacters:
-                    print("TODO: Syntax Error")
-                    self.buffer = InteractiveTextBuffer()
                 except UnexpectedEOF:
                     # Incomplete input, continue reading
                     pass
+                except UnexpectedInput:
+                    print("TODO: Syntax Error")
+                    self.buffer = InteractiveTextBuffer()
                 except Exception:
                     self.buffer = InteractiveTextBuffer()
                     traceback.print_exc()
@@ -0,0 +1,69 @@
+"""Execution of MyLang code while it is being read.
+
+Normally a module is parsed, transformed and only then executed as a whole
+(see :mod:`mylang.cache`). Streaming instead splits the source at top-level
+statement boundaries and parses, transforms and executes each top-level
+statement as soon as it has been read. Memory use is bounded by the size of
+the largest top-level statement rather than the size of the source, and the
+code starts running right away.
+
+Source files of at least :data:`STREAM_THRESHOLD` bytes are streamed, as well
+as code piped into the interpreter.
+"""
+
+import os
+from typing import Iterable, Iterator
+
+from .stdlib.core._context import current_stack_frame
+from .stdlib.core.func import StatementList
+
+
+__all__ = ("STREAM_THRESHOLD", "should_stream", "compile_stream", "execute_stream")
+
+
+STREAM_THRESHOLD = 1 << 20
+"""Size (in bytes) from which source files are streamed rather than compiled (and cached) as a whole."""
+
+
+def should_stream(path: str | os.PathLike) -> bool:
+    """Whether the source file is large enough to be streamed."""
+    return os.stat(path).st_size >= STREAM_THRESHOLD
+
+
+def compile_stream(lines: Iterable[str]) -> Iterator[StatementList]:
+    """Parse and transform MyLang source code one top-level statement at a time.
+
+    Args:
+        lines: Lines of the source code, e.g. an open text file.
+
+    Yields:
+        A statement list for each top-level statement, as soon as it has been
+        read.
+    """
+    from .incremental import IncrementalParser
+    from .parser import get_parser
+    from .transformer import Transformer
+
+    parser = IncrementalParser(get_parser("lalr"), tree_parser=get_parser())
+    transformer = Transformer(whole_module=False)
+
+    for line in lines:
+        for tree in parser.feed(line):
+            yield transformer.transform(tree)
+    for tree in parser.close():
+        yield transformer.transform(tree)
+
+
+def execute_stream(statement_lists: Iterable[StatementList]):
+    """Execute statement lists one after another in the current stack frame.
+
+    Execution stops early if a value is returned from the executed code.
+
+    Args:
+        statement_lists: The code to execute, e.g. from :func:`compile_stream`.
+    """
+    stack_frame = current_stack_frame.get()
+    for statement_list in statement_lists:
+        statement_list()
+        if stack_frame.return_value is not None:
+            break
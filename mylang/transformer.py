@@ -1,5 +1,8 @@
 """Transformer for converting Lark parse trees to mylang AST objects."""
 
+import re
+import unicodedata
+
 from lark import Transformer as _Transformer, Token, Tree
 
 from .stdlib.core import (
@@ -20,10 +23,79 @@ from .stdlib.core import (
     Path,
 )
 
+from .stdlib.core import _release
+from .stdlib.core._release import validate_statement_list
+from .stdlib.core.base import mark_incomplete_positions
 from .stdlib.core.func import StatementList, ExecutionBlock
 
 
+_SIMPLE_ESCAPES = {
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
+
+_ESCAPE = re.compile(r"\\([0-7]{1,3}|x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|.)", re.DOTALL)
+
+
+def _decode_escape(match: re.Match) -> str:
+    escape = match[1]
+    if escape in _SIMPLE_ESCAPES:
+        return _SIMPLE_ESCAPES[escape]
+    kind = escape[0]
+    if kind in "01234567":
+        return chr(int(escape, 8))
+    if kind in "xuU" and len(escape) > 1:
+        return chr(int(escape[1:], 16))
+    if kind == "N" and len(escape) > 1:
+        try:
+            return unicodedata.lookup(escape[2:-1])
+        except KeyError:
+            raise ValueError(f"Unknown Unicode character name in escape sequence: {match[0]}") from None
+    if kind in "xuUN":
+        raise ValueError(f"Truncated escape sequence: {match[0]}")
+    # Unknown escape sequences are kept as they are
+    return match[0]
+
+
+def decode_string_literal(literal: str) -> str:
+    """Decode a quoted string literal, with the same escape sequences as in Python string literals.
+
+    Args:
+        literal: The literal, including the quotes.
+
+    Returns:
+        The value of the string.
+
+    Raises:
+        ValueError: If the literal contains an invalid escape sequence.
+    """
+    value = literal[1:-1]
+    if "\\" not in value:
+        return value
+    return _ESCAPE.sub(_decode_escape, value)
+
+
 class Transformer(_Transformer):
+    def __init__(self, *, whole_module: bool = True):
+        """Initialize the transformer.
+
+        Args:
+            whole_module: Whether each transformed tree is a whole module,
+                rather than one of its statements, e.g. when streamed. The
+                calls of builtins are only validated in whole modules in
+                release mode (see :mod:`.stdlib.core._release`).
+        """
+        super().__init__()
+        self.whole_module = whole_module
+
     def BOOL(self, token: Token):
         return Bool(token.value == "true")
 
@@ -45,17 +117,16 @@ class Transformer(_Transformer):
         return String(token.value)
 
     def DOUBLE_QUOTED_STRING(self, token: Token):
-        return String(eval(token.value))  # TODO: Replace or thoroughly test
+        return String(decode_string_literal(token.value))
 
     def SINGLE_QUOTED_STRING(self, token: Token):
-        return String(eval(token.value))  # TODO: Replace or thoroughly test
+        return String(decode_string_literal(token.value))
 
     def args(self, items: list[Tree | Object]):
         dict_ = {
-            # Positional arguments
+            # Positional arguments, numbered as if the keyed ones weren't there
             index: item
-            for index, item in enumerate(items)
-            if not isinstance(item, Tree)
+            for index, item in enumerate(item for item in items if not isinstance(item, Tree))
         } | {
             # Keyed arguments
             self.transform(item.children[0]): self.transform(item.children[1])
@@ -63,13 +134,13 @@ class Transformer(_Transformer):
             if isinstance(item, Tree) and item.data == "assignment"
         }
 
-        return Args.from_dict(dict_)
+        return mark_incomplete_positions(Args.from_dict(dict_))
 
     def dict(self, items: list[Tree | Object]):
-        return Dict(self.args(items))
+        return mark_incomplete_positions(Dict(self.args(items)))
 
     def array(self, items: list[Object]):
-        return Array.from_iterable(items)
+        return mark_incomplete_positions(Array.from_iterable(items))
 
     def statement_list(self, statements: list[Args]):
         return StatementList.from_iterable(statements)
@@ -97,13 +168,18 @@ class Transformer(_Transformer):
 
     def module(self, items: tuple[StatementList | Args | Object]):
         if not items:
-            return StatementList()
+            statement_list = StatementList()
         elif isinstance(items[0], Args):
-            return StatementList.from_iterable([items[0]])
+            statement_list = StatementList.from_iterable([items[0]])
         elif isinstance(items[0], StatementList):
-            return items[0]
+            statement_list = items[0]
         else:
-            return StatementList.from_iterable([Args(items[0])])
+            statement_list = StatementList.from_iterable([mark_incomplete_positions(Args(items[0]))])
+
+        if _release.release_mode and self.whole_module:
+            # Builtins don't validate their arguments when called in release mode
+            validate_statement_list(statement_list)
+        return statement_list
 
     def wrapped_args(self, items: list[Object | Tree]):
         raise NotImplementedError
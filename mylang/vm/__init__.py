@@ -0,0 +1,17 @@
+"""A bytecode compiler and stack-based virtual machine for MyLang.
+
+Statement lists are compiled to :class:`~mylang.vm.code.Code` (see
+:mod:`mylang.vm.compiler`) and run by the dispatch loop in
+:mod:`mylang.vm.interpreter`. The virtual machine is the ``vm`` engine of
+:data:`mylang.stdlib.core._compiler.current_engine`; compiled code can be
+listed with :func:`~mylang.vm.disassembler.disassemble`, or from the command
+line with ``python -m mylang.vm``.
+"""
+
+from .code import Code
+from .compiler import code_for, compile_statement_list, function_code
+from .disassembler import disassemble
+from .interpreter import execute, run
+from .opcodes import Opcode
+
+__all__ = ("Code", "Opcode", "compile_statement_list", "code_for", "function_code", "disassemble", "execute", "run")
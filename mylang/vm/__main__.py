@@ -0,0 +1,31 @@
+"""Disassemble MyLang code.
+
+Usage:
+    python -m mylang.vm FILE
+    python -m mylang.vm -c CODE
+"""
+
+import argparse
+
+from mylang.cache import compile_source, load_file
+from mylang.vm import compile_statement_list, disassemble
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m mylang.vm", description="Disassemble MyLang code")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("-c", "--command", help="Code string to disassemble")
+    source.add_argument("file", nargs="?", help="File to disassemble")
+    args = parser.parse_args()
+
+    if args.command is not None:
+        statement_list = compile_source(args.command)
+        name = "<command>"
+    else:
+        statement_list = load_file(args.file)
+        name = args.file
+    print(disassemble(compile_statement_list(statement_list, name)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Code objects of the MyLang virtual machine, and an assembler to build them."""
+
+from array import array
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ..stdlib.core._context import SlotLayout
+
+from .opcodes import JUMP_OPCODES, Opcode
+
+
+if TYPE_CHECKING:
+    from ..stdlib.core.func import StatementList
+
+
+__all__ = ("Code", "Assembler", "Label")
+
+
+class Code:
+    """Bytecode of a statement list.
+
+    The instructions are stored flat in an ``array`` of integers, as pairs of
+    an opcode and its argument (see :mod:`mylang.vm.opcodes`). The objects the
+    instructions refer to are stored in a constant pool.
+    """
+
+    __slots__ = ("name", "instructions", "constants", "statement_list", "layout", "enclosing", "parameters")
+
+    def __init__(
+        self,
+        name: str,
+        instructions: array,
+        constants: tuple[Any, ...],
+        statement_list: Optional["StatementList"] = None,
+        layout: Optional[SlotLayout] = None,
+        enclosing: tuple[SlotLayout, ...] = (),
+        parameters: tuple[Any, ...] = (),
+    ):
+        self.name = name
+        """A name for debugging."""
+        self.instructions = instructions
+        """Pairs of an opcode and its argument."""
+        self.constants = constants
+        """The constant pool."""
+        self.statement_list = statement_list
+        """The statement list the code was compiled from."""
+        self.layout = layout if layout is not None else SlotLayout()
+        """The slot layout of the stack frame the code runs in."""
+        self.enclosing = enclosing
+        """The slot layouts of the lexical scopes the code is nested in, innermost first. The code accesses the
+        slots only if it runs in a stack frame nested in scopes with these layouts."""
+        self.parameters = parameters
+        """The keys of the parameters, if the code is the body of a function."""
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {self.name}, {len(self.instructions) // 2} instructions>"
+
+
+class Label:
+    """A position in the code, to be used as a jump target before it is known."""
+
+    __slots__ = ("offset",)
+
+    def __init__(self):
+        self.offset: Optional[int] = None
+
+
+class Assembler:
+    """Builds a code object instruction by instruction."""
+
+    def __init__(self, name: str, statement_list: Optional["StatementList"] = None):
+        self._name = name
+        self._statement_list = statement_list
+        self._instructions: list[int | Label] = []
+        self._constants: list[Any] = []
+        self._constant_indexes: dict[int, int] = {}
+        """Indexes in the constant pool by the identity of the constant."""
+        self._deferred: list[tuple[int, Callable[[], tuple[Opcode, int]]]] = []
+        """Instructions to be decided on by :meth:`assemble`, by their position."""
+
+    def emit(self, opcode: Opcode, arg: int | Label = 0):
+        """Append an instruction. Jump instructions take a label as their argument."""
+        assert (opcode in JUMP_OPCODES) == isinstance(arg, Label), f"Invalid argument for {opcode.name}"
+        self._instructions.append(opcode)
+        self._instructions.append(arg)
+
+    def emit_deferred(self, decide: Callable[[], tuple[Opcode, int]]):
+        """Append an instruction that is decided on only once all other instructions have been emitted.
+
+        Args:
+            decide: Returns the opcode and argument of the instruction. Called
+                by :meth:`assemble`.
+        """
+        self._deferred.append((len(self._instructions), decide))
+        self._instructions.append(Opcode.POP_TOP)
+        self._instructions.append(0)
+
+    def emit_constant(self, opcode: Opcode, constant: Any):
+        """Append an instruction that refers to a constant."""
+        self.emit(opcode, self.constant(constant))
+
+    def constant(self, constant: Any) -> int:
+        """Get the index of the constant in the constant pool, adding it if needed.
+
+        Constants are compared by identity, as MyLang objects may be equal
+        without being interchangeable.
+        """
+        index = self._constant_indexes.get(id(constant))
+        if index is None:
+            index = self._constant_indexes[id(constant)] = len(self._constants)
+            self._constants.append(constant)
+        return index
+
+    def place(self, label: Label):
+        """Place the label at the position of the next instruction."""
+        assert label.offset is None, "Label placed twice"
+        label.offset = len(self._instructions)
+
+    def assemble(
+        self,
+        layout: Optional[SlotLayout] = None,
+        enclosing: tuple[SlotLayout, ...] = (),
+        parameters: tuple[Any, ...] = (),
+    ) -> Code:
+        """Decide on the deferred instructions, resolve the labels and build the code object.
+
+        The remaining arguments are passed on to :class:`Code`.
+        """
+        for position, decide in self._deferred:
+            opcode, arg = decide()
+            assert opcode not in JUMP_OPCODES, "Deferred jumps are not supported"
+            self._instructions[position] = opcode
+            self._instructions[position + 1] = arg
+        self._deferred.clear()
+
+        instructions = array("i")
+        for item in self._instructions:
+            if isinstance(item, Label):
+                assert item.offset is not None, "Jump to a label that was never placed"
+                item = item.offset
+            instructions.append(item)
+        return Code(
+            self._name,
+            instructions,
+            tuple(self._constants),
+            self._statement_list,
+            layout,
+            enclosing,
+            parameters,
+        )
@@ -0,0 +1,661 @@
+"""Compilation of statement lists to bytecode.
+
+Each statement is compiled to instructions that push the values of its parts
+and then either assign them or call the function named by the first one (see
+:mod:`mylang.vm.opcodes`). Statements that use one of the built-in control
+flow functions (``if``, ``loop``, ``while``, ``break``, ``continue``, ``for``,
+``return`` and ``try``) or ``set`` and ``get`` are compiled to jumps and
+other native instructions instead, with the statement lists they take
+compiled inline. The code checks at runtime that the name still refers to
+the built-in, and otherwise executes the statement as a regular call.
+
+Keys that are assigned statically, e.g. by ``x = ...``, the variable of a
+``for`` loop or the parameters of a function, get a slot in the stack frame
+they are assigned in (see :class:`~mylang.stdlib.core._context.SlotLocals`).
+Once all the code is compiled, each lookup of a key is resolved to the slot of
+the innermost scope that has one for the key, by its depth and index. The
+code falls back to looking up the key dynamically if the slot isn't assigned
+or a scope in between got the key otherwise, e.g. by ``set`` with a computed
+key. The lexical scopes that closures and execution blocks are nested in are
+resolved the same way, as long as the code runs in the scopes it was compiled
+for.
+
+Natively compiled control flow takes effect immediately: ``break``,
+``continue``, ``while`` and ``return`` skip the rest of the statements up to
+the enclosing loop (or function), even in nested statement lists, and an
+error aborts the rest of a ``try`` body.
+"""
+
+import dataclasses
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ..stdlib.core import (
+    Args,
+    BinaryOperation,
+    ExecutionBlock,
+    IncompleteExpression,
+    Int,
+    Object,
+    Operation,
+    Path,
+    PrefixOperation,
+    StatementList,
+    String,
+    UnaryOperation,
+    break_,
+    continue_,
+    for_,
+    fun,
+    get,
+    if_,
+    loop,
+    return_,
+    set_,
+    try_,
+    undefined,
+    while_,
+)
+from ..stdlib.core._compiler import needs_evaluation
+from ..stdlib.core._context import SlotLayout
+from ..stdlib.core._inline_cache import CallSiteCache
+from .code import Assembler, Code, Label
+from .opcodes import Opcode
+
+
+if TYPE_CHECKING:
+    from ..stdlib.core._utils.types import AnyObject
+
+
+__all__ = ("compile_statement_list", "code_for", "function_code")
+
+
+def compile_statement_list(
+    statement_list: StatementList,
+    name: str = "<statements>",
+    parameters: tuple["AnyObject", ...] = (),
+    enclosing: tuple[SlotLayout, ...] = (),
+) -> Code:
+    """Compile a statement list to bytecode.
+
+    Args:
+        statement_list: The statement list.
+        name: A name for the code, shown when it is disassembled.
+        parameters: The keys of the parameters, if the statement list is the
+            body of a function. They get the first slots.
+        enclosing: The slot layouts of the lexical scopes the statement list
+            is nested in, innermost first.
+
+    Returns:
+        The code. When run, it leaves the value of the statement list.
+    """
+    return _Compiler(statement_list, name, parameters, enclosing).compile()
+
+
+def code_for(statement_list: StatementList) -> Code:
+    """Get the code of a statement list, compiling it the first time."""
+    code = statement_list._code
+    if code is None:
+        name = "<block>" if isinstance(statement_list, ExecutionBlock) else "<statements>"
+        code = statement_list._code = compile_statement_list(
+            statement_list, name, enclosing=statement_list._enclosing_layouts
+        )
+    return code
+
+
+def function_code(function: fun) -> Code:
+    """Get the code of the body of a function, compiling it the first time."""
+    code = function._code
+    if code is None:
+        plan = function._binding_plan
+        parameters = plan.positional + tuple(plan.keyed)
+        body = function.body
+        code = body._code
+        if code is None or code.parameters != parameters:
+            code = body._code = compile_statement_list(
+                body, f"<fun {function.name}>", parameters, body._enclosing_layouts
+            )
+        function._code = code
+    return code
+
+
+@dataclasses.dataclass
+class _Block:
+    """A construct the code being compiled is nested in, which a jump out of must clean up after."""
+
+    is_loop: bool = False
+    """Whether ``break`` and ``continue`` refer to it."""
+    continue_label: Optional[Label] = None
+    break_label: Optional[Label] = None
+    values: int = 0
+    """Number of values it keeps on the stack."""
+    frames: int = 0
+    """Number of stack frames it enters."""
+    handlers: int = 0
+    """Number of error handlers it sets up."""
+
+
+_NativeCompiler = Callable[["_Compiler", list, dict, bool], Optional[Callable[[], None]]]
+
+
+class _Compiler:
+    def __init__(
+        self,
+        statement_list: StatementList,
+        name: str,
+        parameters: tuple["AnyObject", ...],
+        enclosing: tuple[SlotLayout, ...],
+    ):
+        self._statement_list = statement_list
+        self._assembler = Assembler(name, statement_list)
+        self._blocks: list[_Block] = []
+        self._parameters = parameters
+        self._layout = SlotLayout(key for key in parameters if not needs_evaluation(key))
+        self._scopes = [self._layout]
+        """Slot layouts of the stack frames the code being compiled runs in, innermost last."""
+        self._enclosing = enclosing
+
+    def compile(self) -> Code:
+        self._statements(self._statement_list, keep_value=True)
+        self._emit(Opcode.EXIT)
+        return self._assembler.assemble(self._layout, self._enclosing, self._parameters)
+
+    def _emit(self, opcode: Opcode, arg: int | Label = 0):
+        self._assembler.emit(opcode, arg)
+
+    def _emit_constant(self, opcode: Opcode, constant: Any):
+        self._assembler.emit_constant(opcode, constant)
+
+    def _place(self, label: Label):
+        self._assembler.place(label)
+
+    # Scopes
+
+    def _enter_scope(self):
+        """Emit entering a new stack frame, nested in the current one."""
+        layout = SlotLayout()
+        self._scopes.append(layout)
+        self._emit_constant(Opcode.ENTER_FRAME, layout)
+
+    def _exit_scope(self):
+        self._scopes.pop()
+        self._emit(Opcode.EXIT_FRAME)
+
+    def _chain(self) -> tuple[SlotLayout, ...]:
+        """The slot layouts of the current scope and the ones it is nested in, innermost first."""
+        return tuple(reversed(self._scopes)) + self._enclosing
+
+    def _load_name(self, key: "AnyObject"):
+        scopes = self._chain()
+
+        def resolve():
+            # The layouts are complete only once all the code is compiled
+            for depth, layout in enumerate(scopes):
+                slot = layout.index(key)
+                if slot is not None:
+                    if depth == 0:
+                        return Opcode.LOAD_FAST, self._assembler.constant((slot, key))
+                    return Opcode.LOAD_DEREF, self._assembler.constant((slot, key, scopes[1 : depth + 1]))
+            return Opcode.LOAD_NAME, self._assembler.constant(key)
+
+        self._assembler.emit_deferred(resolve)
+
+    def _store_name(self, key: "AnyObject"):
+        slot = self._scopes[-1].add(key)
+        self._emit_constant(Opcode.STORE_FAST, (slot, key))
+
+    # Statements
+
+    def _statements(self, statements: StatementList, keep_value: bool):
+        """Compile a statement list, leaving its value on the stack if ``keep_value``."""
+        if len(statements) == 0:
+            if keep_value:
+                self._emit_constant(Opcode.LOAD_CONST, undefined)
+            return
+        for i, statement in enumerate(statements):
+            self._statement(statement, keep_value and i == len(statements) - 1)
+
+    def _statement(self, statement: Object, keep_value: bool):
+        # Make sure an expression is converted to Args. If already Args, only
+        # positional arguments are renumbered.
+        items = Args(statement)._m_dict_
+        positional = [value for key, value in items.items() if type(key) is Int]
+        keyed = {key: value for key, value in items.items() if type(key) is not Int}
+
+        if not positional:
+            if all(self._is_static_path(key) or not needs_evaluation(key) for key in keyed):
+                self._assignment(keyed, keep_value)
+            else:
+                self._execute(statement, keep_value)
+            return
+
+        if any(needs_evaluation(key) for key in keyed):
+            self._execute(statement, keep_value)
+            return
+
+        head = positional[0]
+        if type(head) is String and (native := _NATIVE_COMPILERS.get(head.value)) is not None:
+            builtin, compile_native = native
+            emit_native = compile_native(self, positional, keyed, keep_value)
+            if emit_native is not None:
+                # Compile natively, but fall back to a regular call if the
+                # name doesn't refer to the built-in at runtime
+                fallback, end = Label(), Label()
+                self._emit_constant(Opcode.IS_BUILTIN, (head, builtin))
+                self._emit(Opcode.POP_JUMP_IF_FALSE, fallback)
+                emit_native()
+                self._emit(Opcode.JUMP, end)
+                self._place(fallback)
+                self._call(items, keep_value)
+                self._place(end)
+                return
+
+        if type(head) is String and head.value == "fun":
+            self._function_definition(positional)
+        self._call(items, keep_value)
+
+    def _function_definition(self, positional: list):
+        """Prepare for a function being defined in the current scope."""
+        if len(positional) < 3 or type(body := positional[-1]) is not StatementList:
+            return
+        if needs_evaluation(name := positional[1]):
+            return
+        # The function is assigned in the current scope, and its body is
+        # nested in it
+        self._scopes[-1].add(name)
+        body._enclosing_layouts = self._chain()
+
+    def _call(self, items: dict, keep_value: bool, opcode: Opcode = Opcode.CALL):
+        keys = tuple(items)
+        positional_count = sum(1 for key in keys if type(key) is Int)
+        # Keys of the arguments of the called function, without the function itself
+        function_keys = tuple(Int(i) for i in range(positional_count - 1)) + keys[positional_count:]
+
+        head = items[keys[0]]
+        cache = CallSiteCache(head) if type(head) is String else None
+
+        for value in items.values():
+            self._expression(value)
+        self._emit_constant(opcode, (keys, function_keys, cache))
+        if opcode == Opcode.TAIL_CALL:
+            return
+        self._emit(Opcode.CHECK_STATEMENT)
+        if not keep_value:
+            self._emit(Opcode.POP_TOP)
+
+    def _tail_call(self, value: "AnyObject") -> bool:
+        """Compile the value of ``return {f ...}`` as a tail call, if it is a call of a function by name.
+
+        The arguments are evaluated in the current scope, where the execution
+        block would look them up.
+        """
+        if type(value) is not ExecutionBlock or len(value) != 1:
+            return False
+        items = Args(value[0])._m_dict_
+        if (
+            not items
+            or type(first_key := next(iter(items))) is not Int
+            or type(head := items[first_key]) is not String
+            or head.value in _NATIVE_COMPILERS
+            or head.value == "fun"
+            or any(type(key) is not Int and needs_evaluation(key) for key in items)
+        ):
+            return False
+        self._call(items, keep_value=True, opcode=Opcode.TAIL_CALL)
+        return True
+
+    def _execute(self, statement: Object, keep_value: bool):
+        """Compile a statement to be executed by the tree-walking engine."""
+        self._emit_constant(Opcode.EXECUTE, statement)
+        self._emit(Opcode.CHECK_STATEMENT)
+        if not keep_value:
+            self._emit(Opcode.POP_TOP)
+
+    def _assignment(self, keyed: dict, keep_value: bool):
+        if len(keyed) == 1 and not isinstance(key := next(iter(keyed)), Path):
+            self._expression(keyed[key])
+            self._store_name(key)
+        else:
+            for value in keyed.values():
+                self._expression(value)
+            # Like the tree-walking engine, which evaluates each path to a new
+            # one, assign to paths last
+            targets = [
+                (key.parts if isinstance(key, Path) else key, isinstance(key, Path), index)
+                for index, key in enumerate(keyed)
+            ]
+            targets.sort(key=lambda target: target[1])
+            for key in keyed:
+                if not isinstance(key, Path):
+                    self._scopes[-1].add(key)
+            self._emit_constant(Opcode.STORE_NAMES, tuple(targets))
+        if keep_value:
+            self._emit_constant(Opcode.LOAD_CONST, undefined)
+
+    # Expressions
+
+    def _expression(self, obj: "AnyObject"):
+        """Compile the evaluation of an object, leaving its value on the stack."""
+        if isinstance(obj, ExecutionBlock):
+            scopes = self._chain()
+
+            def compile_block():
+                # The block is nested in the current scope, whose layout is
+                # complete only once all the code is compiled
+                obj._enclosing_layouts = scopes
+                return Opcode.CALL_BLOCK, self._assembler.constant(code_for(obj))
+
+            self._assembler.emit_deferred(compile_block)
+        elif isinstance(obj, PrefixOperation) and obj.operator == "$":
+            self._get(obj.operand)
+        elif isinstance(obj, Operation) and obj._function is not None:
+            if isinstance(obj, BinaryOperation) and len(obj.operands) == 2:
+                self._expression(obj.operands[0])
+                self._expression(obj.operands[1])
+                self._emit_constant(Opcode.BINARY_OP, obj._function)
+            elif isinstance(obj, UnaryOperation):
+                self._expression(obj.operand)
+                self._emit_constant(Opcode.UNARY_OP, obj._function)
+            else:
+                self._emit_constant(Opcode.EVALUATE, obj)
+        elif isinstance(obj, IncompleteExpression):
+            self._emit_constant(Opcode.EVALUATE, obj)
+        elif type(obj) is Path:
+            for part in obj.parts:
+                self._expression(part)
+            self._emit(Opcode.BUILD_PATH, len(obj.parts))
+        elif needs_evaluation(obj):
+            self._emit_constant(Opcode.EVALUATE, obj)
+        else:
+            self._emit_constant(Opcode.LOAD_CONST, obj)
+
+    def _get(self, key: "AnyObject"):
+        if self._is_static_path(key):
+            self._emit_constant(Opcode.LOAD_PATH, key.parts)
+        elif not needs_evaluation(key) and type(key) is not Path:
+            self._load_name(key)
+        else:
+            self._expression(key)
+            self._emit(Opcode.GET)
+
+    @staticmethod
+    def _is_static_path(obj: "AnyObject") -> bool:
+        return type(obj) is Path and not any(needs_evaluation(part) for part in obj.parts)
+
+    # Blocks
+
+    def _enter_block(self, block: _Block) -> _Block:
+        self._blocks.append(block)
+        return block
+
+    def _exit_block(self, block: _Block):
+        assert self._blocks.pop() is block
+
+    def _innermost_loop(self) -> Optional[_Block]:
+        return next((block for block in reversed(self._blocks) if block.is_loop), None)
+
+    def _jump_out(self, target: _Block, label: Label):
+        """Jump to a label of an enclosing block, cleaning up after the blocks in between."""
+        for block in reversed(self._blocks):
+            if block is target:
+                break
+            for _ in range(block.handlers):
+                self._emit(Opcode.POP_TRY)
+            for _ in range(block.frames):
+                self._emit(Opcode.EXIT_FRAME)
+            for _ in range(block.values):
+                self._emit(Opcode.POP_TOP)
+        self._emit(Opcode.JUMP, label)
+
+    # Native statements. Each returns a function that emits the statement, or
+    # None if the statement can't be compiled natively.
+
+    def _native_if(self, positional: list, keyed: dict, keep_value: bool):
+        if keyed:
+            return None
+
+        if len(positional) == 3 and type(positional[2]) is StatementList:
+            _, condition, body = positional
+
+            def emit_if():
+                otherwise, end = Label(), Label()
+                self._expression(condition)
+                self._emit(Opcode.POP_JUMP_IF_FALSE, otherwise)
+                self._statements(body, keep_value)
+                self._emit(Opcode.JUMP, end)
+                self._place(otherwise)
+                if keep_value:
+                    self._emit_constant(Opcode.LOAD_CONST, undefined)
+                self._place(end)
+
+            return emit_if
+
+        if len(positional) == 2 and type(positional[1]) is StatementList:
+            # An if-else block, with a condition and a statement list in each
+            # statement, and an optional else at the end
+            clauses = []
+            for i, clause in enumerate(positional[1]):
+                clause_items = Args(clause)._m_dict_
+                if not all(type(key) is Int for key in clause_items) or len(clause_items) != 2:
+                    return None
+                condition, body = clause_items.values()
+                if type(body) is not StatementList:
+                    return None
+                if type(condition) is String and condition == String("else"):
+                    if i != len(positional[1]) - 1:
+                        return None
+                    condition = None
+                clauses.append((condition, body))
+
+            def emit_if_else():
+                end = Label()
+                for i, (condition, body) in enumerate(clauses):
+                    # Like the tree-walking engine, the value is that of the
+                    # body, but only if it's the last one
+                    is_last = i == len(clauses) - 1
+                    next_clause = Label()
+                    if condition is not None:
+                        self._expression(condition)
+                        self._emit(Opcode.POP_JUMP_IF_FALSE, next_clause)
+                    self._statements(body, keep_value and is_last)
+                    if keep_value and not is_last:
+                        self._emit_constant(Opcode.LOAD_CONST, undefined)
+                    self._emit(Opcode.JUMP, end)
+                    self._place(next_clause)
+                if keep_value:
+                    self._emit_constant(Opcode.LOAD_CONST, undefined)
+                self._place(end)
+
+            return emit_if_else
+
+        return None
+
+    def _native_loop(self, positional: list, keyed: dict, keep_value: bool):
+        if keyed or len(positional) != 2 or type(body := positional[1]) is not StatementList:
+            return None
+
+        def emit_loop():
+            block = self._enter_block(_Block(is_loop=True, continue_label=Label(), break_label=Label()))
+            self._place(block.continue_label)
+            self._statements(body, keep_value=False)
+            self._emit(Opcode.JUMP, block.continue_label)
+            self._exit_block(block)
+            self._place(block.break_label)
+            if keep_value:
+                self._emit_constant(Opcode.LOAD_CONST, undefined)
+
+        return emit_loop
+
+    def _native_while(self, positional: list, keyed: dict, keep_value: bool):
+        if keyed or len(positional) != 2 or (target := self._innermost_loop()) is None:
+            return None
+        condition = positional[1]
+
+        def emit_while():
+            self._expression(condition)
+            if target is self._blocks[-1]:
+                self._emit(Opcode.POP_JUMP_IF_FALSE, target.break_label)
+            else:
+                go_on = Label()
+                self._emit(Opcode.POP_JUMP_IF_TRUE, go_on)
+                self._jump_out(target, target.break_label)
+                self._place(go_on)
+            if keep_value:
+                self._emit_constant(Opcode.LOAD_CONST, undefined)
+
+        return emit_while
+
+    def _native_break(self, positional: list, keyed: dict, keep_value: bool):
+        if keyed or len(positional) != 1 or (target := self._innermost_loop()) is None:
+            return None
+        return lambda: self._jump_out(target, target.break_label)
+
+    def _native_continue(self, positional: list, keyed: dict, keep_value: bool):
+        if keyed or len(positional) != 1 or (target := self._innermost_loop()) is None:
+            return None
+        return lambda: self._jump_out(target, target.continue_label)
+
+    def _native_for(self, positional: list, keyed: dict, keep_value: bool):
+        if keyed or len(positional) != 5:
+            return None
+        _, variable, in_, iterable, body = positional
+        if (
+            needs_evaluation(variable)
+            or type(in_) is not String
+            or in_ != String("in")
+            or type(body) is not StatementList
+        ):
+            return None
+
+        def emit_for():
+            self._expression(iterable)
+            self._emit(Opcode.GET_ITER)
+            self._enter_scope()
+            # The iterator stays on the stack while the body runs
+            block = self._enter_block(
+                _Block(is_loop=True, continue_label=Label(), break_label=Label(), values=1, frames=1)
+            )
+            exhausted = Label()
+            self._place(block.continue_label)
+            self._emit(Opcode.FOR_ITER, exhausted)
+            self._store_name(variable)
+            self._statements(body, keep_value=False)
+            self._emit(Opcode.JUMP, block.continue_label)
+            self._exit_block(block)
+            self._place(block.break_label)
+            self._emit(Opcode.POP_TOP)
+            self._place(exhausted)
+            self._exit_scope()
+            if keep_value:
+                self._emit_constant(Opcode.LOAD_CONST, undefined)
+
+        return emit_for
+
+    def _native_return(self, positional: list, keyed: dict, keep_value: bool):
+        if keyed or len(positional) > 2:
+            return None
+
+        def emit_return():
+            if len(positional) == 2:
+                if not self._tail_call(positional[1]):
+                    self._expression(positional[1])
+            else:
+                self._emit_constant(Opcode.LOAD_CONST, undefined)
+            self._emit(Opcode.RETURN)
+
+        return emit_return
+
+    def _native_try(self, positional: list, keyed: dict, keep_value: bool):
+        if keyed or len(positional) not in (4, 5):
+            return None
+        body, catch, *error_key, catch_body = positional[1:]
+        if (
+            type(body) is not StatementList
+            or type(catch) is not String
+            or catch != String("catch")
+            or type(catch_body) is not StatementList
+            or any(needs_evaluation(key) for key in error_key)
+        ):
+            return None
+
+        clauses = []
+        for clause in catch_body:
+            clause_items = Args(clause)._m_dict_
+            if not all(type(key) is Int for key in clause_items) or len(clause_items) < 2:
+                return None
+            *error_types, clause_body = clause_items.values()
+            if type(clause_body) is not StatementList:
+                return None
+            clauses.append((error_types, clause_body))
+
+        def emit_try():
+            handler, end = Label(), Label()
+            self._emit(Opcode.SETUP_TRY, handler)
+            block = self._enter_block(_Block(handlers=1))
+            self._statements(body, keep_value)
+            self._exit_block(block)
+            self._emit(Opcode.POP_TRY)
+            self._emit(Opcode.JUMP, end)
+
+            # The error stays on the stack while it is handled
+            self._place(handler)
+            block = self._enter_block(_Block(values=1))
+            for i, (error_types, clause_body) in enumerate(clauses):
+                is_last = i == len(clauses) - 1
+                matched, next_clause = Label(), Label()
+                for error_type in error_types:
+                    self._get(error_type)
+                    self._emit(Opcode.MATCH_ERROR, matched)
+                self._emit(Opcode.JUMP, next_clause)
+
+                self._place(matched)
+                self._enter_scope()
+                block.frames = 1
+                if error_key:
+                    self._scopes[-1].add(error_key[0])
+                    self._emit_constant(Opcode.STORE_ERROR, error_key[0])
+                # Like the tree-walking engine, the value is that of the body,
+                # but only if it's the last one
+                self._statements(clause_body, keep_value and is_last)
+                if keep_value and not is_last:
+                    self._emit_constant(Opcode.LOAD_CONST, undefined)
+                block.frames = 0
+                self._exit_scope()
+                self._emit(Opcode.POP_ERROR if keep_value else Opcode.POP_TOP)
+                self._emit(Opcode.JUMP, end)
+                self._place(next_clause)
+            self._exit_block(block)
+            self._emit(Opcode.RERAISE)
+            self._place(end)
+
+        return emit_try
+
+    def _native_set(self, positional: list, keyed: dict, keep_value: bool):
+        if len(positional) != 1 or not all(self._is_static_path(key) or not needs_evaluation(key) for key in keyed):
+            return None
+        return lambda: self._assignment(keyed, keep_value)
+
+    def _native_get(self, positional: list, keyed: dict, keep_value: bool):
+        if keyed or len(positional) != 2:
+            return None
+
+        def emit_get():
+            self._get(positional[1])
+            if not keep_value:
+                self._emit(Opcode.POP_TOP)
+
+        return emit_get
+
+
+_NATIVE_COMPILERS: dict[str, tuple["AnyObject", _NativeCompiler]] = {
+    "if": (if_, _Compiler._native_if),
+    "loop": (loop, _Compiler._native_loop),
+    "while": (while_, _Compiler._native_while),
+    "break": (break_, _Compiler._native_break),
+    "continue": (continue_, _Compiler._native_continue),
+    "for": (for_, _Compiler._native_for),
+    "return": (return_, _Compiler._native_return),
+    "try": (try_, _Compiler._native_try),
+    "set": (set_, _Compiler._native_set),
+    "get": (get, _Compiler._native_get),
+}
+"""Built-in functions that are compiled natively, by their names."""
@@ -0,0 +1,84 @@
+"""Human-readable listings of bytecode, for debugging."""
+
+from typing import Any
+
+from ..stdlib.core import Object
+from ..stdlib.core._utils import repr_
+from .code import Code
+from .opcodes import CONSTANT_OPCODES, JUMP_OPCODES, Opcode
+
+
+__all__ = ("disassemble",)
+
+
+def disassemble(code: Code) -> str:
+    """List the instructions of code, followed by the code of the execution blocks it contains.
+
+    Each line shows the offset of the instruction (marked with ``>>`` if it is
+    a jump target), the name of the opcode, its argument and, for arguments
+    that refer to the constant pool, the constant.
+
+    Args:
+        code: The code.
+
+    Returns:
+        The listing, one line per instruction.
+    """
+    lines: list[str] = []
+    _disassemble(code, lines, set())
+    return "\n".join(lines)
+
+
+def _disassemble(code: Code, lines: list[str], seen: set[int]):
+    seen.add(id(code))
+    instructions = code.instructions
+    targets = {
+        instructions[offset + 1] for offset in range(0, len(instructions), 2) if instructions[offset] in JUMP_OPCODES
+    }
+    nested: list[Code] = []
+
+    lines.append(f"Disassembly of {code!r}:")
+    for offset in range(0, len(instructions), 2):
+        opcode = Opcode(instructions[offset])
+        arg = instructions[offset + 1]
+        marker = ">>" if offset in targets else "  "
+        line = f"{marker} {offset:5} {opcode.name:<18} {arg}"
+        if opcode in CONSTANT_OPCODES:
+            constant = code.constants[arg]
+            if isinstance(constant, Code) and id(constant) not in seen:
+                nested.append(constant)
+            line += f" ({_shorten(_describe(constant))})"
+        elif opcode in JUMP_OPCODES:
+            line += f" (to {arg})"
+        lines.append(line.rstrip())
+
+    for nested_code in nested:
+        if id(nested_code) not in seen:
+            lines.append("")
+            _disassemble(nested_code, lines, seen)
+
+
+_MAX_DESCRIPTION_LENGTH = 60
+
+
+def _shorten(description: str) -> str:
+    if len(description) > _MAX_DESCRIPTION_LENGTH:
+        return description[: _MAX_DESCRIPTION_LENGTH - 3] + "..."
+    return description
+
+
+def _describe(constant: Any) -> str:
+    if isinstance(constant, tuple):
+        return "[" + ", ".join(_describe(item) for item in constant) + "]"
+    if isinstance(constant, Code):
+        return repr(constant)
+    if isinstance(constant, type):
+        return getattr(constant, "_m_name_", constant.__name__)
+    if isinstance(constant, Object):
+        try:
+            return str(repr_(constant))
+        except Exception:  # pylint: disable=broad-exception-caught
+            return repr(constant)
+    if callable(constant):
+        return getattr(constant, "__name__", repr(constant))
+    return repr(constant)
@@ -0,0 +1,427 @@
+"""The dispatch loop of the MyLang virtual machine."""
+
+from typing import TYPE_CHECKING, Any, Optional
+
+from ..stdlib.core import Args, Error, Object, Path, Ref, StatementList, TypedObject, call, fun
+from ..stdlib.core._context import (
+    UNBOUND,
+    LexicalScope,
+    SlotLayout,
+    SlotLocals,
+    StackFrame,
+    check_stack_depth,
+    current_stack_frame,
+)
+from ..stdlib.core._inline_cache import CallSiteCache
+from ..stdlib.core._utils import getattr_, isinstance_, iter_
+from ..stdlib.core.base import IncompleteExpression
+from ..stdlib.core.error import ErrorCarrier
+from .code import Code
+from .compiler import code_for, function_code
+from .opcodes import Opcode
+
+
+if TYPE_CHECKING:
+    from ..stdlib.core._utils.types import AnyObject
+
+
+__all__ = ("execute", "run")
+
+
+# Local names for the opcodes, as looking up enum members is slow
+LOAD_CONST = Opcode.LOAD_CONST.value
+LOAD_NAME = Opcode.LOAD_NAME.value
+LOAD_PATH = Opcode.LOAD_PATH.value
+GET = Opcode.GET.value
+BUILD_PATH = Opcode.BUILD_PATH.value
+EVALUATE = Opcode.EVALUATE.value
+CALL_BLOCK = Opcode.CALL_BLOCK.value
+BINARY_OP = Opcode.BINARY_OP.value
+UNARY_OP = Opcode.UNARY_OP.value
+POP_TOP = Opcode.POP_TOP.value
+LOAD_FAST = Opcode.LOAD_FAST.value
+LOAD_DEREF = Opcode.LOAD_DEREF.value
+CALL = Opcode.CALL.value
+STORE_FAST = Opcode.STORE_FAST.value
+STORE_NAMES = Opcode.STORE_NAMES.value
+EXECUTE = Opcode.EXECUTE.value
+CHECK_STATEMENT = Opcode.CHECK_STATEMENT.value
+JUMP = Opcode.JUMP.value
+POP_JUMP_IF_FALSE = Opcode.POP_JUMP_IF_FALSE.value
+POP_JUMP_IF_TRUE = Opcode.POP_JUMP_IF_TRUE.value
+IS_BUILTIN = Opcode.IS_BUILTIN.value
+GET_ITER = Opcode.GET_ITER.value
+FOR_ITER = Opcode.FOR_ITER.value
+ENTER_FRAME = Opcode.ENTER_FRAME.value
+EXIT_FRAME = Opcode.EXIT_FRAME.value
+RETURN = Opcode.RETURN.value
+EXIT = Opcode.EXIT.value
+SETUP_TRY = Opcode.SETUP_TRY.value
+POP_TRY = Opcode.POP_TRY.value
+MATCH_ERROR = Opcode.MATCH_ERROR.value
+STORE_ERROR = Opcode.STORE_ERROR.value
+POP_ERROR = Opcode.POP_ERROR.value
+RERAISE = Opcode.RERAISE.value
+TAIL_CALL = Opcode.TAIL_CALL.value
+
+
+def execute(statement_list: StatementList, frame: Optional[StackFrame] = None) -> Object:
+    """Execute a statement list in the given stack frame or the current one, compiling it the first time."""
+    return run(code_for(statement_list), frame or current_stack_frame.get())
+
+
+def run(code: Code, frame: StackFrame) -> Object:
+    """Run code in a stack frame, which must be the current one.
+
+    The slots of a stack frame, or of a scope it is nested in, are used only
+    if it has the layout the code was compiled for. Otherwise, its keys are
+    looked up dynamically, e.g. in the top-level scope of a module.
+
+    Functions defined in MyLang and execution blocks are run by the same
+    loop: the state of the caller is pushed on a call stack of its own,
+    rather than on the Python stack, so that the depth of recursion is
+    limited by :data:`max_stack_depth` only. A function called by
+    ``return {f ...}`` replaces the caller instead (see
+    :attr:`Opcode.TAIL_CALL`).
+
+    Returns:
+        The value of the statement list the code was compiled from.
+    """
+    instructions = code.instructions
+    constants = code.constants
+    base_frame = frame
+    base_fast = _has_layout(frame.lexical_scope, code.layout)
+    """Whether the stack frame of the code has its layout."""
+    fast = base_fast
+    """Whether to use the slots of the current stack frame."""
+    stack: list[Any] = []
+    frames: list[tuple[StackFrame, Any]] = []
+    """Stack frames entered by the code, with their reset tokens."""
+    handlers: list[tuple[int, int, int]] = []
+    """Error handlers: the offset of the handler, and the depths of the stack and of ``frames``."""
+    pc = 0
+    token = None
+    """The reset token of ``base_frame``, if it was entered by this loop."""
+    calls: list[tuple] = []
+    """The states of the callers of the code."""
+
+    try:
+        while True:
+            try:
+                callee: Any = None
+                """The code and stack frame of a function or block to run next."""
+                while True:
+                    opcode = instructions[pc]
+                    arg = instructions[pc + 1]
+                    pc += 2
+
+                    if opcode == LOAD_CONST:
+                        stack.append(constants[arg])
+                    elif opcode == LOAD_FAST:
+                        slot, key = constants[arg]
+                        value = frame.locals.slots[slot] if fast else UNBOUND
+                        stack.append(frame.lexical_scope[key] if value is UNBOUND else value)
+                    elif opcode == STORE_FAST:
+                        slot, key = constants[arg]
+                        if fast:
+                            locals_ = frame.locals
+                            if locals_.observed and locals_.slots[slot] is UNBOUND:
+                                LexicalScope.version += 1
+                            locals_.slots[slot] = stack.pop()
+                        else:
+                            frame.locals[key] = stack.pop()
+                    elif opcode == LOAD_DEREF:
+                        slot, key, layouts = constants[arg]
+                        value = UNBOUND
+                        if fast:
+                            scope = frame.lexical_scope
+                            for layout in layouts:
+                                if scope.locals._dict:
+                                    # The key may have been assigned dynamically
+                                    break
+                                scope = scope.parent
+                                if scope is None or not _has_layout(scope, layout):
+                                    break
+                            else:
+                                value = scope.locals.slots[slot]
+                        stack.append(frame.lexical_scope[key] if value is UNBOUND else value)
+                    elif opcode == LOAD_NAME:
+                        stack.append(frame.lexical_scope[constants[arg]])
+                    elif opcode == POP_TOP:
+                        stack.pop()
+                    elif opcode == CALL:
+                        keys, function_keys, cache = constants[arg]
+                        values = stack[-len(keys) :]
+                        del stack[-len(keys) :]
+                        function = cache.lookup(frame.lexical_scope) if cache is not None else None
+                        if type(function) is fun and frame.catch_spec is None:
+                            callee = _function_call(function, function_keys, values, frame)
+                            break
+                        stack.append(_call(keys, values, cache, frame))
+                    elif opcode == CHECK_STATEMENT:
+                        if frame.return_value is not None:
+                            value = _return(base_frame, frames, frame.return_value)
+                            break
+                    elif opcode == BINARY_OP:
+                        right = stack.pop()
+                        stack[-1] = constants[arg](stack[-1], right)
+                    elif opcode == POP_JUMP_IF_FALSE:
+                        if not stack.pop():
+                            pc = arg
+                    elif opcode == JUMP:
+                        pc = arg
+                    elif opcode == IS_BUILTIN:
+                        name, builtin = constants[arg]
+                        try:
+                            stack.append(frame.lexical_scope[name] is builtin)
+                        except KeyError:
+                            stack.append(False)
+                    elif opcode == CALL_BLOCK:
+                        callee = _block_call(constants[arg], frame)
+                        break
+                    elif opcode == LOAD_PATH:
+                        obj = frame.lexical_scope
+                        for part in constants[arg]:
+                            obj = getattr_(obj, part)
+                        stack.append(obj)
+                    elif opcode == UNARY_OP:
+                        stack[-1] = constants[arg](stack[-1])
+                    elif opcode == POP_JUMP_IF_TRUE:
+                        if stack.pop():
+                            pc = arg
+                    elif opcode == RETURN:
+                        value = _return(base_frame, frames, stack.pop())
+                        break
+                    elif opcode == EXIT:
+                        assert not frames, "Exited with stack frames still entered"
+                        value = stack.pop()
+                        break
+                    elif opcode == TAIL_CALL:
+                        keys, function_keys, cache = constants[arg]
+                        values = stack[-len(keys) :]
+                        del stack[-len(keys) :]
+                        function = cache.lookup(frame.lexical_scope)
+                        if type(function) is fun and frame.catch_spec is None:
+                            if token is not None and not handlers:
+                                # Return from the code and its stack frame, and
+                                # let the function return to the caller instead
+                                callee = _function_call(function, function_keys, values, base_frame.parent)
+                                while frames:
+                                    current_stack_frame.reset(frames.pop()[1])
+                                current_stack_frame.reset(token)
+                                returned = base_frame
+                                (
+                                    code,
+                                    pc,
+                                    stack,
+                                    frames,
+                                    handlers,
+                                    fast,
+                                    base_fast,
+                                    base_frame,
+                                    frame,
+                                    token,
+                                ) = calls.pop()
+                                returned.release()
+                                del returned
+                            else:
+                                callee = _function_call(function, function_keys, values, frame)
+                            break
+                        stack.append(_block_call_other(keys, values, cache, frame))
+                    elif opcode == FOR_ITER:
+                        try:
+                            stack.append(next(stack[-1]))
+                        except StopIteration:
+                            stack.pop()
+                            pc = arg
+                    elif opcode == GET_ITER:
+                        stack[-1] = iter_(stack[-1])
+                    elif opcode == ENTER_FRAME:
+                        frame = StackFrame.acquire(SlotLocals(constants[arg]), parent=frame)
+                        frame.set_parent_lexical_scope(frame.parent.lexical_scope)
+                        frames.append((frame, current_stack_frame.set(frame)))
+                        fast = True
+                    elif opcode == EXIT_FRAME:
+                        exited, exited_token = frames.pop()
+                        current_stack_frame.reset(exited_token)
+                        frame = frames[-1][0] if frames else base_frame
+                        fast = bool(frames) or base_fast
+                        exited.release()
+                        del exited
+                    elif opcode == GET:
+                        stack[-1] = _get(frame, stack[-1])
+                    elif opcode == BUILD_PATH:
+                        parts = stack[-arg:]
+                        del stack[-arg:]
+                        stack.append(Path(*parts))
+                    elif opcode == STORE_NAMES:
+                        targets = constants[arg]
+                        values = stack[-len(targets) :]
+                        del stack[-len(targets) :]
+                        for target, is_path, index in targets:
+                            _store(frame, target, is_path, values[index])
+                    elif opcode == EVALUATE:
+                        stack.append(IncompleteExpression.evaluate_all_in_object(constants[arg]))
+                    elif opcode == EXECUTE:
+                        stack.append(StatementList._interpret_statement(constants[arg], frame))
+                    elif opcode == SETUP_TRY:
+                        handlers.append((arg, len(stack), len(frames)))
+                    elif opcode == POP_TRY:
+                        handlers.pop()
+                    elif opcode == MATCH_ERROR:
+                        if _matches(stack[-2], stack.pop()):
+                            pc = arg
+                    elif opcode == STORE_ERROR:
+                        error = _unwrap_error(stack[-1])
+                        if not isinstance(error, Object):
+                            error = Error("TODO: Opaque error")
+                        frame.locals[constants[arg]] = error
+                    elif opcode == POP_ERROR:
+                        value = stack.pop()
+                        stack[-1] = value
+                    elif opcode == RERAISE:
+                        raise stack.pop()
+                    else:
+                        raise RuntimeError(f"Unknown opcode {opcode} at offset {pc - 2} in {code!r}")
+
+                if callee is not None:
+                    calls.append((code, pc, stack, frames, handlers, fast, base_fast, base_frame, frame, token))
+                    code, frame = callee
+                    token = current_stack_frame.set(frame)
+                    base_frame = frame
+                    base_fast = fast = _has_layout(frame.lexical_scope, code.layout)
+                    stack, frames, handlers, pc = [], [], [], 0
+                elif calls:
+                    # Return the value to the caller
+                    current_stack_frame.reset(token)
+                    returned = base_frame
+                    code, pc, stack, frames, handlers, fast, base_fast, base_frame, frame, token = calls.pop()
+                    stack.append(value)
+                    returned.release()
+                    del returned
+                else:
+                    return value
+                instructions = code.instructions
+                constants = code.constants
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                while not handlers and calls:
+                    # Pass the error to the caller
+                    while frames:
+                        current_stack_frame.reset(frames.pop()[1])
+                    current_stack_frame.reset(token)
+                    code, pc, stack, frames, handlers, fast, base_fast, base_frame, frame, token = calls.pop()
+                    instructions = code.instructions
+                    constants = code.constants
+                if not handlers:
+                    raise
+                # Continue in the handler, as it was when it was set up
+                pc, stack_depth, frames_depth = handlers.pop()
+                del stack[stack_depth:]
+                while len(frames) > frames_depth:
+                    current_stack_frame.reset(frames.pop()[1])
+                frame = frames[-1][0] if frames else base_frame
+                fast = bool(frames) or base_fast
+                stack.append(e)
+    finally:
+        while True:
+            while frames:
+                current_stack_frame.reset(frames.pop()[1])
+            if not calls:
+                break
+            current_stack_frame.reset(token)
+            frames, token = calls[-1][3], calls.pop()[9]
+
+
+def _return(base_frame: StackFrame, frames: list, value: Object) -> Object:
+    """Exit the stack frames entered by the code, and return from its stack frame."""
+    while frames:
+        current_stack_frame.reset(frames.pop()[1])
+    base_frame.return_value = value
+    return value
+
+
+def _call(keys: tuple, values: list, cache: Optional[CallSiteCache], frame: StackFrame) -> Object:
+    """Call the function given by the first value with `call`, from the stack frame."""
+    args = Args.__new__(Args)
+    args._m_dict_ = dict(zip(keys, values))
+    # If the function is not bound, `call` raises the error
+    return call._m_classcall_(args, cache, frame=frame)
+
+
+def _block_call_other(keys: tuple, values: list, cache: CallSiteCache, caller: StackFrame) -> Object:
+    """Call the function of ``return {f ...}`` with `call`, in the stack frame of the execution block."""
+    frame = StackFrame.acquire(parent=caller)
+    frame.set_parent_lexical_scope(caller.lexical_scope)
+    with frame:
+        value = _call(keys, values, cache, frame)
+    frame.release()
+    return value
+
+
+def _function_call(function: fun, function_keys: tuple, values: list, caller: StackFrame) -> tuple[Code, StackFrame]:
+    """Prepare to call a function defined in MyLang, by running its body directly.
+
+    Returns:
+        The code of the body, and the stack frame to run it in.
+    """
+    code = function_code(function)
+    frame = StackFrame.acquire(SlotLocals(code.layout), parent=caller)
+    check_stack_depth(frame)
+    frame.set_parent_lexical_scope(function.closure_lexical_scope)
+    args = Args.__new__(Args)
+    args._m_dict_ = dict(zip(function_keys, values[1:]))
+    function._binding_plan.bind_slots(frame.locals, args)
+    return code, frame
+
+
+def _block_call(code: Code, caller: StackFrame) -> tuple[Code, StackFrame]:
+    """Prepare to evaluate an execution block, as :meth:`ExecutionBlock.evaluate` would.
+
+    Returns:
+        The code of the block, and the stack frame to run it in.
+    """
+    frame = StackFrame.acquire(SlotLocals(code.layout), parent=caller)
+    check_stack_depth(frame)
+    frame.set_parent_lexical_scope(caller.lexical_scope)
+    return code, frame
+
+
+def _has_layout(scope: LexicalScope, layout: SlotLayout) -> bool:
+    """Check whether the locals of a lexical scope have the given slot layout."""
+    return type(scope.locals) is SlotLocals and scope.locals.layout is layout
+
+
+def _get(frame: StackFrame, key: "AnyObject") -> "AnyObject":
+    """Get the value under the key in the lexical scope, as `get` would."""
+    if isinstance(key, Ref):
+        return key.obj
+    obj: Any = frame.lexical_scope
+    for part in key.parts if isinstance(key, Path) else (key,):
+        obj = getattr_(obj, part)
+    return obj
+
+
+def _store(frame: StackFrame, target: Any, is_path: bool, value: "AnyObject"):
+    """Assign the value to a key or to the parts of a path in the lexical scope, as `set` would."""
+    obj: Any = frame.lexical_scope.locals
+    if is_path:
+        for part in target[:-1]:
+            obj = getattr_(obj, part)
+        target = target[-1]
+    if isinstance(obj, TypedObject):
+        obj._m_dict_[target] = value
+    else:
+        obj[target] = value
+
+
+def _unwrap_error(error: Exception) -> Any:
+    return error.error if isinstance(error, ErrorCarrier) else error
+
+
+def _matches(error: Exception, error_type: "AnyObject") -> bool:
+    """Check whether an error is of the type given in a catch clause, as `try` would."""
+    error = _unwrap_error(error)
+    # Treat Python's regular Exception as equivalent to MyLang's Error
+    if isinstance(error, Exception):
+        return error_type is Error
+    return isinstance_(error, error_type)
@@ -0,0 +1,136 @@
+"""Instructions of the MyLang virtual machine.
+
+Each instruction is a pair of integers: the opcode and its argument, which is
+0 for instructions that don't take one. Depending on the instruction, the
+argument is an index into the constant pool of the code object or the
+offset of a jump target.
+"""
+
+import enum
+
+
+__all__ = ("Opcode", "JUMP_OPCODES", "CONSTANT_OPCODES")
+
+
+@enum.unique
+class Opcode(enum.IntEnum):
+    # Values
+    LOAD_CONST = 1
+    """Push ``constants[arg]``."""
+    LOAD_NAME = 2
+    """Push the value under the key ``constants[arg]`` in the lexical scope."""
+    LOAD_PATH = 3
+    """Push the value under the path with the parts ``constants[arg]``, starting in the lexical scope."""
+    GET = 4
+    """Replace the key (or path, or ref) on top of the stack with the value it refers to."""
+    BUILD_PATH = 5
+    """Pop ``arg`` parts and push a path of them."""
+    EVALUATE = 6
+    """Push ``constants[arg]`` with all incomplete expressions in it evaluated, by the tree-walking engine."""
+    CALL_BLOCK = 7
+    """Execute the code ``constants[arg]`` of an execution block in a new stack frame and push its value."""
+    BINARY_OP = 8
+    """Pop two operands and push the result of the operator function ``constants[arg]``."""
+    UNARY_OP = 9
+    """Pop an operand and push the result of the operator function ``constants[arg]``."""
+    POP_TOP = 10
+    """Pop the value on top of the stack."""
+    LOAD_FAST = 11
+    """Push the value of the slot ``constants[arg][0]`` of the current stack frame, for the key
+    ``constants[arg][1]``."""
+    LOAD_DEREF = 12
+    """Push the value of the slot ``constants[arg][0]`` of an enclosing lexical scope, for the key
+    ``constants[arg][1]``. The scopes up to it have the layouts ``constants[arg][2]``, innermost first."""
+
+    # Statements
+    CALL = 20
+    """Pop the values of a statement with the keys ``constants[arg][0]``, call it and push the result.
+
+    ``constants[arg][2]`` is the cache of the call site, if the function key is a string."""
+    STORE_FAST = 21
+    """Pop a value and assign it to the slot ``constants[arg][0]`` of the current stack frame, for the key
+    ``constants[arg][1]``."""
+    STORE_NAMES = 22
+    """Pop the values of an assignment and assign them to the targets ``constants[arg]``."""
+    EXECUTE = 23
+    """Execute the statement ``constants[arg]`` with the tree-walking engine and push its result."""
+    CHECK_STATEMENT = 24
+    """Exit if a called function returned from the stack frame."""
+
+    # Control flow
+    JUMP = 30
+    """Continue at ``arg``."""
+    POP_JUMP_IF_FALSE = 31
+    """Pop a value and continue at ``arg`` if it is falsy."""
+    POP_JUMP_IF_TRUE = 32
+    """Pop a value and continue at ``arg`` if it is truthy."""
+    IS_BUILTIN = 33
+    """Push whether the name ``constants[arg][0]`` refers to the built-in ``constants[arg][1]``."""
+    GET_ITER = 34
+    """Replace the value on top of the stack with an iterator over it."""
+    FOR_ITER = 35
+    """Push the next value of the iterator on top of the stack, or pop the iterator and continue at ``arg``."""
+    ENTER_FRAME = 36
+    """Enter a new stack frame with the slot layout ``constants[arg]``, nested in the lexical scope of the current
+    one."""
+    EXIT_FRAME = 37
+    """Exit the stack frame entered last."""
+    RETURN = 38
+    """Pop a value and return it from the stack frame of the code."""
+    EXIT = 39
+    """Pop the value of the statement list and exit the code with it."""
+    TAIL_CALL = 40
+    """Pop the values of a statement with the keys ``constants[arg][0]`` and call it, as ``CALL`` does.
+
+    If the function is defined in MyLang, the code returns and the function
+    returns to its caller instead, unless an error handler is set up."""
+
+    # Errors
+    SETUP_TRY = 50
+    """Handle errors from here on by continuing at ``arg``, with the error pushed."""
+    POP_TRY = 51
+    """Stop handling errors with the handler set up last."""
+    MATCH_ERROR = 52
+    """Pop an error type and continue at ``arg`` if the error below it is of the type."""
+    STORE_ERROR = 53
+    """Assign the error on top of the stack to the key ``constants[arg]`` in the lexical scope."""
+    POP_ERROR = 54
+    """Remove the error below the value on top of the stack."""
+    RERAISE = 55
+    """Raise the error on top of the stack again."""
+
+
+JUMP_OPCODES = frozenset(
+    (
+        Opcode.JUMP,
+        Opcode.POP_JUMP_IF_FALSE,
+        Opcode.POP_JUMP_IF_TRUE,
+        Opcode.FOR_ITER,
+        Opcode.SETUP_TRY,
+        Opcode.MATCH_ERROR,
+    )
+)
+"""Instructions whose argument is the offset of a jump target."""
+
+CONSTANT_OPCODES = frozenset(
+    (
+        Opcode.LOAD_CONST,
+        Opcode.LOAD_NAME,
+        Opcode.LOAD_PATH,
+        Opcode.LOAD_FAST,
+        Opcode.LOAD_DEREF,
+        Opcode.EVALUATE,
+        Opcode.CALL_BLOCK,
+        Opcode.BINARY_OP,
+        Opcode.UNARY_OP,
+        Opcode.CALL,
+        Opcode.TAIL_CALL,
+        Opcode.STORE_FAST,
+        Opcode.STORE_NAMES,
+        Opcode.EXECUTE,
+        Opcode.IS_BUILTIN,
+        Opcode.ENTER_FRAME,
+        Opcode.STORE_ERROR,
+    )
+)
+"""Instructions whose argument is an index into the constant pool."""
@@ -6,15 +6,38 @@ import os
 from pytest import CaptureFixture
 import pytest
 
-from mylang.parser import parser
-from mylang.stdlib.core.func import StatementList
+from mylang.parser import get_parser
+from mylang.stdlib.core.func import StatementList, use
 from mylang.transformer import Transformer
+from mylang.stdlib.core._compiler import ENGINES, current_engine
 from mylang.stdlib.core._context import (
+    max_stack_depth,
     nested_stack_frame,
 )
+from mylang.stdlib.core import _release
+from mylang.stdlib.core._release import set_release_mode
+from mylang.stdlib.core._utils import set_contextvar
 from mylang.stdlib import builtins_
 
 
+@pytest.fixture(autouse=True, params=ENGINES)
+def engine(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+    """Run each flow with each of the execution engines."""
+    # Modules used by a flow are loaded anew for each engine
+    monkeypatch.setattr(use, "_use__cache", {})
+    with set_contextvar(current_engine, request.param):
+        yield request.param
+
+
+@pytest.fixture(autouse=True, params=(False, True), ids=("guarded", "release"))
+def release_mode(request: pytest.FixtureRequest):
+    """Run each flow in guarded mode and in release mode, which must not change what it does."""
+    enabled = _release.release_mode
+    set_release_mode(request.param)
+    yield request.param
+    set_release_mode(enabled)
+
+
 @contextmanager
 def read_module(*path_components: str):
     with open(os.path.join(os.path.dirname(__file__), *path_components)) as f:
@@ -26,7 +49,7 @@ def execute_module(*path_components: str):
         nested_stack_frame(builtins_.create_locals_dict()),
         read_module(*path_components) as text,
     ):
-        tree = parser.parse(text, start="module")
+        tree = get_parser().parse(text, start="module")
         statement_list: StatementList = Transformer().transform(tree)
         statement_list()
 
@@ -78,6 +101,27 @@ def test_recursion(capsys: CaptureFixture[str]):
     assert captured.err == ""
 
 
+def test_deep_recursion(engine: str, capsys: CaptureFixture[str]):
+    if engine != "vm":
+        pytest.skip("Only the vm engine nests calls deeper than the Python stack allows")
+    with set_contextvar(max_stack_depth, 5000):
+        execute_module("deep_recursion.my")
+    captured = capsys.readouterr()
+
+    assert captured.out == "2001000\ncaught Maximum stack depth of 5000 exceeded\n"
+    assert captured.err == ""
+
+
+def test_tail_calls(capsys: CaptureFixture[str]):
+    # Deeper than the stack depth limit, and than the Python stack allows
+    with set_contextvar(max_stack_depth, 1000):
+        execute_module("tail_calls.my")
+    captured = capsys.readouterr()
+
+    assert captured.out == "2000\ncaught reached 0\ncaught by attempt\n"
+    assert captured.err == ""
+
+
 def test_operators(capsys: CaptureFixture[str]):
     execute_module("operators.my")
     captured = capsys.readouterr()
@@ -130,6 +174,7 @@ x = 1
 after 2nd loop $x is 1
 x = 3
 after 3rd loop $x is 4
+after 4th loop $x is 6
     """.strip()
     )
     assert captured.err == ""
@@ -147,11 +192,82 @@ $x is 2
 $x is 3
 $x is 4
 $x is 5
+$x is still 1
+$x is still 3
+$x in range -1
+$x in range 0
+$x in range 1
+$x by -4 10
+$x by -4 6
+$x by -4 2
+    """.strip()
+    )
+    assert captured.err == ""
+
+
+def test_generators(capsys: CaptureFixture[str]):
+    execute_module("generators.my")
+    captured = capsys.readouterr()
+
+    assert (
+        captured.out.strip()
+        == """
+counted 0
+counted 1
+counted 2
+odd 1
+odd 3
+odd 5
+first
+pair left
+pair right
     """.strip()
     )
     assert captured.err == ""
 
 
+def test_pipelines(capsys: CaptureFixture[str]):
+    execute_module("pipelines.my")
+    captured = capsys.readouterr()
+
+    assert (
+        captured.out.strip()
+        == """
+(16; 25; 36)
+(('b'; 2); ('c'; 3))
+((0; 1); (1; 4))
+10 100
+    """.strip()
+    )
+    assert captured.err == ""
+
+
+def test_numarray(capsys: CaptureFixture[str]):
+    execute_module("numarray.my")
+    captured = capsys.readouterr()
+
+    assert (
+        captured.out.strip()
+        == """
+{numarray (1; 3; 5; 7; 9; 11)}
+{numarray (0.0; 0.25; 0.5; 0.75; 1.0; 1.25)}
+{numarray (false; false; false; true; true; true)} {numarray (true; true; false; false; false; false)}
+{numarray (true; true; true; true; true; true)} {numarray (false; true; false; false; false; false)}
+36 1 11 6.0
+{numarray (1.0; 2.5)} 6
+    """.strip()
+    )
+    assert captured.err == ""
+
+
+def test_calls(capsys: CaptureFixture[str]):
+    execute_module("calls.my")
+    captured = capsys.readouterr()
+
+    assert captured.out == "hello\nother\nouter\ninner\nouter\n"
+    assert captured.err == ""
+
+
 def test_path_getset(capsys: CaptureFixture[str]):
     execute_module("path_getset.my")
     captured = capsys.readouterr()
@@ -264,6 +380,14 @@ f1: $c2.a is 2
     assert captured.err == ""
 
 
+def test_shadowing(capsys: CaptureFixture[str]):
+    execute_module("shadowing.my")
+    captured = capsys.readouterr()
+
+    assert captured.out == "got 1\ndropped\n"
+    assert captured.err == ""
+
+
 @pytest.mark.skip
 def test_test(capsys: CaptureFixture[str]):
     execute_module("test.my")
@@ -275,3 +399,12 @@ def test_test(capsys: CaptureFixture[str]):
 """.strip()
     )
     assert captured.err == ""
+
+
+def test_passed_bodies(capsys: CaptureFixture[str]):
+    """Bodies passed as the values of expressions are only validated when called, in release mode too."""
+    execute_module("passed_bodies.my")
+    captured = capsys.readouterr()
+
+    assert captured.out == "hi\n1\n2\ncaught oops\n"
+    assert captured.err == ""
@@ -0,0 +1,111 @@
+# pylint: disable=missing-function-docstring,missing-module-docstring
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mylang.cache import compile_source
+from mylang.stdlib import builtins_
+from mylang.stdlib.core import Args, BinaryOperation, Int, Path, String
+from mylang.stdlib.core._compiler import ENGINES, _compile, _default_engine, current_engine
+from mylang.stdlib.core._context import max_stack_depth, nested_stack_frame
+from mylang.stdlib.core._utils import set_contextvar
+from mylang.stdlib.core.base import IncompleteExpression
+
+
+def execute(code: str, engine: str):
+    with set_contextvar(current_engine, engine), nested_stack_frame(builtins_.create_locals_dict()):
+        return compile_source(code)()
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "x = 1; y = ($x + 2); echo $x $y",
+        "d = {a=1 b={c=2}}; d.b.c = 3; echo $d ($d.b.c + 1)",
+        "fun f x (echo called $x; return $x); echo {f 1} {f 2} {a={f 3} b=4}",
+        "x = 0; loop (x = $x + 1; echo $x; while $x < 3)",
+    ],
+)
+def test_engines_agree(code: str, capsys: pytest.CaptureFixture[str]):
+    outputs = []
+    for engine in ENGINES:
+        result = execute(code, engine)
+        outputs.append((capsys.readouterr().out, result))
+    assert all(output == outputs[0] for output in outputs[1:])
+
+
+def test_statement_list_is_compiled_once():
+    statement_list = compile_source("x = 1; echo $x")
+    with set_contextvar(current_engine, "closure"), nested_stack_frame(builtins_.create_locals_dict()):
+        statement_list()
+        compiled = statement_list._compiled
+        statement_list()
+
+    assert compiled is not None and statement_list._compiled is compiled
+
+
+def test_tree_engine_does_not_compile():
+    statement_list = compile_source("x = 1")
+    with set_contextvar(current_engine, "tree"), nested_stack_frame(builtins_.create_locals_dict()):
+        statement_list()
+
+    assert statement_list._compiled is None
+
+
+def test_self_evaluating_objects_are_not_compiled():
+    assert _compile(Args(String("echo"), Args.from_dict({"a": String("b")}))) is None
+
+
+def test_changed_keys_move_to_the_end_like_with_tree_engine():
+    path = Path(String("a"), String("b"))
+    args = Args.from_dict({path: String("x"), "c": BinaryOperation("+", [Int(1), Int(2)])})
+    evaluate = _compile(args)
+    assert evaluate is not None
+
+    with nested_stack_frame(builtins_.create_locals_dict()):
+        compiled = evaluate()
+        interpreted = IncompleteExpression.evaluate_all_in_object(args)
+
+    assert [type(key) for key in compiled._m_dict_] == [type(key) for key in interpreted._m_dict_] == [String, Path]
+    assert list(compiled._m_dict_.values()) == list(interpreted._m_dict_.values())
+
+
+@pytest.mark.parametrize("engine", ("closure", "tree"))
+def test_tail_calls_do_not_nest(engine: str, capsys: pytest.CaptureFixture[str]):
+    code = """
+    fun loopn n acc (
+        if $n == 0 (
+            return $acc
+        )
+        return {loopn ($n - 1) ($acc + 1)}
+    )
+    echo {loopn 100000 0}
+    """
+    with set_contextvar(max_stack_depth, 100):
+        execute(code, engine)
+
+    assert capsys.readouterr().out == "100000\n"
+
+
+def test_default_engine_from_environment(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("MYLANG_ENGINE", "tree")
+    assert _default_engine() == "tree"
+
+    monkeypatch.setenv("MYLANG_ENGINE", "jit")
+    with pytest.raises(ValueError):
+        _default_engine()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_cli_engine(engine: str):
+    result = subprocess.run(
+        [sys.executable, "-m", "mylang", "--engine", engine, "-c", "echo hello"],
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "hello\n"
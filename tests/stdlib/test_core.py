@@ -1,19 +1,59 @@
 # pylint: disable=missing-function-docstring,missing-module-docstring,invalid-name
 
+import functools
+import gc
+import itertools
+import threading
+import weakref
+
 import pytest
 
-from mylang.stdlib.core import Ref, return_
-from mylang.stdlib.core._context import LocalsDict, StackFrame, current_stack_frame
+from mylang.cache import compile_source
+from mylang.stdlib import builtins_
+from mylang.stdlib.core import Ref, _release, numarray, return_
+from mylang.stdlib.core._release import set_release_mode
+from mylang.stdlib.core._context import (
+    UNBOUND,
+    LexicalScope,
+    LocalsDict,
+    SlotLayout,
+    SlotLocals,
+    StackFrame,
+    _stack_frame_pool,
+    current_stack_frame,
+    nested_stack_frame,
+)
+from mylang.stdlib.core._binding import BindingPlan
+from mylang.stdlib.core._compiler import current_engine
+from mylang.stdlib.core._inline_cache import CallSiteCache
+from mylang.stdlib.core._interning import InternTable, primitives, strings
+from mylang.stdlib.core._operators import operator_functions, operators
 from mylang.stdlib.core._utils import (
     function_defined_as_class,
     currently_called_func,
     FunctionAsClass,
     populate_locals_for_callable,
+    receives_stack_frame,
+    set_contextvar,
+)
+from mylang.stdlib.core.base import (
+    Args,
+    Array,
+    BinaryOperation,
+    Dict,
+    IncompleteExpression,
+    Object,
+    PrefixOperation,
+    mark_incomplete_positions,
 )
-from mylang.stdlib.core.base import Args, Array, Dict, Object
 from mylang.stdlib.core.complex import Path, String
+from mylang.stdlib.core.error import Error
 from mylang.stdlib.core.func import StatementList, call, fun, set_, get
-from mylang.stdlib.core.primitive import Int, undefined
+from mylang.stdlib.core.primitive import Bool, Float, Int, true, undefined
+from mylang.stdlib.core.iteration import Stream, collect, map_, reduce, take
+from mylang.stdlib.core.generator import Generator, GeneratorFunction, yields
+from mylang.stdlib.core.numarray import NumArray, max_, mean, min_, sum_
+from mylang.stdlib.core.range_ import Range
 
 
 @pytest.fixture(autouse=True)
@@ -56,6 +96,17 @@ class TestArgs:
             String("c"): String("C"),
         }
 
+    def test_set_after_indexing(self):
+        args = Args(String("a"), String("b"), c=String("C"))
+        assert args[0] == String("a")
+        args._m_setattr_(Int(0), String("z"))
+        assert args[0] == String("z")
+        assert list(args[:]) == [String("z"), String("b")]
+        args[1] = String("y")
+        assert args.positional_values() == (String("z"), String("y"))
+        args._m_setattr_(String("c"), String("X"))
+        assert args.keyed_dict() == {String("c"): String("X")}
+
     def test_add_iterable(self):
         args = Args(10, 11, a="A", b="B")
         new_args = args + {12, 13}
@@ -80,6 +131,31 @@ class TestArgs:
             String("b"): String("B"),
         }
 
+    def test_positional_and_keyed(self):
+        args = Args(10, 11, a="A")
+        assert args[:] == [Int(10), Int(11)] and args.positional_values() == (Int(10), Int(11))
+        assert args[0] == Int(10) and args[-1] == Int(11) and args[Int(1)] == Int(11) and args["a"] == String("A")
+        assert args.keyed_dict() == {String("a"): String("A")}
+        assert args.get_last_positional_index() == 1
+        assert args.is_mixed_positional_keyed()
+        assert Args().is_positional_only() and Args().is_keyed_only()
+
+    def test_positional_indexes_with_gaps(self):
+        args = Args.from_dict({0: "a", 2: "c"})
+        assert args[:] == [String("a"), String("c")]
+        assert args[2] == String("c") and args[-2] == String("a")
+        with pytest.raises(KeyError):
+            args[1]  # pylint: disable=pointless-statement
+        assert args.get_last_positional_index() == 2
+
+    def test_shape_follows_changes(self):
+        args = Args(10)
+        assert args.is_positional_only()
+        args["a"] = "A"
+        assert not args.is_positional_only() and args.keyed_dict() == {String("a"): String("A")}
+        args._m_dict_ = {Int(0): Int(1), Int(1): Int(2)}
+        assert args[:] == [Int(1), Int(2)] and args.is_positional_only()
+
 
 class TestArray:
     def test_construct_empty(self):
@@ -209,6 +285,37 @@ class Test_call:
         )
         self.assert_result_correct(result)
 
+    @function_defined_as_class()
+    class frame_func(Object, FunctionAsClass):
+        _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = True
+
+        calls: list = []
+
+        @classmethod
+        @receives_stack_frame
+        def _m_classcall_(cls, args: Args, /, *, frame=None):
+            # The stack frame is inspected after it is released
+            frame.capture()
+            cls.calls.append((frame, currently_called_func.get()))
+            return undefined
+
+    def test_stack_frame_is_passed_to_function_receiving_it(self):
+        self.frame_func.calls.clear()
+        caller_stack_frame = current_stack_frame.get()
+        other_stack_frame = StackFrame()
+        call(Ref(self.frame_func))
+        call._m_classcall_(Args(Ref(self.frame_func)), frame=other_stack_frame)
+
+        (stack_frame, called_func), (other_nested_stack_frame, _) = self.frame_func.calls
+        assert stack_frame.parent is caller_stack_frame and called_func is None
+        assert other_nested_stack_frame.parent is other_stack_frame
+
+    def test_function_receiving_stack_frame_falls_back_to_current_one(self):
+        current_stack_frame.get().locals["x"] = Int(1)
+        with set_contextvar(currently_called_func, get._m_classcall_):
+            assert get._m_classcall_(Args("x")) == Int(1)
+        assert get("x") == Int(1)
+
 
 class Test_utils:
     def test_populate_locals_for_callable_positional_args(self):
@@ -258,7 +365,36 @@ class Test_utils:
         # Check that an empty context dict is returned
         assert locals_ == {}
 
-    # TODO: Test invalid calls, e.g. too many positional arguments, etc.
+    @pytest.mark.parametrize("args", [Args("X"), Args("X", "Y", "Z")])
+    def test_populate_locals_for_callable_wrong_number_of_positional_args(self, args):
+        with pytest.raises(Error, match="takes 2 positional arguments"):
+            populate_locals_for_callable(LocalsDict({}), Args("x", "y"), args)
+
+
+class TestBindingPlan:
+    def test_bind_slots(self):
+        layout = SlotLayout()
+        for key in ("x", "first", "second"):
+            layout.add(String(key))
+        plan = BindingPlan(Args("x", first="default_1st", second="default_2nd"), String("f"))
+        locals_ = SlotLocals(layout)
+
+        plan.bind_slots(locals_, Args("X", second="foo"))
+
+        assert locals_.slots == [String("X"), String("default_1st"), String("foo")]
+
+    def test_bind_keys_without_slots(self):
+        plan = BindingPlan(Args("x", first="default_1st"))
+        locals_ = SlotLocals(SlotLayout())
+
+        plan.bind_slots(locals_, Args("X"))
+
+        assert locals_.dict() == {String("x"): String("X"), String("first"): String("default_1st")}
+
+    def test_wrong_arity(self):
+        plan = BindingPlan(Args("x"), String("f"))
+        with pytest.raises(Error, match="f takes 1 positional argument but 0 were given"):
+            plan.bind(LocalsDict({}), Args())
 
 
 class Test_get:
@@ -315,5 +451,623 @@ class TestRef:
         assert ref_ref_obj.obj is obj
 
 
+class TestEvaluateAllInObject:
+    def test_marked_object_without_incomplete_expressions_is_not_copied(self):
+        args = mark_incomplete_positions(Args(String("echo"), mark_incomplete_positions(Dict(a=1))))
+        assert args._incomplete_positions == ()
+        assert IncompleteExpression.evaluate_all_in_object(args) is args
+
+    def test_only_marked_positions_are_evaluated(self):
+        set_(x=1)
+        inner = mark_incomplete_positions(Array.from_iterable([String("a")]))
+        operation = PrefixOperation("$", String("x"))
+        args = mark_incomplete_positions(Args(String("echo"), inner, operation))
+        assert args._incomplete_positions == (Int(2),)
+
+        result = IncompleteExpression.evaluate_all_in_object(args)
+        assert result is not args and result._m_dict_ == {Int(0): String("echo"), Int(1): inner, Int(2): Int(1)}
+        # Unchanged items are shared, and the copy has nothing left to evaluate
+        assert result[1] is inner
+        assert result._incomplete_positions == ()
+        assert args[2] is operation
+
+    def test_changed_key_moves_to_the_end(self):
+        path = Path(String("a"), String("b"))
+        args = mark_incomplete_positions(Args.from_dict({path: String("x"), "c": String("y")}))
+        assert args._incomplete_positions == (path,)
+
+        result = IncompleteExpression.evaluate_all_in_object(args)
+        assert [type(key) for key in result._m_dict_] == [String, Path]
+
+
+class TestSlotLocals:
+    def test_keys_in_layout_are_stored_in_slots(self):
+        layout = SlotLayout([String("a")])
+        locals_ = SlotLocals(layout)
+        assert "a" not in locals_
+
+        locals_["a"] = Int(1)
+        locals_["b"] = Int(2)
+        assert locals_.slots == [Int(1)]
+        assert "a" in locals_ and locals_["b"] == Int(2)
+        assert locals_.dict() == {String("a"): Int(1), String("b"): Int(2)}
+
+    def test_unbound_slot_is_looked_up_in_parent_scope(self):
+        parent = LexicalScope(LocalsDict())
+        parent.locals["a"] = Int(1)
+        scope = LexicalScope(SlotLocals(SlotLayout([String("a")])), parent)
+        assert scope["a"] == Int(1)
+
+        scope.locals["a"] = Int(2)
+        assert scope["a"] == Int(2)
+
+
+class TestCallSiteCache:
+    def test_function_is_looked_up_again_when_shadowed(self):
+        outer = LexicalScope(LocalsDict())
+        outer.locals["f"] = Int(1)
+        scope = LexicalScope(LocalsDict(), outer)
+        cache = CallSiteCache(String("f"))
+        assert cache.lookup(scope) == Int(1)
+        assert scope.locals.observed and not outer.locals.observed
+
+        version = LexicalScope.version
+        outer.locals["f"] = Int(2)
+        assert LexicalScope.version == version
+        assert cache.lookup(scope) == Int(2)
+
+        scope.locals["f"] = Int(3)
+        assert LexicalScope.version == version + 1
+        assert cache.lookup(scope) == Int(3)
+
+    def test_unbound_function(self):
+        assert CallSiteCache(String("f")).lookup(LexicalScope(LocalsDict())) is UNBOUND
+
+
+class TestStackFramePool:
+    def test_released_stack_frame_is_recycled(self):
+        stack_frame = StackFrame.acquire(LocalsDict())
+        serial = stack_frame.lexical_scope.serial
+        stack_frame.release()
+        assert stack_frame.locals is None and stack_frame.lexical_scope.locals is None
+
+        locals_ = LocalsDict()
+        parent = StackFrame()
+        assert StackFrame.acquire(locals_, parent=parent) is stack_frame
+        assert stack_frame.locals is locals_ and stack_frame.lexical_scope.locals is locals_
+        assert stack_frame.parent is parent and stack_frame.depth == parent.depth + 1
+        assert stack_frame.lexical_scope.serial != serial
+
+    def test_captured_stack_frame_is_not_recycled(self):
+        parent = StackFrame.acquire(LocalsDict())
+        stack_frame = StackFrame.acquire(LocalsDict(), parent=parent)
+        stack_frame.capture()
+        assert parent.captured and parent.lexical_scope.captured
+        stack_frame.release()
+        parent.release()
+        assert stack_frame.locals is not None and parent.locals is not None
+        assert StackFrame.acquire() not in (stack_frame, parent)
+
+    def test_captured_lexical_scope_is_not_recycled(self):
+        outer = StackFrame.acquire(LocalsDict())
+        stack_frame = StackFrame.acquire(LocalsDict(), parent=outer)
+        stack_frame.inherit_parent_lexical_scope()
+        stack_frame.lexical_scope.capture()
+        assert outer.lexical_scope.captured and not outer.captured
+        stack_frame.release()
+        outer.release()
+        assert stack_frame.locals is not None and outer.locals is not None
+
+    def test_closure_captures_lexical_scope(self):
+        statement_list = compile_source("""
+fun make (
+    x = 1
+    fun get_x (
+        return $x
+    )
+    return $get_x
+)
+g = {make}
+""")
+        with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            statement_list()
+            assert frame.locals["g"].closure_lexical_scope.captured
+
+    def test_nested_stack_frame_is_released_unless_captured(self):
+        _stack_frame_pool.free.clear()
+        with nested_stack_frame() as stack_frame:
+            stack_frame.capture()
+        assert not _stack_frame_pool.free
+
+        with nested_stack_frame():
+            pass
+        assert len(_stack_frame_pool.free) == 1
+
+    def test_pool_is_per_thread(self):
+        _stack_frame_pool.free.clear()
+        with nested_stack_frame():
+            pass
+        released_in_thread = []
+
+        def run():
+            released_in_thread.append(list(_stack_frame_pool.free))
+            with nested_stack_frame():
+                pass
+            released_in_thread.append(list(_stack_frame_pool.free))
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        assert released_in_thread[0] == [] and len(released_in_thread[1]) == 1
+        assert released_in_thread[1][0] not in _stack_frame_pool.free and len(_stack_frame_pool.free) == 1
+
+    def test_call_site_cache_misses_in_recycled_scope(self):
+        stack_frame = StackFrame.acquire(LocalsDict())
+        stack_frame.locals["f"] = Int(1)
+        cache = CallSiteCache(String("f"))
+        assert cache.lookup(stack_frame.lexical_scope) == Int(1)
+        stack_frame.release()
+
+        stack_frame = StackFrame.acquire(LocalsDict())
+        stack_frame.locals["f"] = Int(2)
+        assert cache.lookup(stack_frame.lexical_scope) == Int(2)
+
+
+class TestOperation:
+    def test_operator_function_is_bound(self):
+        operation = BinaryOperation("+", [Int(1), Int(2)])
+        assert operation._function is operator_functions["+"]
+        assert operation.evaluate() == Int(3)
+        assert PrefixOperation("!", Bool(False)).evaluate() == Bool(True)
+
+    @pytest.mark.parametrize("operator", ["+", "-", "*", "<", "<=", ">", ">=", "=="])
+    @pytest.mark.parametrize("a, b", [(Int(7), Int(2)), (Float(1.5), Float(0.25)), (Int(7), Float(0.5))])
+    def test_fast_path_matches_generic_function(self, operator: str, a: Object, b: Object):
+        function = operator_functions[operator]
+        result, expected = function(a, b), function.__wrapped__(a, b)
+        assert type(result) is type(expected) and result == expected
+
+    def test_other_operands_use_generic_function(self):
+        assert operator_functions["=="](String("a"), String("a")) == Bool(True)
+        assert operator_functions["!"](undefined) == Bool(True)
+
+
+class TestInternTable:
+    def test_equal_instances_are_identical(self):
+        assert String("interned") is String("interned")
+        assert Int(1000) is Int(1000)
+        assert Float(1.5) is not Int(2) and Bool(True) is true
+
+    def test_unused_instances_are_freed(self):
+        table = InternTable(max_recent=2)
+        first = table.add(("first",), Object())
+        ref = weakref.ref(first)
+        table.add(("second",), Object())
+        table.add(("third",), Object())
+        del first
+        gc.collect()
+        assert ref() is None
+        assert table.get(("first",)) is None
+        assert len(table) == 2
+
+    def test_recently_used_instances_are_kept_alive(self):
+        table = InternTable(max_recent=2)
+        table.add(("first",), Object())
+        table.add(("second",), Object())
+        table.get(("first",))
+        table.add(("third",), Object())
+        gc.collect()
+        assert table.get(("first",)) is not None
+        assert table.get(("second",)) is None
+        assert table.info()[:2] == (2, 1)
+
+    def test_small_values_are_pinned(self):
+        table = InternTable(max_recent=0, pin=lambda key: key[0] == "pinned")
+        table.add(("pinned",), Object())
+        table.add(("other",), Object())
+        gc.collect()
+        assert table.get(("pinned",)) is not None
+        assert table.get(("other",)) is None
+        assert strings.info().pinned > 0 and primitives.info().pinned > 0
+
+
+class Test_if:
+    @function_defined_as_class()
+    class record(Object, FunctionAsClass):
+        _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
+
+        calls: list = []
+
+        @classmethod
+        def _m_classcall_(cls, args: Args, /):
+            cls.calls.append(args[0])
+            return true
+
+    PROGRAM = """
+if (
+    $i == 0 (
+        x = zero
+    )
+    {record $i} (
+        x = other
+    )
+    else (
+        x = never
+    )
+)
+"""
+
+    def test_branches_are_compiled_once_and_short_circuit(self):
+        statement_list = compile_source(self.PROGRAM)
+        if_list = statement_list[0][1]
+        self.record.calls.clear()
+        # The vm engine compiles if-else blocks to bytecode instead
+        with set_contextvar(current_engine, "tree"), nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            frame.locals["record"] = self.record
+            frame.locals["i"] = Int(0)
+            statement_list()
+            assert frame.locals["x"] == String("zero") and self.record.calls == []
+            branches = if_list._control_flow
+
+            frame.locals["i"] = Int(1)
+            statement_list()
+            assert frame.locals["x"] == String("other") and self.record.calls == [Int(1)]
+            assert if_list._control_flow is branches
+        assert [branch.body for branch in branches] == [statement[-1] for statement in if_list]
+
+
+class Test_loop:
+    PROGRAM = """
+i = 0
+loop (
+    i = $i + 1
+    while $i < 3
+    j = $i
+)
+"""
+
+    def test_while_at_top_level_is_evaluated_by_loop(self):
+        statement_list = compile_source(self.PROGRAM)
+        body = statement_list[1][1]
+        with set_contextvar(current_engine, "tree"), nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            statement_list()
+            assert frame.locals["i"] == Int(3) and frame.locals["j"] == Int(2)
+            assert frame.loop_depth == 0
+        first, second = body._control_flow
+        assert first.condition is None and list(first.statements) == [body[0]]
+        assert second.condition is not None and list(second.statements) == [body[2]]
+
+    def test_loop_control_outside_loop_of_stack_frame(self):
+        statement_list = compile_source("fun f (\n    break\n)\nloop (\n    f\n)")
+        with nested_stack_frame(builtins_.create_locals_dict()):
+            with pytest.raises(AssertionError, match="break statement not inside a loop"):
+                statement_list()
+
+
+class TestReleaseMode:
+    @pytest.fixture(autouse=True)
+    def restore_mode(self):
+        enabled = _release.release_mode
+        yield
+        set_release_mode(enabled)
+
+    def test_guarded_entry_points(self):
+        set_release_mode(False)
+        assert hasattr(get._m_classcall_.__func__, "__wrapped__")
+        with pytest.raises(AssertionError):
+            get._m_classcall_(Args("key"), frame=current_stack_frame.get())
+        compile_source("loop 3")
+
+    def test_unguarded_entry_points(self):
+        set_release_mode(True)
+        assert not hasattr(get._m_classcall_.__func__, "__wrapped__")
+        assert not hasattr(StatementList._m_call_, "__wrapped__")
+        stack_frame = current_stack_frame.get()
+        stack_frame.locals["key"] = Int(42)
+        assert get._m_classcall_(Args("key"), frame=stack_frame) == Int(42)
+
+    def test_statements_are_validated_when_transformed(self):
+        set_release_mode(True)
+        with pytest.raises(Exception, match="The argument to loop must be a StatementList"):
+            compile_source("loop 3")
+        with pytest.raises(Exception, match="get function requires exactly one argument"):
+            compile_source("fun f (\n    x = {get a b}\n)")
+        compile_source("loop (\n    break\n)")
+
+    def test_shadowed_builtins_are_not_validated(self):
+        set_release_mode(True)
+        compile_source("fun loop x (\n    echo $x\n)\nloop 3")
+        compile_source("fun f (\n    loop = {get echo}\n    loop 3\n)")
+        with pytest.raises(Exception, match="The argument to loop must be a StatementList"):
+            compile_source("fun f (\n    loop 3\n)\nfun g x (\n    echo $x\n)")
+
+
+class TestRange:
+    def test_is_lazy(self):
+        range_ = Range(0, 10**12, 3)
+        assert len(range_) == 333333333334
+        assert range_[1] == Int(3) and range_[-1] == Int(999999999999)
+        assert Int(999999999999) in range_ and Int(10) not in range_ and Float(3.0) in range_
+        assert list(Range(5, 0, -2)) == [Int(5), Int(3), Int(1)]
+
+    def test_slice_is_range(self):
+        assert Range(0, 10)[2:8:2] == Range(2, 8, 2)
+
+    def test_operator(self):
+        range_ = operator_functions[".."](Int(-1), Int(2))
+        assert range_ == Range(-1, 2) and list(range_) == [Int(-1), Int(0), Int(1)]
+        with pytest.raises(AssertionError):
+            operator_functions[".."](Int(1), Float(2.0))
+
+    def test_builtin(self):
+        statement_list = compile_source("a = {range 3}\nb = {range 1 3}\nc = {range 10 0 -5}\nd = $c.1")
+        with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            statement_list()
+            assert frame.locals["a"] == Range(0, 3) and frame.locals["b"] == Range(1, 3)
+            assert frame.locals["c"] == Range(10, 0, -5) and frame.locals["d"] == Int(5)
+
+    def test_unknown_attribute_is_error(self, capsys: pytest.CaptureFixture[str]):
+        statement_list = compile_source(
+            "r = 0..3\ntry (\n    x = $r.foo\n) catch e (\n    Error (\n        echo $e\n    )\n)"
+        )
+        with nested_stack_frame(builtins_.create_locals_dict()):
+            statement_list()
+            assert capsys.readouterr().out == "A range has no attribute 'foo'\n"
+            with pytest.raises(Error, match="Index 3 out of range 0..3"):
+                compile_source("r = 0..3\nx = $r.3")()
+
+    @pytest.mark.parametrize("release", (False, True), ids=("guarded", "release"))
+    def test_arguments_are_checked_when_called(self, release: bool):
+        enabled = _release.release_mode
+        set_release_mode(release)
+        try:
+            statement_list = compile_source("n = 3\na = {range 0 $n}\nb = {range 0 $n 0}")
+            with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+                with pytest.raises(AssertionError, match="The step of a range must not be zero"):
+                    statement_list()
+                assert frame.locals["a"] == Range(0, 3)
+                with pytest.raises(AssertionError, match="The arguments to range must be integers"):
+                    compile_source("x = {range 0 1.5}")()
+        finally:
+            set_release_mode(enabled)
+
+    def test_setter_assigns_bound_key_in_place(self):
+        locals_ = LocalsDict()
+        locals_["x"] = Int(1)
+        locals_.observed = True
+        version = LexicalScope.version
+        locals_.setter("x")(Int(2))
+        assert locals_["x"] == Int(2) and LexicalScope.version == version
+
+        slot_locals = SlotLocals(SlotLayout([String("x")]))
+        slot_locals["x"] = Int(1)
+        slot_locals.setter("x")(Int(2))
+        assert slot_locals.slots == [Int(2)]
+
+
+class TestGenerator:
+    PROGRAM = """
+fun numbers n (
+    fun not_a_generator (
+        yield 0
+    )
+    for x in 0..$n (
+        yield $x
+    )
+    throw Error
+)
+"""
+
+    def test_function_with_yield_is_generator_function(self):
+        statement_list = compile_source(self.PROGRAM)
+        body = statement_list[0][-1]
+        assert yields(body) and not yields(StatementList.from_iterable(body[:1])) and yields(body[0][-1])
+        with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            statement_list()
+            assert type(frame.locals["numbers"]) is GeneratorFunction
+
+    def test_values_are_produced_as_consumed(self):
+        statement_list = compile_source(self.PROGRAM + "g = {numbers 10}")
+        with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            statement_list()
+            generator = frame.locals["g"]
+            assert isinstance(generator, Generator) and generator._thread.ident is None
+            iterator = iter(generator)
+            assert next(iterator) == Int(0) and next(iterator) == Int(1)
+            thread = generator._thread
+            assert thread.is_alive()
+
+            del iterator
+            assert generator._thread is None and not thread.is_alive()
+
+    def test_abandoned_generator_thread_exits(self):
+        statement_list = compile_source(self.PROGRAM + "g = {numbers 10}")
+        with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            statement_list()
+            generator = frame.locals["g"]
+            iterator = iter(generator)
+            assert next(iterator) == Int(0)
+            thread = generator._thread
+            # Only a reference cycle keeps the generator and its iterator alive
+            cycle = [generator, iterator]
+            cycle.append(cycle)
+            frame.locals["g"] = undefined
+            del generator, iterator, cycle
+            assert thread.is_alive()
+
+            gc.collect()
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+
+    def test_error_is_raised_by_consumer(self):
+        statement_list = compile_source(self.PROGRAM + "g = {numbers 2}")
+        with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            statement_list()
+            iterator = iter(frame.locals["g"])
+            assert list(itertools.islice(iterator, 2)) == [Int(0), Int(1)]
+            with pytest.raises(Error):
+                next(iterator)
+
+    def test_yield_outside_generator(self):
+        statement_list = compile_source("yield 1")
+        with nested_stack_frame(builtins_.create_locals_dict()):
+            with pytest.raises(AssertionError, match="yield statement not inside a generator"):
+                statement_list()
+
+
+class TestPipeline:
+    @function_defined_as_class()
+    class record(Object, FunctionAsClass):
+        _CLASSCALL_SHOULD_RECEIVE_NEW_STACK_FRAME = False
+
+        calls: list = []
+
+        @classmethod
+        def _m_classcall_(cls, args: Args, /):
+            cls.calls.append(args[0])
+            return args[0]
+
+    def test_values_are_computed_once_when_pulled(self):
+        self.record.calls.clear()
+        stream = map_._apply(self.record, Range(0, 10**12))
+        assert isinstance(stream, Stream) and self.record.calls == []
+        first = take._apply(Int(2), stream)
+        assert collect._apply(first) == Array.from_iterable([0, 1])
+        assert self.record.calls == [Int(0), Int(1)]
+        # A stream is iterated over only once, from where it was left
+        assert collect._apply(take._apply(Int(1), stream)) == Array.from_iterable([2])
+
+    def test_lines_is_builtin(self, tmp_path):
+        path = tmp_path / "lines.txt"
+        path.write_text("a\nbb\r\nccc\n", encoding="utf-8")
+        statement_list = compile_source(f"xs = {{collect {{drop 1 {{lines '{path}'}}}}}}")
+        with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            statement_list()
+            assert frame.locals["xs"] == Array.from_iterable([String("bb"), String("ccc")])
+
+    def test_reduce(self):
+        add = operators["+"]
+        assert reduce._apply(add, Range(1, 5)) == Int(10)
+        assert reduce._apply(add, Range(0, 0), Int(7)) == Int(7)
+        with pytest.raises(Error):
+            reduce._apply(add, Range(0, 0))
+
+    def test_arguments_are_validated(self):
+        with pytest.raises(AssertionError, match="take requires 2 positional arguments"):
+            take._validate_args(Args(Int(1)))
+
+    @pytest.mark.parametrize("release", (False, True), ids=("guarded", "release"))
+    def test_count_is_checked_when_called(self, release: bool):
+        enabled = _release.release_mode
+        set_release_mode(release)
+        try:
+            statement_list = compile_source("n = 2\na = {collect {take $n 0..5}}\nb = {collect {drop $n 0..5}}")
+            with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+                statement_list()
+                assert frame.locals["a"] == Array(Int(0), Int(1))
+                assert frame.locals["b"] == Array(Int(2), Int(3), Int(4))
+                with pytest.raises(AssertionError, match="The first argument to take must be a count"):
+                    compile_source("n = -1\nx = {take $n 0..5}")()
+        finally:
+            set_release_mode(enabled)
+
+
+class TestNumArray:
+    @pytest.fixture(autouse=True, params=("numpy", "array"))
+    def backend(self, request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch):
+        """Run each test with NumPy, if it is installed, and with :class:`array.array`, which must agree."""
+        if request.param == "numpy":
+            pytest.importorskip("numpy")
+        else:
+            monkeypatch.setattr(numarray, "_numpy", functools.cache(lambda: None))
+        return request.param
+
+    def test_from_iterable(self):
+        assert list(NumArray.from_iterable(Range(0, 3))) == [Int(0), Int(1), Int(2)]
+        floats = NumArray.from_iterable(Array.from_iterable([Int(1), Float(2.5)]))
+        assert floats.type_ is Float and list(floats) == [Float(1.0), Float(2.5)]
+        assert NumArray.from_iterable(Array.from_iterable([true])).type_ is Bool
+        with pytest.raises(AssertionError, match="A numeric array can only hold"):
+            NumArray.from_iterable(Array.from_iterable([String("a")]))
+        with pytest.raises(Error, match="only hold integers that fit in 64 bits"):
+            NumArray.from_iterable(Array.from_iterable([Int(2**63), Int(1)]))
+
+    @pytest.mark.parametrize(
+        "name, values, type_",
+        [
+            ("+", [1, 3, 5], Int),
+            ("-", [-1, -1, -1], Int),
+            ("*", [0, 2, 6], Int),
+            ("/", [0.0, 0.5, 2 / 3], Float),
+            (">", [False, False, False], Bool),
+            ("<", [True, True, True], Bool),
+            ("==", [False, False, False], Bool),
+        ],
+    )
+    def test_operators_compute_elementwise(self, name, values, type_):
+        a, b = NumArray.from_iterable(Range(0, 3)), NumArray.from_iterable(Range(1, 4))
+        assert operator_functions[name](a, b) == NumArray.from_values(values, type_)
+
+    def test_operators_broadcast_numbers(self):
+        xs = NumArray.from_iterable(Range(0, 3))
+        assert operator_functions["*"](xs, Float(0.5)) == NumArray.from_values([0.0, 0.5, 1.0], Float)
+        assert operator_functions[">"](Int(1), xs) == NumArray.from_values([True, False, False], Bool)
+        with pytest.raises(AssertionError, match="must have the same length"):
+            operator_functions["+"](xs, NumArray.from_iterable(Range(0, 2)))
+
+    def test_division_by_zero(self):
+        xs = NumArray.from_iterable(Range(1, 4))
+        with pytest.raises(Error, match="Division by zero"):
+            operator_functions["/"](xs, Int(0))
+        with pytest.raises(Error, match="Division by zero"):
+            operator_functions["/"](Float(0.0), NumArray.from_values([1.0, 0.0], Float))
+
+    def test_overflow(self):
+        xs = NumArray.from_values([2**63 - 1, 1], Int)
+        with pytest.raises(Error, match="only hold integers that fit in 64 bits"):
+            operator_functions["+"](xs, Int(1))
+        with pytest.raises(Error, match="only hold integers that fit in 64 bits"):
+            operator_functions["*"](NumArray.from_values([2**32, 1], Int), Int(2**31))
+        assert operator_functions["-"](xs, Int(1)) == NumArray.from_values([2**63 - 2, 0], Int)
+        with pytest.raises(Error, match="only hold floats that are not too large"):
+            operator_functions["*"](NumArray.from_values([1e308, 1.0], Float), Int(10))
+        infinities = NumArray.from_values([float("inf")], Float)
+        assert list(operator_functions["+"](infinities, Int(1))) == [Float(float("inf"))]
+
+    def test_sum_overflow(self):
+        with pytest.raises(Error, match="only hold integers that fit in 64 bits"):
+            call(Ref.to(sum_), NumArray.from_values([2**63 - 1, 1], Int))
+        assert call(Ref.to(sum_), NumArray.from_values([2**63 - 1, 1, -2], Int)) == Int(2**63 - 2)
+        with pytest.raises(Error, match="only hold floats that are not too large"):
+            call(Ref.to(sum_), NumArray.from_values([1e308, 1e308], Float))
+
+    def test_unknown_attribute_is_error(self, capsys: pytest.CaptureFixture[str]):
+        statement_list = compile_source(
+            "xs = {numarray (1 2)}\ntry (\n    x = $xs.foo\n) catch e (\n    Error (\n        echo $e\n    )\n)"
+        )
+        with nested_stack_frame(builtins_.create_locals_dict()) as frame:
+            statement_list()
+            assert capsys.readouterr().out == "A numeric array has no attribute 'foo'\n"
+            compile_source("x = $xs.-1")()
+            assert frame.locals["x"] == Int(2)
+            with pytest.raises(Error, match="Index 2 out of a numeric array of length 2"):
+                compile_source("xs = {numarray (1 2)}\nx = $xs.2")()
+
+    def test_divide_numbers(self):
+        assert operator_functions["/"](Int(7), Int(2)) == Float(3.5)
+
+    def test_reductions(self):
+        xs = NumArray.from_iterable(Range(1, 5))
+        assert call(Ref.to(sum_), xs) == Int(10)
+        assert call(Ref.to(min_), xs) == Int(1)
+        assert call(Ref.to(max_), xs) == Int(4)
+        assert call(Ref.to(mean), xs) == Float(2.5)
+        assert call(Ref.to(max_), operator_functions[">"](xs, Int(2))) == true
+        # Other iterables are converted to numeric arrays
+        assert call(Ref.to(sum_), Range(0, 0)) == Int(0)
+        with pytest.raises(Error):
+            call(Ref.to(mean), Array.from_iterable([]))
+
+
 # TODO: Test function `ref`
 # TODO: This file is incomplete
@@ -0,0 +1,85 @@
+# pylint: disable=missing-function-docstring,missing-module-docstring
+
+import marshal
+import os
+from pathlib import Path
+
+import pytest
+
+from mylang import cache
+from mylang.stdlib.core.func import StatementList
+
+FLOWS = sorted((Path(__file__).parent / "flows").glob("*.my"))
+
+
+@pytest.fixture
+def source_file(tmp_path: Path):
+    path = tmp_path / "module.my"
+    path.write_text('echo "Hello world"\n', encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def compile_calls(monkeypatch: pytest.MonkeyPatch):
+    calls = []
+    compile_source = cache.compile_source
+
+    def wrapper(code: str):
+        calls.append(code)
+        return compile_source(code)
+
+    monkeypatch.setattr(cache, "compile_source", wrapper)
+    return calls
+
+
+@pytest.mark.parametrize("path", FLOWS, ids=lambda path: path.name)
+def test_serialization_roundtrip(path: Path):
+    statement_list = cache.compile_source(path.read_text(encoding="utf-8"))
+    data = cache.dumps(statement_list)
+    loaded = cache.loads(data)
+    assert isinstance(loaded, StatementList)
+    assert marshal.loads(cache.dumps(loaded)) == marshal.loads(data)
+
+
+def test_load_file_writes_and_reuses_compiled_file(source_file: Path, compile_calls: list[str]):
+    cache.load_file(source_file)
+    assert cache.cache_path(source_file).is_file()
+    assert cache.cache_path(source_file).parent.name == "__mylangcache__"
+
+    statement_list = cache.load_file(source_file)
+    assert len(compile_calls) == 1
+    expected = cache.compile_source(source_file.read_text())
+    assert marshal.loads(cache.dumps(statement_list)) == marshal.loads(cache.dumps(expected))
+
+
+def test_load_file_recompiles_modified_source(source_file: Path, compile_calls: list[str]):
+    cache.load_file(source_file)
+    source_file.write_text('echo "Hello"; echo "world"\n', encoding="utf-8")
+
+    statement_list = cache.load_file(source_file)
+    assert len(compile_calls) == 2
+    assert len(statement_list) == 2
+
+
+def test_load_file_does_not_recompile_touched_source(source_file: Path, compile_calls: list[str]):
+    cache.load_file(source_file)
+    stat = source_file.stat()
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    cache.load_file(source_file)
+    cache.load_file(source_file)
+    assert len(compile_calls) == 1
+
+
+def test_load_file_ignores_corrupt_compiled_file(source_file: Path, compile_calls: list[str]):
+    cache.load_file(source_file)
+    cache.cache_path(source_file).write_bytes(b"garbage")
+
+    cache.load_file(source_file)
+    assert len(compile_calls) == 2
+
+
+def test_cache_can_be_disabled(source_file: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("MYLANG_NO_CACHE", "1")
+    cache.load_file(source_file)
+    assert not cache.cache_path(source_file).exists()
@@ -0,0 +1,122 @@
+# pylint: disable=missing-function-docstring,missing-module-docstring
+
+import lark
+from lark import UnexpectedEOF, UnexpectedInput
+import pytest
+
+from mylang.incremental import IncrementalParser
+from mylang.parser import get_parser
+
+
+def parse(code: str):
+    return get_parser("lalr").parse(code, start="statement_list")
+
+
+def test_parse_line_by_line_like_full_parse():
+    code = "if true (\n  dict1 = {\n    a = 1,\n    b = 2,\n  }\n  echo a,\n    b\n)\n"
+    parser = IncrementalParser(get_parser("lalr"))
+    text = ""
+    for line in code.splitlines(keepends=True)[:-1]:
+        text += line
+        with pytest.raises(UnexpectedEOF):
+            parser.parse(text + "\n")
+    assert parser.parse(code + "\n") == parse(code + "\n")
+
+
+def test_parse_feeds_only_new_lines():
+    parser = IncrementalParser(get_parser("lalr"))
+    with pytest.raises(UnexpectedEOF):
+        parser.parse("if true (\n\n")
+    assert parser.position == len("if true (")
+    with pytest.raises(UnexpectedEOF):
+        parser.parse('if true (\necho "hello"\n\n')
+    assert parser.position == len('if true (\necho "hello"')
+
+
+def test_parse_starts_over_when_text_changes():
+    parser = IncrementalParser(get_parser("lalr"))
+    with pytest.raises(UnexpectedEOF):
+        parser.parse("if true (\n\n")
+    assert parser.parse("echo a\n\n") == parse("echo a\n\n")
+
+
+def test_parse_resets_on_syntax_error():
+    parser = IncrementalParser(get_parser("lalr"))
+    with pytest.raises(UnexpectedEOF):
+        parser.parse("echo (\n\n")
+    with pytest.raises(UnexpectedInput):
+        parser.parse("echo (\n))\n\n")
+    assert parser.position == 0
+    assert parser.parse("echo a\n\n") == parse("echo a\n\n")
+
+
+def test_feed_returns_statements_once_complete():
+    parser = IncrementalParser(get_parser("lalr"))
+    assert parser.feed("echo a\n") == []
+    assert parser.feed("if true (\n") == [parse("echo a\n")]
+    assert parser.feed("  echo b\n") == []
+    assert parser.feed(")\n") == []
+    assert parser.feed("echo c; echo d\necho e\n") == [
+        parse("if true (\n  echo b\n)\n"),
+        parse("echo c;"),
+        parse("echo d\n"),
+    ]
+    assert parser.close() == [parse("echo e\n")]
+
+
+def test_feed_keeps_only_unparsed_text():
+    parser = IncrementalParser(get_parser("lalr"))
+    for i in range(1000):
+        parser.feed(f"echo {i}\n")
+    assert parser.position <= len("\necho 999\n")
+
+
+def test_syntax_errors_are_located_in_the_whole_input():
+    parser = IncrementalParser(get_parser("lalr"))
+    with pytest.raises(UnexpectedInput) as parse_error:
+        parser.parse("echo a\n(\necho ))\n")
+    assert (parse_error.value.line, parse_error.value.column) == (3, 7)
+
+    for line in ("echo a\n", "if true (\n", ")\n"):
+        parser.feed(line)
+    with pytest.raises(UnexpectedInput) as feed_error:
+        parser.feed("echo (1 2))\n")
+    assert (feed_error.value.line, feed_error.value.column) == (4, 11)
+
+
+def test_lark_version_is_supported():
+    # The versions of Lark that the incremental parser is tested with, see pyproject.toml
+    version = tuple(map(int, lark.__version__.split(".")[:2]))
+    assert (1, 2) <= version < (1, 4), f"Unsupported version of Lark: {lark.__version__}"
+
+
+def test_close_raises_on_incomplete_input():
+    parser = IncrementalParser(get_parser("lalr"))
+    parser.feed("echo (\n")
+    with pytest.raises(UnexpectedInput):
+        parser.close()
+
+
+def test_tree_parser_builds_the_trees():
+    earley_parser = get_parser()
+    parser = IncrementalParser(get_parser("lalr"), tree_parser=earley_parser)
+    assert parser.feed("echo a\n") == []
+    assert parser.feed("if true (\n  echo b\n)\n") == [earley_parser.parse("echo a\n", start="statement_list")]
+    assert parser.close() == [earley_parser.parse("if true (\n  echo b\n)\n", start="statement_list")]
+    assert parser.parse("echo a; echo b\n") == earley_parser.parse("echo a; echo b\n", start="statement_list")
+
+
+def test_tree_parser_rejects_what_it_does_not_accept():
+    # The LALR grammar ignores the whitespace before the parenthesis
+    parser = IncrementalParser(get_parser("lalr"), tree_parser=get_parser())
+    parser.feed("echo a\n")
+    with pytest.raises(UnexpectedInput) as feed_error:
+        parser.feed("x = (a )\n")
+        parser.feed("echo b\n")
+    assert (feed_error.value.line, feed_error.value.column) == (2, 8)
+    assert parser.position == 0
+
+    with pytest.raises(UnexpectedInput) as parse_error:
+        parser.parse("echo a\nx = (a )\n")
+    assert (parse_error.value.line, parse_error.value.column) == (2, 8)
+    assert parser.parse("echo a\n") == parse("echo a\n")
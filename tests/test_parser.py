@@ -1,8 +1,9 @@
-from lark import Token, Tree, UnexpectedEOF, UnexpectedCharacters
+from lark import LarkError, Token, Tree, UnexpectedEOF, UnexpectedCharacters, UnexpectedToken
 import pytest
 import dataclasses
 import textwrap
-from mylang.parser import parser
+from pathlib import Path
+from mylang.parser import create_parser, get_parser
 from mylang.stdlib.core import Args
 
 
@@ -523,6 +524,50 @@ scenarios = {
           """,
         ),
     },
+    "range": {
+        "1..5": Scenario(
+            start="expression",
+            expected="""
+            binary_operation
+              1
+              ..
+              5
+            """,
+        ),
+        "-1..-5": Scenario(
+            start="expression",
+            expected="""
+            binary_operation
+              -1
+              ..
+              -5
+            """,
+        ),
+        "$a..$b.c": Scenario(
+            start="expression",
+            expected="""
+            binary_operation
+              prefix_operation
+                $
+                a
+              ..
+              prefix_operation
+                $
+                path
+                  b
+                  c
+            """,
+        ),
+        "a...b": Scenario(
+            start="expression",
+            expected="""
+            path
+              a
+              dots	...
+              b
+            """,
+        ),
+    },
     "module": {
         "empty": Scenario(
             start="module",
@@ -580,10 +625,14 @@ def flatten_scenarios(scenarios, prefix=""):
 
 params, ids = flatten_scenarios(scenarios)
 
+parser = get_parser()
+lalr_parser = create_parser("lalr")
 
+
+@pytest.mark.parametrize("engine_parser", [parser, lalr_parser], ids=["earley", "lalr"])
 @pytest.mark.parametrize("start,source,expected", params, ids=ids)
-def test_parser(start: str, source: str, expected: str):
-    tree = parser.parse(source, start=start)
+def test_parser(engine_parser, start: str, source: str, expected: str):
+    tree = engine_parser.parse(source, start=start)
     assert isinstance(tree, (Token, Tree)), "Parsed result is neither a Token nor a Tree"
     if isinstance(tree, Token):
         assert tree.value == expected.strip()
@@ -602,8 +651,67 @@ class TestAdditionalScenarios:
         def test_does_not_parse_assignment(self):
             with pytest.raises(UnexpectedEOF):
                 parser.parse("a=1", start="statement_list")
+            with pytest.raises(UnexpectedToken):
+                lalr_parser.parse("a=1", start="statement_list")
 
     class TestDict:
         def test_does_not_parse_execution_block(self):
             with pytest.raises(UnexpectedCharacters):
                 parser.parse("{\n    a=1\n}", start="dict")
+            with pytest.raises(UnexpectedToken):
+                lalr_parser.parse("{\n    a=1\n}", start="dict")
+
+    class TestLalrEngine:
+        @pytest.mark.parametrize(
+            "path",
+            sorted((Path(__file__).parent / "flows").glob("*.my")),
+            ids=lambda path: path.name,
+        )
+        def test_parses_flows_like_earley(self, path: Path):
+            text = path.read_text(encoding="utf-8")
+            assert lalr_parser.parse(text, start="module").pretty() == parser.parse(text, start="module").pretty()
+
+        # Positional arguments can't follow keyed ones, and a single one must be followed by a comma
+        @pytest.mark.parametrize(
+            "start,source",
+            [
+                ("module", "f a b=1 c"),
+                ("module", "f a b=10 (\n  x\n)"),
+                ("module", "f b=10 (\n  x\n)"),
+                ("module", "f b=1 a"),
+                ("module", "f b=1, a,"),
+                ("module", "f b=1,\ng"),
+                ("module", "f a,"),
+                ("module", "f a,, b=1"),
+                ("expression", "(a a,)"),
+                ("expression", "(a, a,)"),
+                ("expression", "(b=1 a)"),
+                ("expression", "{a b=1}"),
+                ("expression", "{a a, b=1}"),
+                ("expression", "{b=1 a}"),
+            ],
+        )
+        def test_rejects_args_like_earley(self, start: str, source: str):
+            with pytest.raises(LarkError):
+                parser.parse(source, start=start)
+            with pytest.raises(LarkError):
+                lalr_parser.parse(source, start=start)
+
+        @pytest.mark.parametrize(
+            "start,source",
+            [
+                ("module", "f a, b=1"),
+                ("module", "f a a b=1 c=2,"),
+                ("module", "f a,\n  b=1"),
+                ("module", "f a a (\n  x\n)"),
+                ("module", "f (a,, b=1)"),
+                ("module", "x = {; a=1}"),
+                ("expression", "(a,)"),
+                ("expression", "(a a)"),
+                ("expression", "{a, b=1}"),
+                ("expression", "{a a b=1}"),
+                ("expression", "{b=1, c=2,}"),
+            ],
+        )
+        def test_accepts_args_like_earley(self, start: str, source: str):
+            assert lalr_parser.parse(source, start=start) == parser.parse(source, start=start)
@@ -290,3 +290,15 @@ class TestREPL:
 
         assert captured.out == expected_output
         assert captured.err == ""
+
+    def test_large_paste(self, capsys: pytest.CaptureFixture[str]):
+        """Test REPL parses only the new line of a long multi-line input."""
+        repl = REPL()
+        repl.buffer.content = "if true (\n"
+        for i in range(500):
+            with pytest.raises(UnexpectedEOF):
+                repl.eval()
+            repl.buffer.content += f"  echo {i}\n"
+        repl.buffer.content += ")\n"
+        repl.eval()
+        assert capsys.readouterr().out == "".join(f"{i}\n" for i in range(500))
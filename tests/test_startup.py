@@ -0,0 +1,15 @@
+# pylint: disable=missing-function-docstring,missing-module-docstring
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+def test_cli_does_not_eagerly_import_parser_or_repl():
+    code = "import sys, mylang.__main__; print(*sorted(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True
+    )
+    modules = result.stdout.split()
+    for name in ("lark", "termios", "numpy", "mylang.parser", "mylang.stdlib.repl"):
+        assert name not in modules
@@ -0,0 +1,104 @@
+# pylint: disable=missing-function-docstring,missing-module-docstring
+
+import marshal
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from lark import UnexpectedInput
+
+from mylang import cache, streaming
+from mylang.stdlib import builtins_
+from mylang.stdlib.core._context import nested_stack_frame
+from mylang.stdlib.core.func import StatementList, use
+
+ROOT = Path(__file__).parent.parent
+FLOWS = sorted((ROOT / "tests" / "flows").glob("*.my"))
+
+
+def run_mylang(*args: str, stdin: str = "") -> str:
+    result = subprocess.run(
+        [sys.executable, "-m", "mylang", *args], cwd=ROOT, input=stdin, capture_output=True, text=True, check=True
+    )
+    return result.stdout
+
+
+@pytest.mark.parametrize("path", FLOWS, ids=lambda path: path.name)
+def test_compile_stream_matches_compile_source(path: Path):
+    with open(path, encoding="utf-8") as f:
+        statement_lists = list(streaming.compile_stream(f))
+    streamed = StatementList.from_iterable(
+        statement for statement_list in statement_lists for statement in statement_list
+    )
+    expected = cache.compile_source(path.read_text(encoding="utf-8"))
+    assert marshal.loads(cache.dumps(streamed)) == marshal.loads(cache.dumps(expected))
+
+
+def test_statements_are_executed_while_reading(capsys: pytest.CaptureFixture[str]):
+    outputs = []
+
+    def lines():
+        yield "echo first\n"
+        yield "echo second\n"
+        outputs.append(capsys.readouterr().out)
+        yield "echo third\n"
+
+    with nested_stack_frame(builtins_.create_locals_dict()):
+        streaming.execute_stream(streaming.compile_stream(lines()))
+
+    assert outputs == ["first\n"]
+    assert capsys.readouterr().out == "second\nthird\n"
+
+
+def test_execution_stops_at_return(capsys: pytest.CaptureFixture[str]):
+    lines = ["echo first\n", "return 1\n", "echo second\n"]
+    with nested_stack_frame(builtins_.create_locals_dict()) as stack_frame:
+        streaming.execute_stream(streaming.compile_stream(lines))
+        assert stack_frame.return_value is not None
+
+    assert capsys.readouterr().out == "first\n"
+
+
+def test_syntax_error_is_located_in_the_whole_input():
+    lines = ["x = 1\n", "if true (\n", "  y = 2\n", ")\n", "z = (1))\n"]
+    with pytest.raises(UnexpectedInput) as error:
+        list(streaming.compile_stream(lines))
+
+    assert (error.value.line, error.value.column) == (5, 8)
+
+
+@pytest.mark.parametrize("line", ["x = (1 )\n", "echo (1)(2)\n"])
+def test_streaming_rejects_what_compile_source_rejects(line: str):
+    # The LALR grammar ignores inline whitespace, but the reference grammar parses the code
+    lines = ["x = 1\n", line]
+    with pytest.raises(UnexpectedInput):
+        cache.compile_source("".join(lines))
+    with pytest.raises(UnexpectedInput) as error:
+        list(streaming.compile_stream(lines))
+    assert error.value.line == 2
+
+
+def test_cli_streams_stdin():
+    assert run_mylang(stdin="echo first\nif true (\n  echo second\n)\necho third") == "first\nsecond\nthird\n"
+
+
+def test_cli_streams_file_on_request(tmp_path: Path):
+    path = tmp_path / "module.my"
+    path.write_text("echo first\necho second\n", encoding="utf-8")
+    assert run_mylang("--stream", str(path)) == "first\nsecond\n"
+    assert not cache.cache_path(path).exists()
+
+
+def test_use_streams_large_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]):
+    path = tmp_path / "module.my"
+    path.write_text("echo loading\nexport a=1\n", encoding="utf-8")
+    monkeypatch.setattr(streaming, "STREAM_THRESHOLD", os.stat(path).st_size)
+
+    with nested_stack_frame(builtins_.create_locals_dict()):
+        exported_value, _ = use._load_mylang_file(path)
+
+    assert capsys.readouterr().out == "loading\n"
+    assert exported_value["a"] == 1
+    assert not cache.cache_path(path).exists()
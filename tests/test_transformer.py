@@ -1,5 +1,7 @@
 # pylint: disable=missing-function-docstring,missing-module-docstring,invalid-name
 
+import ast
+
 import pytest
 from lark import Token, Tree
 from mylang.transformer import Transformer
@@ -178,6 +180,37 @@ class TestString:
         assert isinstance(result, String)
         assert result.value == 'He said "hello" to me'
 
+    @pytest.mark.parametrize(
+        "literal",
+        [
+            r'"\a\b\f\n\r\t\v\\\'\""',
+            r'"\101\7\0\377"',
+            r'"\x41\xfF"',
+            r'"\u00e9\U0001F600"',
+            r'"\N{BULLET}\N{LATIN SMALL LETTER A}"',
+            r"'mixed \' and \" quotes'",
+        ],
+    )
+    def test_quoted_string_escapes_match_python(self, literal: str):
+        token = Token("DOUBLE_QUOTED_STRING", literal)
+        result = self.transformer.DOUBLE_QUOTED_STRING(token)
+        assert result.value == ast.literal_eval(literal)
+
+    def test_quoted_string_keeps_unknown_escapes(self):
+        token = Token("DOUBLE_QUOTED_STRING", r'"keeps \q unknown \d escapes"')
+        result = self.transformer.DOUBLE_QUOTED_STRING(token)
+        assert result.value == "keeps \\q unknown \\d escapes"
+
+    @pytest.mark.parametrize("literal", [r'"\x4"', r'"\u123"', r'"\N{NO SUCH CHARACTER}"', r'"\U00110000"'])
+    def test_quoted_string_invalid_escapes(self, literal: str):
+        with pytest.raises(ValueError):
+            self.transformer.DOUBLE_QUOTED_STRING(Token("DOUBLE_QUOTED_STRING", literal))
+
+    def test_quoted_string_is_not_evaluated(self):
+        token = Token("DOUBLE_QUOTED_STRING", '"" + str(1 / 0) + ""')
+        result = self.transformer.DOUBLE_QUOTED_STRING(token)
+        assert result.value == '" + str(1 / 0) + "'
+
 
 class TestArgs:
     def setup_method(self):
@@ -214,6 +247,27 @@ class TestArgs:
         result = self.transformer.args(items)
         assert isinstance(result, Args)
 
+    def test_args_positional_after_keyed_are_numbered_without_gaps(self):
+        assignment_tree = Tree("assignment", [String("key"), Int(42)])
+        items = [String("a"), assignment_tree, String("b")]
+
+        result = self.transformer.args(items)
+        assert list(result._m_dict_) == [Int(0), Int(1), String("key")]
+        assert result[Int(1)] == String("b")
+
+    def test_args_incomplete_positions(self):
+        operation = PrefixOperation("$", String("x"))
+        assignment_tree = Tree("assignment", [String("key"), self.transformer.array([operation])])
+        items = [String("echo"), operation, assignment_tree]
+
+        result = self.transformer.args(items)
+        assert result._incomplete_positions == (Int(1), String("key"))
+        assert result[String("key")]._incomplete_positions == (0,)
+
+    def test_args_without_incomplete_expressions(self):
+        result = self.transformer.args([String("echo"), Int(1), self.transformer.dict([Int(2)])])
+        assert result._incomplete_positions == ()
+
 
 class TestDict:
     def setup_method(self):
@@ -0,0 +1,246 @@
+# pylint: disable=missing-function-docstring,missing-module-docstring
+
+import pytest
+
+from mylang.cache import compile_source
+from mylang.stdlib import builtins_
+from mylang.stdlib.core._compiler import current_engine
+from mylang.stdlib.core._context import current_stack_frame, max_stack_depth, nested_stack_frame
+from mylang.stdlib.core._utils import set_contextvar
+from mylang.vm import Opcode, code_for, compile_statement_list, disassemble, function_code
+from mylang.vm.opcodes import CONSTANT_OPCODES, JUMP_OPCODES
+
+
+def execute(code: str):
+    with set_contextvar(current_engine, "vm"), nested_stack_frame(builtins_.create_locals_dict()):
+        return compile_source(code)()
+
+
+def opcodes(code: str) -> set[Opcode]:
+    instructions = compile_statement_list(compile_source(code)).instructions
+    return {Opcode(opcode) for opcode in instructions[::2]}
+
+
+def test_argument_kinds_are_disjoint():
+    assert not CONSTANT_OPCODES & JUMP_OPCODES
+
+
+def test_control_flow_is_compiled_natively():
+    assert {Opcode.FOR_ITER, Opcode.ENTER_FRAME, Opcode.EXIT_FRAME} <= opcodes("for x in (1 2) (\n echo $x\n)")
+    assert {Opcode.SETUP_TRY, Opcode.MATCH_ERROR, Opcode.RERAISE} <= opcodes(
+        "try (\n throw\n) catch e (\n Error (\n echo $e\n )\n)"
+    )
+    assert {Opcode.BINARY_OP, Opcode.STORE_FAST, Opcode.LOAD_FAST} <= opcodes("x = 1; y = ($x + 2)")
+
+
+def test_code_is_compiled_once():
+    statement_list = compile_source("x = 1; echo $x")
+    with set_contextvar(current_engine, "vm"), nested_stack_frame(builtins_.create_locals_dict()):
+        statement_list()
+        code = statement_list._code
+        statement_list()
+
+    assert code is not None and code_for(statement_list) is code
+    assert statement_list._compiled is None
+
+
+def test_disassemble():
+    listing = disassemble(compile_statement_list(compile_source("loop (break,;); echo {echo 1}")))
+
+    assert listing.startswith("Disassembly of <Code <statements>")
+    assert ">>" in listing
+    assert "IS_BUILTIN" in listing and "('echo')" in listing
+    # Execution blocks are listed after the code that contains them
+    assert "Disassembly of <Code <block>" in listing
+
+
+def test_loops(capsys: pytest.CaptureFixture[str]):
+    execute(
+        """
+x = 0
+loop (
+    x = $x + 1
+    if $x == 2 (
+        continue,;
+    )
+    while $x < 4
+    echo $x
+)
+for y in (1 2 3) (
+    if $y == 3 (
+        break,;
+    )
+    echo "y" $y
+)
+"""
+    )
+    assert capsys.readouterr().out == "1\n3\ny 1\ny 2\n"
+
+
+def test_return_from_nested_statements(capsys: pytest.CaptureFixture[str]):
+    execute(
+        """
+fun f x (
+    for y in (1 2 3) (
+        if $y == $x (
+            return $y
+        )
+    )
+    return 0
+)
+echo {f 2} {f 5}
+"""
+    )
+    assert capsys.readouterr().out == "2 0\n"
+
+
+def test_try_catch(capsys: pytest.CaptureFixture[str]):
+    execute(
+        """
+error MyError "my error"
+try (
+    throw MyError
+    echo unreachable
+) catch e (
+    MyError (
+        echo caught $e
+    )
+)
+"""
+    )
+    assert capsys.readouterr().out.startswith("caught")
+
+
+def test_uncaught_error_restores_stack_frame():
+    with set_contextvar(current_engine, "vm"), nested_stack_frame(builtins_.create_locals_dict()) as frame:
+        with pytest.raises(Exception):
+            compile_source("for x in (1 2) (\n throw Error oops\n)")()
+        assert current_stack_frame.get() is frame
+
+
+def test_unmatched_error_is_raised_again(capsys: pytest.CaptureFixture[str]):
+    with pytest.raises(Exception):
+        execute("error MyError m; try (throw Error oops) catch e (MyError (echo no))")
+    assert capsys.readouterr().out == ""
+
+
+def test_shadowed_builtin_is_called(capsys: pytest.CaptureFixture[str]):
+    execute(
+        """
+fun if condition body (
+    echo shadowed
+)
+if 1 (
+    echo native
+)
+"""
+    )
+    assert capsys.readouterr().out == "shadowed\n"
+
+
+def test_closures_read_enclosing_slots(capsys: pytest.CaptureFixture[str]):
+    with set_contextvar(current_engine, "vm"), nested_stack_frame(builtins_.create_locals_dict()) as frame:
+        compile_source(
+            """
+fun make_adder n (
+    fun add x (
+        return $x + $n
+    )
+    return $add
+)
+adder = {make_adder 10}
+echo {adder 5} {adder 7}
+"""
+        )()
+        adder = frame.locals["adder"]
+
+    assert capsys.readouterr().out == "15 17\n"
+    instructions = function_code(adder).instructions
+    assert {Opcode.LOAD_FAST, Opcode.LOAD_DEREF} <= {Opcode(opcode) for opcode in instructions[::2]}
+
+
+def test_dynamically_set_names_are_found(capsys: pytest.CaptureFixture[str]):
+    execute(
+        """
+fun f (
+    k = y
+    set $k=5
+    fun inner (
+        echo $y
+    )
+    inner
+    echo $y
+)
+f
+"""
+    )
+    assert capsys.readouterr().out == "5\n5\n"
+
+
+def test_recursion_is_not_limited_by_the_python_stack(capsys: pytest.CaptureFixture[str]):
+    execute(
+        """
+fun count n (
+    if $n == 0 (
+        return 0
+    )
+    return $n + {count ($n - 1)}
+)
+echo {count 3000}
+"""
+    )
+    assert capsys.readouterr().out == "4501500\n"
+
+
+def test_tail_calls_do_not_nest_stack_frames(capsys: pytest.CaptureFixture[str]):
+    with set_contextvar(max_stack_depth, 50):
+        execute(
+            """
+fun down n acc (
+    if $n == 0 (
+        return $acc
+    )
+    return {down ($n - 1) ($acc + 1)}
+)
+echo {down 1000 0}
+"""
+        )
+    assert capsys.readouterr().out == "1000\n"
+    assert Opcode.TAIL_CALL in opcodes("fun f (\n return {f}\n)\nreturn {f}")
+
+
+def test_maximum_stack_depth_raises_an_error(capsys: pytest.CaptureFixture[str]):
+    with set_contextvar(max_stack_depth, 100):
+        execute(
+            """
+fun forever n (
+    return $n + {forever $n}
+)
+try (
+    forever 1
+) catch e (
+    Error (
+        echo caught $e
+    )
+)
+"""
+        )
+    assert capsys.readouterr().out.startswith("caught")
+
+
+def test_wrong_number_of_arguments_raises_an_error(capsys: pytest.CaptureFixture[str]):
+    execute(
+        """
+fun f x y (
+    return $x
+)
+try (
+    f 1
+) catch e (
+    Error (
+        echo caught $e
+    )
+)
+"""
+    )
+    assert "f takes 2 positional arguments but 1 was given" in capsys.readouterr().out